@@ -0,0 +1,29 @@
+"""Add debt status indexes
+
+Revision ID: 122b554a4c28
+Revises: populate_fake_data
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '122b554a4c28'
+down_revision: Union[str, None] = 'populate_fake_data'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Debts of a client for a product (DebtRepository.get_debts_by_client_identifier).
+    op.create_index('ix_debt_client_product_code', 'debt', ['client', 'product_code'])
+    # Payments of a debt, optionally filtered by status (pending/paid).
+    op.create_index('ix_payment_debt_status', 'payment', ['debt', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_debt_status', table_name='payment')
+    op.drop_index('ix_debt_client_product_code', table_name='debt')
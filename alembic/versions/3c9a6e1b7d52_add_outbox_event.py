@@ -0,0 +1,39 @@
+"""Add outbox event
+
+Revision ID: 3c9a6e1b7d52
+Revises: 8e4b7c2d1f90
+Create Date: 2026-10-18 16:42:09.513207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a6e1b7d52'
+down_revision: Union[str, None] = '8e4b7c2d1f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Payment events written with the payment, delivered by the outbox dispatcher.
+    op.create_table('outbox_event',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('event_type', sa.String(length=50), nullable=False),
+                    sa.Column('payload', sa.Text(), nullable=False),
+                    sa.Column('attempts', sa.Integer(), nullable=False),
+                    sa.Column('available_at', sa.DateTime(), nullable=False),
+                    sa.Column('token', sa.String(length=32), nullable=True),
+                    sa.Column('last_error', sa.Text(), nullable=True),
+                    sa.Column('date_created', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    op.create_index('ix_outbox_event_available_at', 'outbox_event', ['available_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_event_available_at', table_name='outbox_event')
+    op.drop_table('outbox_event')
@@ -0,0 +1,36 @@
+"""Add idempotency key
+
+Revision ID: 5d2f8a1c9e47
+Revises: 122b554a4c28
+Create Date: 2026-10-18 11:02:15.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2f8a1c9e47'
+down_revision: Union[str, None] = '122b554a4c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Responses of the payment and revert requests, replayed to the bank retries.
+    op.create_table('idempotency_key',
+                    sa.Column('request_key', sa.String(length=32), nullable=False),
+                    sa.Column('token', sa.String(length=32), nullable=False),
+                    sa.Column('response', sa.Text(), nullable=True),
+                    sa.Column('date_created', sa.DateTime(), nullable=True),
+                    sa.Column('expires_at', sa.DateTime(), nullable=False),
+                    sa.PrimaryKeyConstraint('request_key')
+                    )
+    op.create_index('ix_idempotency_key_expires_at', 'idempotency_key', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_idempotency_key_expires_at', table_name='idempotency_key')
+    op.drop_table('idempotency_key')
@@ -0,0 +1,31 @@
+"""Add operation identifier node
+
+Revision ID: 6a3f9d2e8b14
+Revises: 3c9a6e1b7d52
+Create Date: 2026-10-19 10:12:37.284519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a3f9d2e8b14'
+down_revision: Union[str, None] = '3c9a6e1b7d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per process generating operation identifiers, its id is the node of the identifiers.
+    op.create_table('operation_identifier_node',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('date_created', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+
+
+def downgrade() -> None:
+    op.drop_table('operation_identifier_node')
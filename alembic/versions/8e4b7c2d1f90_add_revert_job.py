@@ -0,0 +1,45 @@
+"""Add revert job
+
+Revision ID: 8e4b7c2d1f90
+Revises: 5d2f8a1c9e47
+Create Date: 2026-10-18 15:20:41.107358
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4b7c2d1f90'
+down_revision: Union[str, None] = '5d2f8a1c9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Mass reversals of the payments of a bank, resumed from their cursor.
+    op.create_table('revert_job',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('status', sa.String(length=20), nullable=False),
+                    sa.Column('bank_code', sa.String(length=255), nullable=True),
+                    sa.Column('date_from', sa.DateTime(), nullable=True),
+                    sa.Column('date_to', sa.DateTime(), nullable=True),
+                    sa.Column('operation_bank_numbers', sa.Text(), nullable=True),
+                    sa.Column('cursor', sa.Integer(), nullable=False),
+                    sa.Column('reverted', sa.Integer(), nullable=False),
+                    sa.Column('token', sa.String(length=32), nullable=True),
+                    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+                    sa.Column('error', sa.Text(), nullable=True),
+                    sa.Column('date_created', sa.DateTime(), nullable=True),
+                    sa.Column('date_updated', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id')
+                    )
+    # The payments of a bank in an emition date range, for the reversal filter.
+    op.create_index('ix_payment_bank_code_emition_date', 'payment', ['bank_code', 'emition_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_payment_bank_code_emition_date', table_name='payment')
+    op.drop_table('revert_job')
@@ -0,0 +1,35 @@
+"""Add import checkpoint
+
+Revision ID: 9b7e4c1a2d63
+Revises: 6a3f9d2e8b14
+Create Date: 2026-10-19 11:03:52.618247
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b7e4c1a2d63'
+down_revision: Union[str, None] = '6a3f9d2e8b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Progress of the billing file imports, written in the transaction of each chunk.
+    op.create_table('import_checkpoint',
+                    sa.Column('name', sa.String(length=255), nullable=False),
+                    sa.Column('offset', sa.BigInteger(), nullable=False),
+                    sa.Column('rows', sa.Integer(), nullable=False),
+                    sa.Column('created', sa.Integer(), nullable=False),
+                    sa.Column('rejected', sa.Integer(), nullable=False),
+                    sa.Column('date_updated', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('name')
+                    )
+
+
+def downgrade() -> None:
+    op.drop_table('import_checkpoint')
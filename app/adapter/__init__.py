@@ -1,3 +1,6 @@
 # Connect the service with external services from infrastructure.
 from app.adapter.payment_adapter import *
 from app.adapter.debt_adapter import *
+from app.adapter.idempotency_adapter import *
+from app.adapter.revert_job_adapter import *
+from app.adapter.outbox_adapter import *
@@ -1,9 +1,35 @@
+import hashlib
+import json
 import logging
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Type
 
-from app.database.models import Debt, Client
+import ormar
+
+from app.database.config import MAX_BIND_PARAMETERS, UNIQUE_VIOLATION_ERRORS
+from app.database.models import Client, Debt
 from app.domain import DebtDomain
-from app.infrastructure import DebtRepository
-from app.infrastructure import ClientRepository
+from app.infrastructure import ClientRepository, DebtRepository
+from app.infrastructure.debt_repository import PendingDebtRow
+from app.settings import settings
+from app.utils.cache import create_cache
+from app.utils.responses import etag_matches
+from app.utils.tools import chunked, parse_date
+
+
+debt_status_cache = create_cache(
+    namespace="debt_status",
+    max_size=settings.debt_status_cache_max_size,
+    ttl=settings.debt_status_cache_ttl,
+    max_bytes=settings.debt_status_cache_max_bytes
+)
+# ETag of each cached debt-status response, dropped with it.
+debt_status_etag_cache = create_cache(
+    namespace="debt_status_etag",
+    max_size=settings.debt_status_cache_max_size,
+    ttl=settings.debt_status_cache_ttl
+)
+
 
 class DebtAdapter:
     @staticmethod
@@ -11,6 +37,10 @@ class DebtAdapter:
         """
         Check the debt status of a client
 
+        Responses with pending debts are cached as serialized JSON per
+        (idConsulta, codigoProducto) until their TTL expires or a payment on one
+        of the debts invalidates them.
+
         Args:
             debt_data (dict): Debt data
 
@@ -18,29 +48,20 @@ class DebtAdapter:
             list[dict]: List of debts
         """
 
+        cache_key = f'{debt_data.get("idConsulta")}:{debt_data.get("codigoProducto")}'
+
+        cached_response = debt_status_cache.get(cache_key)
+        if cached_response is not None:
+            return json.loads(cached_response)
+
         try:
-            
-            client = await ClientRepository.get_client_by_document_identifier(debt_data["idConsulta"])
-            
-            if not client:
-                return {
-                    "Cliente": "",
-                    "CodigoRespuesta": "16",
-                    "DescRespuesta": "OK",
-                    "deudasPendientes": []
-                }
-            
-            debts = await DebtRepository.get_debts_by_client_identifier(debt_data["idConsulta"], debt_data["codigoProducto"])
-            
-            if not debts:
-                return {
-                    "Cliente": "",
-                    "CodigoRespuesta": "22",
-                    "DescRespuesta": "CLIENTE SIN DEUDAS PENDIENTES",
-                    "deudasPendientes": []
-                }
-                   
-            return DebtAdapter._formating_debts(debts, client)
+
+            client_name, debts = await DebtRepository.get_client_pending_debts(
+                debt_data["idConsulta"],
+                debt_data["codigoProducto"]
+            )
+
+            return DebtAdapter._debt_status_response(cache_key, client_name, debts)
 
         except Exception as e:
             logging.error(e)
@@ -52,12 +73,405 @@ class DebtAdapter:
             }
 
     @staticmethod
-    def _formating_debts(debts: list[Debt], cliente: Client) -> dict:
+    async def checking_debt_status_if_modified(
+        debt_data: dict,
+        if_none_match: Optional[str]
+    ) -> Tuple[str, Optional[dict]]:
+        """
+        Check the debt status of a client unless the caller already has it
+
+        The ETag of the response is a hash of the version of the debts of the
+        client for the product, which every payment write changes. A cached
+        response is answered with the ETag stored with it, without any query.
+        Otherwise the version is read first, and the debts are only read when
+        if_none_match does not match its ETag. The version is read again after
+        the debts, and the response is only cached with its ETag when the
+        version did not change in between.
+
+        Args:
+            debt_data (dict): Debt data
+            if_none_match (Optional[str]): If-None-Match header of the request
+
+        Returns:
+            Tuple[str, Optional[dict]]: The ETag of the debt status and its
+            response, None when if_none_match matches the ETag
+        """
+        cache_key = f'{debt_data.get("idConsulta")}:{debt_data.get("codigoProducto")}'
+
+        cached_etag = debt_status_etag_cache.get(cache_key)
+        cached_response = debt_status_cache.get(cache_key) if cached_etag is not None else None
+        if cached_response is not None:
+            etag = cached_etag.decode()
+            if etag_matches(if_none_match, etag):
+                return etag, None
+            return etag, json.loads(cached_response)
+
+        version = await DebtRepository.get_client_debts_version(
+            debt_data["idConsulta"],
+            debt_data["codigoProducto"]
+        )
+        etag = f'"{hashlib.blake2b(repr(version).encode(), digest_size=8).hexdigest()}"'
+        if etag_matches(if_none_match, etag):
+            return etag, None
+
+        client_name, debts = await DebtRepository.get_client_pending_debts(
+            debt_data["idConsulta"],
+            debt_data["codigoProducto"]
+        )
+        response = DebtAdapter._debt_status_response(cache_key, client_name, debts)
+
+        # A payment written between the two reads makes the response newer than the
+        # ETag. The client still gets the older ETag, which only costs it a full
+        # response on its next poll, but the pair is not cached.
+        if version != await DebtRepository.get_client_debts_version(
+            debt_data["idConsulta"],
+            debt_data["codigoProducto"]
+        ):
+            debt_status_cache.delete(cache_key)
+        elif response["CodigoRespuesta"] == "00":
+            debt_status_etag_cache.set(cache_key, etag.encode())
+
+        return etag, response
+
+    @staticmethod
+    async def checking_debts_status(debts_data: List[dict]) -> List[dict]:
+        """
+        Check the debt status of many clients with one query
+
+        Each (idConsulta, codigoProducto) gets the response checking_debt_status
+        gives it. Cached responses are answered from the cache, the clients and
+        pending debts of the others are read with one query using IN lists of
+        their clients and products.
+
+        Args:
+            debts_data (List[dict]): Debt data of each client
+
+        Returns:
+            List[dict]: The response of each client, in order
+        """
+        cache_keys = [
+            f'{debt_data.get("idConsulta")}:{debt_data.get("codigoProducto")}' for debt_data in debts_data
+        ]
+        responses = {}
+        for cache_key in cache_keys:
+            if cache_key not in responses:
+                cached_response = debt_status_cache.get(cache_key)
+                if cached_response is not None:
+                    responses[cache_key] = json.loads(cached_response)
+
+        missing = [
+            (debt_data["idConsulta"], debt_data["codigoProducto"])
+            for cache_key, debt_data in zip(cache_keys, debts_data)
+            if cache_key not in responses
+        ]
+        if missing:
+            client_names, debts = await DebtRepository.get_clients_pending_debts(
+                sorted({client_identifier for client_identifier, _ in missing}),
+                sorted({product_code for _, product_code in missing})
+            )
+            for client_identifier, product_code in missing:
+                cache_key = f"{client_identifier}:{product_code}"
+                if cache_key not in responses:
+                    responses[cache_key] = DebtAdapter._debt_status_response(
+                        cache_key,
+                        client_names.get(client_identifier),
+                        debts.get((client_identifier, product_code), [])
+                    )
+
+        return [responses[cache_key] for cache_key in cache_keys]
+
+    @staticmethod
+    def _debt_status_response(cache_key: str, client_name: Optional[str], debts: List[PendingDebtRow]) -> dict:
+        """
+        Debt status response of a client, cached when it has pending debts
+
+        Args:
+            cache_key (str): Cache key of the client and product
+            client_name (Optional[str]): Name of the client, None if it does not exist
+            debts (List[PendingDebtRow]): Pending debts of the client for the product
+
+        Returns:
+            dict: Debt status response
+        """
+        if client_name is None:
+            return {
+                "Cliente": "",
+                "CodigoRespuesta": "16",
+                "DescRespuesta": "OK",
+                "deudasPendientes": []
+            }
+
+        if not debts:
+            return {
+                "Cliente": "",
+                "CodigoRespuesta": "22",
+                "DescRespuesta": "CLIENTE SIN DEUDAS PENDIENTES",
+                "deudasPendientes": []
+            }
+
+        response = DebtAdapter._formating_debts(debts, client_name)
+        debt_status_cache.set(cache_key, json.dumps(response).encode())
+
+        return response
+
+    @staticmethod
+    async def bulk_create_debts(rows: List[Tuple[int, dict]], create_clients: bool) -> dict:
+        """
+        Create many validated debts with one prepared INSERT per chunk
+
+        Existing clients and debts are looked up with one IN query per chunk, and
+        the clients and debts are inserted in chunks of DEBT_BULK_CHUNK_SIZE rows,
+        each chunk with the driver's executemany in a savepoint. A chunk rejected
+        by the database is inserted again row by row, so only its failing rows
+        are reported.
+
+        Args:
+            rows (List[Tuple[int, dict]]): Row number and DebtBulkRow data of each debt
+            create_clients (bool): Create the clients that do not exist
+
+        Returns:
+            dict: Created debts, per-row errors and number of created clients
+        """
+        errors = {}
+        now = datetime.now()
+
+        seen_identifiers = set()
+        for row_number, row in rows:
+            operation_identifier = row["numDocumento"]
+            if operation_identifier is None:
+                continue
+            if operation_identifier in seen_identifiers:
+                errors[row_number] = "numDocumento: Repeated in the request"
+            seen_identifiers.add(operation_identifier)
+
+        existing_identifiers = await DebtAdapter._find_existing(
+            DebtRepository.get_existing_operation_identifiers, sorted(seen_identifiers)
+        )
+        client_identifiers = sorted({row["idCliente"] for _, row in rows})
+        existing_clients = await DebtAdapter._find_existing(
+            ClientRepository.get_existing_document_identifiers, client_identifiers
+        )
+
+        new_clients = {}
+        for row_number, row in rows:
+            if row_number in errors:
+                continue
+            if row["numDocumento"] in existing_identifiers:
+                errors[row_number] = "numDocumento: Already exists"
+            elif row["idCliente"] in existing_clients or row["idCliente"] in new_clients:
+                continue
+            elif not create_clients:
+                errors[row_number] = "idCliente: Client does not exist"
+            elif row["nombreCliente"] is None:
+                errors[row_number] = "nombreCliente: Required to create the client"
+            else:
+                new_clients[row["idCliente"]] = (row_number, {
+                    "document_identifier": row["idCliente"],
+                    "name": row["nombreCliente"],
+                    "company": row["empresa"],
+                    "product_type": row["tipoProducto"],
+                    "date_created": now,
+                    "date_updated": now,
+                })
+
+        client_errors = {}
+        created_clients = await DebtAdapter._insert_in_chunks(
+            ClientRepository.insert_clients,
+            list(new_clients.values()),
+            Client,
+            client_errors,
+            "idCliente: Already exists"
+        )
+        existing_clients.update(created_clients.values())
+        # A client created by a concurrent request since the lookup can take the debts.
+        existing_clients.update(
+            client["document_identifier"]
+            for row_number, client in new_clients.values()
+            if client_errors.get(row_number) == "idCliente: Already exists"
+        )
+
+        if any(row["numDocumento"] is None for _, row in rows):
+            await DebtRepository.claim_operation_identifier_node()
+
+        debts = []
+        for row_number, row in rows:
+            if row_number in errors:
+                continue
+            if row["idCliente"] not in existing_clients:
+                errors[row_number] = "idCliente: Client could not be created"
+                continue
+            debts.append((row_number, {
+                "operation_identifier": (
+                    row["numDocumento"] or DebtDomain.generate_sortable_operation_identifier()
+                ),
+                "client": row["idCliente"],
+                "description": row["descDocumento"],
+                "emition_date": parse_date(row["fechaEmision"]),
+                "expiration_date": parse_date(row["fechaVencimiento"]),
+                "total_debt": row["deuda"],
+                "default_debt": row["mora"],
+                "administration_expenses": row["gastosAdm"],
+                "minimum_payment": row["pagoMinimo"],
+                "period": row["periodo"],
+                "fee": row["cuota"],
+                "product_code": row["codigoProducto"],
+                "currency": row["monedaDoc"],
+                "date_created": now,
+                "created_by": None,
+                "date_updated": now,
+                "updated_by": None,
+            }))
+
+        created_debts = await DebtAdapter._insert_in_chunks(
+            DebtRepository.insert_debts,
+            debts,
+            Debt,
+            errors,
+            "numDocumento: Already exists"
+        )
+
+        return {
+            "created": [
+                {"fila": row_number, "numDocumento": operation_identifier}
+                for row_number, operation_identifier in sorted(created_debts.items())
+            ],
+            "errors": errors,
+            "created_clients": len(created_clients),
+        }
+
+    @staticmethod
+    async def _find_existing(
+        find: Callable[[List[str]], Awaitable[set]],
+        identifiers: List[str]
+    ) -> set:
+        """
+        Run an IN query per chunk of identifiers
+
+        Args:
+            find (Callable): Repository lookup returning the identifiers found
+            identifiers (List[str]): Identifiers to look up
+
+        Returns:
+            set: Identifiers found in the database
+        """
+        existing = set()
+        for chunk in chunked(identifiers, min(settings.debt_bulk_chunk_size, MAX_BIND_PARAMETERS)):
+            existing.update(await find(chunk))
+        return existing
+
+    @staticmethod
+    async def _insert_in_chunks(
+        insert: Callable[[List[dict]], Awaitable[None]],
+        rows: List[Tuple[int, dict]],
+        model: Type[ormar.Model],
+        errors: dict,
+        conflict_error: str
+    ) -> dict:
+        """
+        Insert rows with one repository call per chunk
+
+        A chunk that fails is inserted again row by row, and the error of each
+        row that still fails is recorded in errors.
+
+        Args:
+            insert (Callable): Repository insert of a list of rows
+            rows (List[Tuple[int, dict]]): Row number and column values of each row
+            model (Type[ormar.Model]): Model of the rows, for their primary key
+            errors (dict): Errors by row number, updated in place
+            conflict_error (str): Error of a row violating a unique constraint
+
+        Returns:
+            dict: Primary key of each inserted row, by row number
+        """
+        primary_key = model.Meta.pkname
+        inserted = {}
+
+        for chunk in chunked(rows, settings.debt_bulk_chunk_size):
+            try:
+                await insert([values for _, values in chunk])
+            except Exception as e:
+                logging.warning(f"Bulk insert of {len(chunk)} rows failed, retrying row by row: {e}")
+            else:
+                inserted.update((row_number, values[primary_key]) for row_number, values in chunk)
+                continue
+
+            for row_number, values in chunk:
+                try:
+                    await insert([values])
+                except UNIQUE_VIOLATION_ERRORS:
+                    errors[row_number] = conflict_error
+                except Exception as e:
+                    logging.error(e)
+                    errors[row_number] = "Could not be inserted"
+                else:
+                    inserted[row_number] = values[primary_key]
+
+        return inserted
+
+    @staticmethod
+    async def export_debts(
+        product_code: Optional[str] = None,
+        currency: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Read the debts matching the filters, one page of DEBT_EXPORT_PAGE_SIZE at a time
+
+        The debts have the fields of a /v1/debts/bulk row, so an export can be
+        imported again, with the name of the client and the status of the debt.
+
+        Args:
+            product_code (Optional[str]): Only the debts of this product
+            currency (Optional[str]): Only the debts in this currency
+            status (Optional[str]): Only the "pending" or the "paid" debts
+
+        Yields:
+            dict: Each debt, in operation identifier order
+        """
+        async for debt in DebtRepository.stream_debts(
+            product_code=product_code,
+            currency=currency,
+            status=status,
+            page_size=settings.debt_export_page_size
+        ):
+            yield {
+                "numDocumento": debt["operation_identifier"],
+                "idCliente": debt["client"],
+                "nombreCliente": debt["client_name"],
+                "codigoProducto": debt["product_code"],
+                "descDocumento": debt["description"],
+                "fechaEmision": debt["emition_date"].strftime('%d%m%Y'),
+                "fechaVencimiento": debt["expiration_date"].strftime('%d%m%Y'),
+                "deuda": float(debt["total_debt"]),
+                "mora": float(debt["default_debt"]),
+                "gastosAdm": float(debt["administration_expenses"]),
+                "pagoMinimo": float(debt["minimum_payment"]),
+                "periodo": debt["period"],
+                "cuota": debt["fee"],
+                "monedaDoc": debt["currency"],
+                "estado": debt["status"],
+            }
+
+    @staticmethod
+    def invalidate_debt_status(client_identifier: str, product_code: str) -> None:
+        """
+        Drop the cached debt status of a client for a product
+
+        Args:
+            client_identifier (str): Document identifier of the client
+            product_code (str): Product code of the debt
+        """
+        debt_status_cache.delete(f"{client_identifier}:{product_code}")
+        debt_status_etag_cache.delete(f"{client_identifier}:{product_code}")
+
+    @staticmethod
+    def _formating_debts(debts: list[PendingDebtRow], client_name: str) -> dict:
         """
         Format the debts data
 
         Args:
-            debts (list): List of debts
+            debts (list): Pending debt rows, or Debt models with the same attributes
+            client_name (str): Name of the client owning the debts
 
         Returns:
             dict: Formatted response data
@@ -83,10 +497,9 @@ class DebtAdapter:
             }
 
             debt_list.append(debt_data)
-            
-        print(f"Valor de Cliente antes de la validación: {cliente}")
+
         return {
-            "Cliente": cliente.name,
+            "Cliente": client_name,
             "CodigoRespuesta": "00",
             "DescRespuesta": "OK",
             "deudasPendientes": debt_list
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from app.infrastructure import IdempotencyRepository
+from app.settings import settings
+
+
+# Response of a batch item whose request is in flight in another call.
+IN_FLIGHT_RESPONSE = {
+    "codigoRespuesta": "99",
+    "nombreCliente": "",
+    "numOperacionERP": "",
+    "descripcionResp": "OPERACION EN PROCESO",
+}
+
+
+class IdempotencyAdapter:
+    @staticmethod
+    async def process(
+        operation: str,
+        bank_code: str,
+        operation_bank_number: str,
+        handler: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """ Process a bank request once per (codigoBanco, numOperacionBanco, operation)
+
+        The first call marks the request as in flight and runs the handler. Its
+        response is stored when it succeeds, and duplicates of the request get the
+        stored response back without running the handler until the retention
+        passes. Duplicates arriving while the request is in flight wait for it.
+        Failed responses and exceptions drop the marker, so a retry processes the
+        request again.
+
+        Args:
+            operation (str): Name of the operation, "payment" or "revert".
+            bank_code (str): codigoBanco of the request.
+            operation_bank_number (str): numOperacionBanco of the request.
+            handler (Callable[[], Awaitable[dict]]): Processes the request.
+
+        Returns:
+            dict: The response of the handler, or the stored one for duplicates.
+
+        Raises:
+            TimeoutError: If the request is still in flight after
+            settings.idempotency_wait_timeout seconds.
+        """
+        request_key = IdempotencyAdapter.request_key(operation, bank_code, operation_bank_number)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + settings.idempotency_wait_timeout
+
+        while True:
+            entry = await IdempotencyRepository.claim(
+                request_key, token, settings.idempotency_in_flight_ttl
+            )
+
+            if entry is not None and entry["token"] == token:
+                break
+
+            if entry is not None and entry["response"] is not None:
+                return json.loads(entry["response"])
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Request {request_key} is still in flight.")
+
+            await asyncio.sleep(settings.idempotency_poll_interval)
+
+        try:
+            response = await handler()
+        except BaseException:
+            await IdempotencyRepository.release(request_key, token)
+            raise
+
+        if response.get("codigoRespuesta") == "00":
+            await IdempotencyRepository.complete(
+                request_key, token, response, settings.idempotency_retention
+            )
+        else:
+            await IdempotencyRepository.release(request_key, token)
+
+        return response
+
+    @staticmethod
+    def request_key(operation: str, bank_code: str, operation_bank_number: str) -> str:
+        """ Key of a bank request in the idempotency_key table
+
+        Args:
+            operation (str): Name of the operation, "payment" or "revert".
+            bank_code (str): codigoBanco of the request.
+            operation_bank_number (str): numOperacionBanco of the request.
+
+        Returns:
+            str: The key of the request.
+        """
+        return f"{operation}:{bank_code}:{operation_bank_number}"
+
+    @staticmethod
+    async def claim_batch(request_keys: List[str], token: str) -> Tuple[Dict[str, int], Dict[str, dict]]:
+        """ Claim the requests of a batch, the batch counterpart of process
+
+        Meant to run in the transaction that processes the claimed requests, so
+        the claims, the writes and the stored responses commit together. Requests
+        in flight in another call are not waited for, they get IN_FLIGHT_RESPONSE.
+
+        Args:
+            request_keys (List[str]): Key of each request of the batch.
+            token (str): Unique identifier of the batch.
+
+        Returns:
+            Tuple[Dict[str, int], Dict[str, dict]]: Index of the first request of
+            each claimed key, and the response of the other keys.
+        """
+        entries = await IdempotencyRepository.claim_many(
+            list(dict.fromkeys(request_keys)), token, settings.idempotency_in_flight_ttl
+        )
+
+        claimed = {}
+        responses = {}
+        for index, request_key in enumerate(request_keys):
+            if request_key in claimed or request_key in responses:
+                continue
+
+            entry = entries.get(request_key)
+            if entry is not None and entry["token"] == token:
+                claimed[request_key] = index
+            elif entry is not None and entry["response"] is not None:
+                responses[request_key] = json.loads(entry["response"])
+            else:
+                responses[request_key] = IN_FLIGHT_RESPONSE
+
+        return claimed, responses
+
+    @staticmethod
+    async def complete_batch(responses: Dict[str, dict], token: str) -> None:
+        """ Store the successful responses of claimed requests and release the others
+
+        Args:
+            responses (Dict[str, dict]): Response of each claimed request by key.
+            token (str): Unique identifier of the batch.
+        """
+        completed = {
+            request_key: response
+            for request_key, response in responses.items()
+            if response.get("codigoRespuesta") == "00"
+        }
+        await IdempotencyRepository.complete_many(completed, token, settings.idempotency_retention)
+        await IdempotencyRepository.release_many(
+            [request_key for request_key in responses if request_key not in completed], token
+        )
+
+    @staticmethod
+    async def invalidate(operation: str, requests: Iterable[Tuple[str, str]]) -> None:
+        """ Drop the stored responses of requests whose effect was undone
+
+        Meant to run in the transaction that undoes them, such as a revert of
+        payments, so a retry of a reverted payment is applied again instead of
+        getting its old response back.
+
+        Args:
+            operation (str): Name of the operation, "payment" or "revert".
+            requests (Iterable[Tuple[str, str]]): codigoBanco and numOperacionBanco
+                of each request.
+        """
+        await IdempotencyRepository.delete_responses(list(dict.fromkeys(
+            IdempotencyAdapter.request_key(operation, bank_code, operation_bank_number)
+            for bank_code, operation_bank_number in requests
+        )))
+
+    @staticmethod
+    async def purge_expired_periodically(interval: float) -> None:
+        """ Delete the expired responses every interval seconds until cancelled
+
+        Args:
+            interval (float): Seconds between two deletions.
+        """
+        while True:
+            try:
+                await IdempotencyRepository.purge_expired()
+            except Exception as e:
+                logging.warning(f"Expired idempotency keys were not purged: {e}")
+
+            await asyncio.sleep(interval)
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.infrastructure import OutboxRepository
+from app.infrastructure.outbox_sink import OutboxSink
+from app.settings import settings
+
+
+# Delivery counters of the dispatcher of this worker.
+dispatch_metrics = {
+    "delivered": 0,
+    "failed_deliveries": 0,
+    "last_delivery_lag": None,
+    "last_error": None,
+}
+
+# Set by the writers of events, so the dispatcher does not wait for its next poll.
+_wake_up: Optional[asyncio.Event] = None
+
+
+class OutboxAdapter:
+    @staticmethod
+    def notify() -> None:
+        """ Wake the dispatcher of this worker up after events are committed """
+        if _wake_up is not None:
+            _wake_up.set()
+
+    @staticmethod
+    async def dispatch_once(sink: OutboxSink, batch_size: int) -> int:
+        """ Deliver the oldest due events to the sink in one batch
+
+        A failed delivery is retried with exponential backoff, from
+        OUTBOX_RETRY_BASE_DELAY up to OUTBOX_RETRY_MAX_DELAY seconds. Delivery is
+        at least once: the events of a delivery that stops before they are
+        dropped are delivered again after OUTBOX_LEASE seconds.
+
+        Args:
+            sink (OutboxSink): Destination of the events.
+            batch_size (int): Maximum events of the batch.
+
+        Returns:
+            int: The number of events delivered.
+        """
+        token = uuid.uuid4().hex
+        now = datetime.now()
+        events = await OutboxRepository.claim_due_events(
+            token, batch_size, now + timedelta(seconds=settings.outbox_lease)
+        )
+        if not events:
+            return 0
+
+        try:
+            await sink.send([
+                {
+                    "id": event["id"],
+                    "evento": event["event_type"],
+                    "fecha": event["date_created"].isoformat(),
+                    "datos": event["payload"],
+                }
+                for event in events
+            ])
+        except Exception as e:
+            attempts = max(event["attempts"] for event in events)
+            delay = min(
+                settings.outbox_retry_base_delay * 2 ** (attempts - 1),
+                settings.outbox_retry_max_delay
+            )
+            await OutboxRepository.retry_events(token, datetime.now() + timedelta(seconds=delay), str(e))
+            dispatch_metrics["failed_deliveries"] += 1
+            dispatch_metrics["last_error"] = str(e)
+            logging.warning(f"Delivery of {len(events)} outbox events failed, retry in {delay:.0f}s: {e}")
+            return 0
+
+        await OutboxRepository.delete_events(token)
+
+        lag = (datetime.now() - min(event["date_created"] for event in events)).total_seconds()
+        dispatch_metrics["delivered"] += len(events)
+        dispatch_metrics["last_delivery_lag"] = lag
+        logging.info(f"Delivered {len(events)} outbox events, oldest written {lag:.3f}s ago")
+        return len(events)
+
+    @staticmethod
+    async def dispatch_periodically(interval: float, sink: OutboxSink) -> None:
+        """ Drain the outbox until cancelled, waiting for new events when it is empty
+
+        Args:
+            interval (float): Seconds between two looks at a drained outbox.
+            sink (OutboxSink): Destination of the events, closed when cancelled.
+        """
+        global _wake_up
+        _wake_up = asyncio.Event()
+
+        try:
+            while True:
+                try:
+                    delivered = await OutboxAdapter.dispatch_once(sink, settings.outbox_batch_size)
+                except Exception as e:
+                    logging.warning(f"Outbox events were not dispatched: {e}")
+                    delivered = 0
+
+                if delivered < settings.outbox_batch_size:
+                    try:
+                        await asyncio.wait_for(_wake_up.wait(), interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    _wake_up.clear()
+        finally:
+            _wake_up = None
+            await sink.close()
+
+    @staticmethod
+    async def metrics() -> dict:
+        """ Backlog of the outbox and delivery counters of this worker
+
+        Returns:
+            dict: Undelivered events, seconds since the oldest of them was written,
+            and the counters of the dispatcher
+        """
+        pending, oldest = await OutboxRepository.get_backlog()
+
+        return {
+            "pending": pending,
+            "lag": (datetime.now() - oldest).total_seconds() if oldest is not None else 0.0,
+            **dispatch_metrics,
+        }
@@ -1,17 +1,33 @@
 import logging
+import uuid
+from typing import List
 
 from ormar import NoMatch
 
+from app.adapter.debt_adapter import DebtAdapter
+from app.adapter.idempotency_adapter import IdempotencyAdapter
+from app.adapter.outbox_adapter import OutboxAdapter
+from app.database.config import database
 from app.domain.payment_domain import PaymentDomain
-from app.infrastructure import PaymentRepository
+from app.infrastructure import OutboxRepository, PaymentRepository
 from app.infrastructure.debt_repository import DebtRepository
 
 
+# Operation whose stored responses a status change undoes: a payment set back to
+# pending by a revert is applied again on a retry, and the other way around.
+UNDONE_OPERATION = {"paid": "revert", "pending": "payment"}
+
+
 class PaymentAdapter:
     @staticmethod
     async def update_payments(payment_data: dict, status: str = "paid") -> dict:
         """ Send payment data to repository
 
+        The debt is locked while its payment is written, so payments and reverts
+        of the same debt arriving together are applied one after another. The
+        outbox event of the status change is written in the same transaction, and
+        the stored responses of the operation it undoes are dropped in it.
+
         Args:
             payment (dict): Payment data
 
@@ -28,18 +44,41 @@ class PaymentAdapter:
         """
 
         try:
-            debt = await DebtRepository.get_debt_by_operation_identifier(
-                payment_data['numDocumento']
-            )
-
             domain_payment = PaymentDomain.formating_fields(payment_data, status)
 
-            payment = await PaymentAdapter._update_or_create_payment(debt, domain_payment)
+            # The debt stays locked until the transaction ends, keep it to the write.
+            debt = None
+            try:
+                async with database.transaction():
+                    debt = await DebtRepository.lock_debt_by_operation_identifier(
+                        payment_data['numDocumento']
+                    )
+                    payment = await PaymentAdapter._update_or_create_payment(debt, domain_payment)
+                    await OutboxRepository.add_events([
+                        PaymentDomain.status_event(
+                            status,
+                            debt.pk,
+                            debt.client.pk,
+                            debt.product_code,
+                            payment.id,
+                            payment_data.get("codigoBanco"),
+                            payment_data.get("numOperacionBanco")
+                        )
+                    ])
+                    await IdempotencyAdapter.invalidate(
+                        UNDONE_OPERATION[status],
+                        [(payment_data.get("codigoBanco"), payment_data.get("numOperacionBanco"))]
+                    )
+            finally:
+                if debt is not None:
+                    DebtAdapter.invalidate_debt_status(debt.client.pk, debt.product_code)
+
+            OutboxAdapter.notify()
 
             return {
                 "codigoRespuesta": "00",
                 "nombreCliente": debt.client.name,
-                "numOperacionERP": payment.id,
+                "numOperacionERP": str(payment.id),
                 "descripcionResp": "OK",
             }
 
@@ -56,20 +95,133 @@ class PaymentAdapter:
             raise e
 
     @staticmethod
-    async def _update_or_create_payment(debt: dict, payment_data: dict) -> dict:
+    async def update_payments_batch(
+        payments_data: List[dict],
+        operation: str = "payment",
+        status: str = "paid"
+    ) -> List[dict]:
+        """ Apply a chunk of payment notifications in one transaction
+
+        The notifications are claimed like single ones (see IdempotencyAdapter),
+        their debts are locked with one IN query and their payments written with
+        set-based statements. The claims, the payments, their outbox events, the
+        stored responses and the dropped responses of the undone operation commit
+        together.
+
+        Args:
+            payments_data (List[dict]): Validated payment data of each notification
+            operation (str): Idempotency operation, "payment" or "revert"
+            status (str): Status the payments are set to
+
+        Returns:
+            List[dict]: The response of each notification, in order
+        """
+        token = uuid.uuid4().hex
+        request_keys = [
+            IdempotencyAdapter.request_key(
+                operation, payment_data["codigoBanco"], payment_data["numOperacionBanco"]
+            )
+            for payment_data in payments_data
+        ]
 
+        debts = {}
         try:
-            payments = await PaymentRepository.get_payments_by_debt(
-                debt=debt
+            async with database.transaction():
+                claimed, responses = await IdempotencyAdapter.claim_batch(request_keys, token)
+                if claimed:
+                    claimed_payments = [payments_data[index] for index in claimed.values()]
+                    debts = await DebtRepository.lock_debts_by_operation_identifiers(
+                        {payment_data["numDocumento"] for payment_data in claimed_payments}
+                    )
+                    claimed_responses = await PaymentAdapter._upsert_payments(
+                        claimed_payments, debts, status
+                    )
+                    await IdempotencyAdapter.invalidate(UNDONE_OPERATION[status], [
+                        (payment_data["codigoBanco"], payment_data["numOperacionBanco"])
+                        for payment_data, response in zip(claimed_payments, claimed_responses)
+                        if response["codigoRespuesta"] == "00"
+                    ])
+                    responses.update(zip(claimed, claimed_responses))
+                    await IdempotencyAdapter.complete_batch(
+                        {request_key: responses[request_key] for request_key in claimed}, token
+                    )
+        finally:
+            for debt in debts.values():
+                DebtAdapter.invalidate_debt_status(debt.client.pk, debt.product_code)
+
+        OutboxAdapter.notify()
+        return [responses[request_key] for request_key in request_keys]
+
+    @staticmethod
+    async def _upsert_payments(payments_data: List[dict], debts: dict, status: str) -> List[dict]:
+        """ Write the payments of locked debts
+
+        Notifications of the same debt write one payment, as consecutive
+        update_payments calls of a debt would, and one outbox event.
+
+        Args:
+            payments_data (List[dict]): Payment data of each notification
+            debts (dict): Locked debts by operation identifier
+            status (str): Status the payments are set to
+
+        Returns:
+            List[dict]: The response of each notification, in order
+        """
+        payments_by_debt = {}
+        for payment_data in payments_data:
+            if payment_data["numDocumento"] in debts and payment_data["numDocumento"] not in payments_by_debt:
+                payments_by_debt[payment_data["numDocumento"]] = {
+                    "debt": payment_data["numDocumento"],
+                    **PaymentDomain.formating_fields(payment_data, status)
+                }
+
+        first_payments = await PaymentRepository.upsert_payments(list(payments_by_debt.values()))
+        await OutboxRepository.add_events([
+            PaymentDomain.status_event(
+                status,
+                operation_identifier,
+                debts[operation_identifier].client.pk,
+                debts[operation_identifier].product_code,
+                first_payments[operation_identifier],
+                payment["bank_code"],
+                payment["operation_bank_number"]
             )
+            for operation_identifier, payment in payments_by_debt.items()
+            if operation_identifier in first_payments
+        ])
+
+        responses = []
+        for payment_data in payments_data:
+            debt = debts.get(payment_data["numDocumento"])
+            if debt is None:
+                responses.append({
+                    "codigoRespuesta": "99",
+                    "nombreCliente": "",
+                    "numOperacionERP": "",
+                    "descripcionResp": "DEUDA NO ENCONTRADA",
+                })
+            elif debt.pk not in first_payments:
+                responses.append({
+                    "codigoRespuesta": "99",
+                    "nombreCliente": "",
+                    "numOperacionERP": "",
+                    "descripcionResp": "ERROR DESCONOCIDO",
+                })
+            else:
+                responses.append({
+                    "codigoRespuesta": "00",
+                    "nombreCliente": debt.client.name,
+                    "numOperacionERP": str(first_payments[debt.pk]),
+                    "descripcionResp": "OK",
+                })
+
+        return responses
 
-            if payments:
-                return await PaymentRepository.update_payment_status(
-                    debt=debt,
-                    status=payment_data['status']
-                )
+    @staticmethod
+    async def _update_or_create_payment(debt: dict, payment_data: dict) -> dict:
 
-            return await PaymentRepository.create_payment(
+        try:
+            return await PaymentRepository.upsert_payment(
                 debt=debt,
                 emition_date=payment_data['emition_date'],
                 bank_code=payment_data['bank_code'],
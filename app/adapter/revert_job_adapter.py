@@ -0,0 +1,178 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+from typing import Dict, List, Optional
+
+from app.adapter.debt_adapter import DebtAdapter
+from app.adapter.idempotency_adapter import IdempotencyAdapter
+from app.adapter.outbox_adapter import OutboxAdapter
+from app.database.config import database
+from app.domain.payment_domain import PaymentDomain
+from app.infrastructure import OutboxRepository, PaymentRepository, RevertJobRepository
+from app.settings import settings
+
+
+# Jobs run by this worker, by id.
+running_jobs: Dict[int, asyncio.Task] = {}
+
+
+class RevertJobAdapter:
+    @staticmethod
+    def start(job_id: int) -> None:
+        """ Run a revert job in the background of this worker, unless it already runs it
+
+        Args:
+            job_id (int): The id of the job.
+        """
+        if job_id in running_jobs:
+            return
+
+        task = asyncio.create_task(RevertJobAdapter.run(job_id))
+        running_jobs[job_id] = task
+        task.add_done_callback(lambda _: running_jobs.pop(job_id, None))
+
+    @staticmethod
+    async def run(job_id: int) -> None:
+        """ Revert the payments of a job, one chunk per transaction, until none is left
+
+        The job is claimed first, so a job runs in one worker at a time. Each chunk
+        renews the heartbeat of the claim and saves the cursor of the job in the
+        transaction of its payments, so a job that stops is resumed after its last
+        committed chunk. The pause between chunks lets the payments of the banks
+        take the locks. The operation bank numbers of a job given as a list are
+        read once, before its first chunk.
+
+        Args:
+            job_id (int): The id of the job.
+        """
+        token = uuid.uuid4().hex
+        if not await RevertJobRepository.claim_job(job_id, token, settings.revert_job_heartbeat_ttl):
+            return
+
+        logging.info(f"Revert job {job_id} started")
+        try:
+            operation_bank_numbers = await RevertJobRepository.get_operation_bank_numbers(job_id)
+            while True:
+                done = await RevertJobAdapter.revert_chunk(
+                    job_id, token, settings.revert_job_chunk_size, operation_bank_numbers
+                )
+                if done is None:
+                    logging.warning(f"Revert job {job_id} was taken over by another worker")
+                    return
+                if done:
+                    break
+                await asyncio.sleep(settings.revert_job_chunk_pause)
+        except asyncio.CancelledError:
+            with contextlib.suppress(Exception):
+                await asyncio.shield(RevertJobRepository.release_job(job_id, token))
+            raise
+        except Exception as e:
+            logging.error(f"Revert job {job_id} failed: {e}")
+            await RevertJobRepository.finish_job(job_id, token, "failed", str(e))
+            return
+
+        await RevertJobRepository.finish_job(job_id, token, "completed")
+        logging.info(f"Revert job {job_id} completed")
+
+    @staticmethod
+    async def revert_chunk(
+        job_id: int,
+        token: str,
+        chunk_size: int,
+        operation_bank_numbers: Optional[List[str]]
+    ) -> Optional[bool]:
+        """ Revert the next chunk of payments of a claimed job in one transaction
+
+        The stored responses of the reverted payments are dropped in the same
+        transaction, so a bank retrying one of them gets it applied again.
+
+        Args:
+            job_id (int): The id of the job.
+            token (str): The token the job was claimed with.
+            chunk_size (int): Maximum payments of the chunk, or operation bank
+                numbers for a job given as a list.
+            operation_bank_numbers (Optional[List[str]]): The operation bank numbers
+                of a job given as a list, None for a job of a bank and dates.
+
+        Returns:
+            Optional[bool]: Whether the job has no payments left, None if the claim
+            was taken over by another worker.
+        """
+        payments = []
+        try:
+            async with database.transaction():
+                job = await RevertJobRepository.lock_job(job_id, token)
+                if job is None:
+                    return None
+
+                if operation_bank_numbers is not None:
+                    chunk = operation_bank_numbers[job["cursor"]:job["cursor"] + chunk_size]
+                    if chunk:
+                        payments = await PaymentRepository.lock_paid_payments(operation_bank_numbers=chunk)
+                    cursor = job["cursor"] + len(chunk)
+                    done = cursor >= len(operation_bank_numbers)
+                else:
+                    payments = await PaymentRepository.lock_paid_payments(
+                        bank_code=job["bank_code"],
+                        date_from=job["date_from"],
+                        date_to=job["date_to"],
+                        after_id=job["cursor"],
+                        limit=chunk_size
+                    )
+                    cursor = payments[-1]["id"] if payments else job["cursor"]
+                    done = len(payments) < chunk_size
+
+                await PaymentRepository.set_payments_status([payment["id"] for payment in payments], "pending")
+                await OutboxRepository.add_events([
+                    PaymentDomain.status_event(
+                        "pending",
+                        payment["debt"],
+                        payment["client"],
+                        payment["product_code"],
+                        payment["id"],
+                        payment["bank_code"],
+                        payment["operation_bank_number"]
+                    )
+                    for payment in payments
+                ])
+                await IdempotencyAdapter.invalidate(
+                    "payment", [(payment["bank_code"], payment["operation_bank_number"]) for payment in payments]
+                )
+                await RevertJobRepository.advance_job(job_id, token, cursor, len(payments))
+        finally:
+            for client, product_code in {(payment["client"], payment["product_code"]) for payment in payments}:
+                DebtAdapter.invalidate_debt_status(client, product_code)
+
+        OutboxAdapter.notify()
+        logging.info(f"Revert job {job_id}: {len(payments)} payments reverted, cursor {cursor}")
+        return done
+
+    @staticmethod
+    async def resume_unfinished_periodically(interval: float) -> None:
+        """ Start the unfinished jobs every interval seconds until cancelled
+
+        Jobs claimed by a live worker are skipped by the claim, the others are
+        resumed, such as the jobs of a worker that stopped.
+
+        Args:
+            interval (float): Seconds between two looks for unfinished jobs.
+        """
+        while True:
+            try:
+                for job_id in await RevertJobRepository.get_unfinished_job_ids():
+                    RevertJobAdapter.start(job_id)
+            except Exception as e:
+                logging.warning(f"Unfinished revert jobs were not resumed: {e}")
+
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def stop() -> None:
+        """ Cancel the jobs run by this worker, their claims are released """
+        tasks = list(running_jobs.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
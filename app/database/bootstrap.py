@@ -0,0 +1,11 @@
+"""Create the tables of the models in the configured database.
+
+Usage:
+    python -m app.database.bootstrap
+"""
+from app.database.config import create_schema, database
+
+
+if __name__ == "__main__":
+    create_schema()
+    print(f"Schema created in {database.url.obscure_password}")
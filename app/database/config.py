@@ -1,3 +1,12 @@
+import asyncio
+import functools
+import logging
+import sqlite3
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import asyncpg
 import databases
 import ormar
 import sqlalchemy
@@ -5,7 +14,155 @@ import sqlalchemy
 from app.settings import settings
 
 
-database = databases.Database(settings.db_url)
+ASYNCPG_SCHEMES = ("postgresql", "postgres")
+SQLITE_SCHEMES = ("sqlite",)
+# Bound parameters of a statement: asyncpg accepts 32767, SQLite 32766 since 3.32.
+MAX_BIND_PARAMETERS = 32766
+# Driver errors raised when an insert violates a primary key or unique constraint.
+UNIQUE_VIOLATION_ERRORS = (asyncpg.UniqueViolationError, sqlite3.IntegrityError)
+# Errors of a replica that cannot be reached, its reads are retried on the primary.
+REPLICA_CONNECTION_ERRORS = (OSError, asyncpg.PostgresConnectionError, asyncio.TimeoutError)
+
+T = TypeVar("T")
+
+_read_from_replica: ContextVar[bool] = ContextVar("read_from_replica", default=False)
+
+
+def get_database_options(db_url: str) -> dict:
+    """ Build the connection options for the database backend.
+
+    Args:
+        db_url (str): The database URL.
+
+    Returns:
+        dict: Keyword arguments for asyncpg.create_pool, for aiosqlite.connect
+        with SQLite, empty for the other backends.
+    """
+    scheme = databases.DatabaseURL(db_url).scheme
+
+    if scheme in SQLITE_SCHEMES:
+        return {"timeout": settings.db_lock_timeout}
+
+    if scheme not in ASYNCPG_SCHEMES:
+        return {}
+
+    return {
+        "min_size": settings.db_pool_min_size,
+        "max_size": settings.db_pool_max_size,
+        "max_queries": settings.db_pool_max_queries,
+        "max_inactive_connection_lifetime": settings.db_pool_max_inactive_connection_lifetime,
+        "statement_cache_size": settings.db_statement_cache_size,
+        "server_settings": {"lock_timeout": f"{int(settings.db_lock_timeout * 1000)}ms"},
+    }
+
+
+async def warm_up_database(database: databases.Database) -> None:
+    """ Open and check the minimum number of pooled connections up front.
+
+    Each query runs in its own task, so each one holds a different connection
+    of the pool at the same time.
+
+    Args:
+        database (databases.Database): A connected database.
+    """
+    connections = get_database_options(str(database.url)).get("min_size", 1)
+    await asyncio.gather(*(database.fetch_val("SELECT 1") for _ in range(connections)))
+
+
+class RoutingDatabase(databases.Database):
+    """ Primary database that runs the queries of read_from_replica() on a replica.
+
+    The replica is connected and disconnected with the primary. Writes and
+    transactions always use the primary connection.
+    """
+
+    def __init__(self, url: str, replica: Optional[databases.Database] = None, **options):
+        """
+        Args:
+            url (str): URL of the primary database.
+            replica (Optional[databases.Database]): Read replica of the primary.
+            **options: Options of the primary connection pool.
+        """
+        super().__init__(url, **options)
+        if replica is not None and replica.url.scheme != self.url.scheme:
+            raise ValueError("The replica must use the same database backend as the primary")
+        self.replica = replica
+
+    async def connect(self) -> None:
+        await super().connect()
+        if self.replica is None:
+            return
+
+        try:
+            await self.replica.connect()
+        except Exception as e:
+            logging.warning("Replica unavailable, reads stay on the primary: %s", e)
+
+    async def disconnect(self) -> None:
+        if self.replica is not None and self.replica.is_connected:
+            await self.replica.disconnect()
+        await super().disconnect()
+
+    def connection(self) -> databases.core.Connection:
+        if self.replica is not None and _read_from_replica.get():
+            return self.replica.connection()
+        return super().connection()
+
+    async def read_from_replica(self, read: Callable[[], Awaitable[T]]) -> T:
+        """ Run a read-only operation on the replica, or on the primary if it
+        cannot be reached.
+
+        Only REPLICA_CONNECTION_ERRORS are retried on the primary, other errors
+        of the read, such as a failing query, are raised.
+
+        Args:
+            read (Callable[[], Awaitable[T]]): The operation, called once per attempt.
+
+        Returns:
+            T: The result of the operation.
+        """
+        if self.replica is None or not self.replica.is_connected:
+            return await read()
+
+        token = _read_from_replica.set(True)
+        try:
+            return await read()
+        except REPLICA_CONNECTION_ERRORS as e:
+            logging.warning("Replica read failed, retrying on the primary: %s", e)
+        finally:
+            _read_from_replica.reset(token)
+
+        return await read()
+
+
+def get_replica_database(replica_url: Optional[str]) -> Optional[databases.Database]:
+    """
+    Args:
+        replica_url (Optional[str]): URL of the read replica, if any.
+
+    Returns:
+        Optional[databases.Database]: The replica database, None without a URL.
+    """
+    if not replica_url:
+        return None
+
+    return databases.Database(replica_url, **get_database_options(replica_url))
+
+
+def reads_from_replica(read: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """ Decorator for the read-only repository methods routed to the replica. """
+    @functools.wraps(read)
+    async def wrapper(*args, **kwargs) -> T:
+        return await database.read_from_replica(lambda: read(*args, **kwargs))
+
+    return wrapper
+
+
+database = RoutingDatabase(
+    settings.db_url,
+    replica=get_replica_database(settings.db_replica_url),
+    **get_database_options(settings.db_url)
+)
 metadata = sqlalchemy.MetaData()
 
 
@@ -14,5 +171,22 @@ class BaseMeta(ormar.ModelMeta):
     database = database
 
 
-engine = sqlalchemy.create_engine(settings.db_url)
-metadata.create_all(engine)
+@lru_cache(maxsize=None)
+def get_engine() -> sqlalchemy.engine.Engine:
+    """ Synchronous engine, created the first time something needs it.
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine bound to settings.db_url.
+    """
+    return sqlalchemy.create_engine(settings.db_url)
+
+
+def create_schema() -> None:
+    """ Create the tables and indexes of the models that do not exist yet.
+
+    Deployments manage the schema with Alembic; this is for local databases
+    and tests. It opens a blocking connection, so it is never run on import.
+    """
+    import app.database.models  # noqa: F401 (registers the tables in metadata)
+
+    metadata.create_all(get_engine())
@@ -52,6 +52,9 @@ class Client(ormar.Model):
 class Debt(ormar.Model):
     class Meta(BaseMeta):
         tablename = "debt"
+        constraints = [
+            ormar.IndexColumns("client", "product_code", name="ix_debt_client_product_code"),
+        ]
 
     operation_identifier: str = ormar.String(
         primary_key=True,
@@ -179,6 +182,10 @@ class Debt(ormar.Model):
 class Payment(ormar.Model):
     class Meta(BaseMeta):
         tablename = "payment"
+        constraints = [
+            ormar.IndexColumns("debt", "status", name="ix_payment_debt_status"),
+            ormar.IndexColumns("bank_code", "emition_date", name="ix_payment_bank_code_emition_date"),
+        ]
 
     id: int = ormar.Integer(
         primary_key=True,
@@ -255,3 +262,251 @@ class Payment(ormar.Model):
         name="date_updated",
         description="Fecha de la última actualización del registro del pago"
     )
+
+
+class IdempotencyKey(ormar.Model):
+    class Meta(BaseMeta):
+        tablename = "idempotency_key"
+        constraints = [
+            ormar.IndexColumns("expires_at", name="ix_idempotency_key_expires_at"),
+        ]
+
+    request_key: str = ormar.String(
+        primary_key=True,
+        max_length=32,
+        nullable=False,
+        name="request_key",
+        description="Operación, código del banco y número de operación del banco. Ejemplo: payment:1020:A05478452120"
+    )
+
+    token: str = ormar.String(
+        max_length=32,
+        nullable=False,
+        name="token",
+        description="Identificador de la llamada que procesa la solicitud"
+    )
+
+    response: str = ormar.Text(
+        nullable=True,
+        name="response",
+        description="Respuesta JSON de la solicitud, vacía mientras se procesa"
+    )
+
+    date_created: datetime = ormar.DateTime(
+        default=datetime.now,
+        name="date_created",
+        description="Fecha de creación del registro"
+    )
+
+    expires_at: datetime = ormar.DateTime(
+        nullable=False,
+        name="expires_at",
+        description="Fecha en que el registro deja de ser válido"
+    )
+
+
+class RevertJob(ormar.Model):
+    class Meta(BaseMeta):
+        tablename = "revert_job"
+
+    id: int = ormar.Integer(
+        primary_key=True,
+        description="Identificador único de la reversión masiva"
+    )
+
+    status: str = ormar.String(
+        max_length=20,
+        nullable=False,
+        default="pending",
+        name="status",
+        description="Estado de la reversión (pending, running, completed o failed)"
+    )
+
+    bank_code: str = ormar.String(
+        max_length=255,
+        nullable=True,
+        name="bank_code",
+        description="Código del banco de los pagos a revertir"
+    )
+
+    date_from: datetime = ormar.DateTime(
+        nullable=True,
+        name="date_from",
+        description="Fecha de emisión desde la que se revierten los pagos"
+    )
+
+    date_to: datetime = ormar.DateTime(
+        nullable=True,
+        name="date_to",
+        description="Fecha de emisión hasta la que se revierten los pagos, incluida"
+    )
+
+    operation_bank_numbers: str = ormar.Text(
+        nullable=True,
+        name="operation_bank_numbers",
+        description="Lista JSON de los números de operación del banco a revertir, en lugar del filtro"
+    )
+
+    cursor: int = ormar.Integer(
+        nullable=False,
+        default=0,
+        name="cursor",
+        description="Último pago revisado con filtro, o números de operación revisados con lista"
+    )
+
+    reverted: int = ormar.Integer(
+        nullable=False,
+        default=0,
+        name="reverted",
+        description="Pagos revertidos hasta ahora"
+    )
+
+    token: str = ormar.String(
+        max_length=32,
+        nullable=True,
+        name="token",
+        description="Identificador del proceso que ejecuta la reversión"
+    )
+
+    heartbeat_at: datetime = ormar.DateTime(
+        nullable=True,
+        name="heartbeat_at",
+        description="Última señal de vida del proceso que ejecuta la reversión"
+    )
+
+    error: str = ormar.Text(
+        nullable=True,
+        name="error",
+        description="Error que detuvo la reversión"
+    )
+
+    date_created: datetime = ormar.DateTime(
+        default=datetime.now,
+        name="date_created",
+        description="Fecha de creación de la reversión"
+    )
+
+    date_updated: datetime = ormar.DateTime(
+        default=datetime.now,
+        onupdate=datetime.now,
+        name="date_updated",
+        description="Fecha de la última actualización de la reversión"
+    )
+
+
+class OutboxEvent(ormar.Model):
+    class Meta(BaseMeta):
+        tablename = "outbox_event"
+        constraints = [
+            ormar.IndexColumns("available_at", name="ix_outbox_event_available_at"),
+        ]
+
+    id: int = ormar.Integer(
+        primary_key=True,
+        description="Identificador único del evento, en orden de escritura"
+    )
+
+    event_type: str = ormar.String(
+        max_length=50,
+        nullable=False,
+        name="event_type",
+        description="Tipo del evento (payment.paid o payment.reverted)"
+    )
+
+    payload: str = ormar.Text(
+        nullable=False,
+        name="payload",
+        description="Contenido JSON del evento"
+    )
+
+    attempts: int = ormar.Integer(
+        nullable=False,
+        default=0,
+        name="attempts",
+        description="Intentos de envío del evento"
+    )
+
+    available_at: datetime = ormar.DateTime(
+        default=datetime.now,
+        nullable=False,
+        name="available_at",
+        description="Fecha desde la que el evento puede enviarse"
+    )
+
+    token: str = ormar.String(
+        max_length=32,
+        nullable=True,
+        name="token",
+        description="Identificador del envío que tomó el evento"
+    )
+
+    last_error: str = ormar.Text(
+        nullable=True,
+        name="last_error",
+        description="Error del último intento de envío"
+    )
+
+    date_created: datetime = ormar.DateTime(
+        default=datetime.now,
+        name="date_created",
+        description="Fecha de creación del evento"
+    )
+
+
+class OperationIdentifierNode(ormar.Model):
+    class Meta(BaseMeta):
+        tablename = "operation_identifier_node"
+
+    id: int = ormar.Integer(
+        primary_key=True,
+        description="Nodo de los identificadores de operación de un proceso, uno por proceso"
+    )
+
+    date_created: datetime = ormar.DateTime(
+        default=datetime.now,
+        name="date_created",
+        description="Fecha en la que el proceso tomó el nodo"
+    )
+
+
+class ImportCheckpoint(ormar.Model):
+    class Meta(BaseMeta):
+        tablename = "import_checkpoint"
+
+    name: str = ormar.String(
+        primary_key=True,
+        max_length=255,
+        name="name",
+        description="Nombre de la importación, por defecto la ruta absoluta del archivo"
+    )
+
+    offset: int = ormar.BigInteger(
+        nullable=False,
+        name="offset",
+        description="Posición en bytes tras la última fila confirmada"
+    )
+
+    rows: int = ormar.Integer(
+        nullable=False,
+        name="rows",
+        description="Filas leídas hasta la última confirmada"
+    )
+
+    created: int = ormar.Integer(
+        nullable=False,
+        name="created",
+        description="Deudas creadas por la importación"
+    )
+
+    rejected: int = ormar.Integer(
+        nullable=False,
+        name="rejected",
+        description="Filas rechazadas por la importación"
+    )
+
+    date_updated: datetime = ormar.DateTime(
+        default=datetime.now,
+        onupdate=datetime.now,
+        name="date_updated",
+        description="Fecha de la última confirmación de la importación"
+    )
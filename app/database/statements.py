@@ -0,0 +1,318 @@
+# Registry of the hot statements, compiled once per process and executed on the
+# raw driver connection.
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import databases
+import sqlalchemy
+from sqlalchemy.dialects.postgresql import pypostgresql
+from sqlalchemy.dialects.sqlite import pysqlite
+from sqlalchemy.engine.interfaces import Dialect
+from sqlalchemy.sql.visitors import cloned_traverse
+
+from app.database.config import ASYNCPG_SCHEMES, SQLITE_SCHEMES, database
+
+
+def get_dialect(scheme: str) -> Optional[Dialect]:
+    """ Build the dialect the databases backend of a scheme compiles with.
+
+    Args:
+        scheme (str): Scheme of the database URL.
+
+    Returns:
+        Optional[Dialect]: The dialect, None for backends whose raw connection
+        is not supported by the registry.
+    """
+    if scheme in ASYNCPG_SCHEMES:
+        dialect = pypostgresql.dialect(paramstyle="pyformat")
+        dialect.implicit_returning = True
+        dialect.supports_native_enum = True
+        dialect.supports_native_decimal = True
+        return dialect
+
+    if scheme in SQLITE_SCHEMES:
+        dialect = pysqlite.dialect(paramstyle="qmark")
+        # aiosqlite does not support decimals
+        dialect.supports_native_decimal = False
+        return dialect
+
+    return None
+
+
+class CompiledStatement(NamedTuple):
+    """ SQL of a statement for one dialect and what is needed to run it. """
+    compiled: sqlalchemy.sql.compiler.Compiled
+    sql: str
+    parameters: Tuple[str, ...]
+    bind_processors: Dict[str, Callable]
+    result_columns: Tuple[Tuple[str, Optional[Callable]], ...]
+
+
+class PreparedStatement:
+    """ A statement compiled once per dialect and run on the raw connection.
+
+    The registry saves the SQLAlchemy compile time of every execution after
+    the first, which is what stats() measures. Every execution also sends the
+    same SQL text, so the statement caches of asyncpg (see
+    DATABASE_STATEMENT_CACHE_SIZE) and sqlite3 can hit, but the planning time
+    on the server is not measured.
+    """
+
+    def __init__(self, name: str, statement: sqlalchemy.sql.ClauseElement, registry: "StatementRegistry"):
+        """
+        Args:
+            name (str): Name of the statement in the registry.
+            statement (ClauseElement): Statement with bindparam() for its values.
+            registry (StatementRegistry): Registry keeping the statistics.
+        """
+        self.name = name
+        self.statement = statement
+        self.registry = registry
+        self.compilations = 0
+        self.compile_seconds = 0.0
+        self.executions = 0
+        self._compiled: Dict[str, CompiledStatement] = {}
+
+    def compile(self, scheme: str, dialect: Dialect) -> CompiledStatement:
+        """
+        Args:
+            scheme (str): Scheme of the database URL, the key of the compilation.
+            dialect (Dialect): Dialect the statement is compiled with.
+
+        Returns:
+            CompiledStatement: The compiled statement, built on the first call.
+        """
+        compiled_statement = self._compiled.get(scheme)
+        if compiled_statement is not None:
+            return compiled_statement
+
+        start = time.perf_counter()
+        compiled = self.statement.compile(dialect=dialect)
+
+        if compiled.positiontup is not None:
+            sql = compiled.string
+            parameters = tuple(compiled.positiontup)
+        else:
+            parameters = tuple(sorted(compiled.params))
+            sql = compiled.string % {
+                name: f"${position}" for position, name in enumerate(parameters, start=1)
+            }
+
+        bind_processors = {}
+        for parameter in parameters:
+            processor = compiled.binds[parameter].type.dialect_impl(dialect).bind_processor(dialect)
+            if processor is not None:
+                bind_processors[parameter] = processor
+
+        result_columns = ()
+        if isinstance(self.statement, sqlalchemy.sql.expression.SelectBase):
+            result_columns = tuple(
+                (column.name, column.type.dialect_impl(dialect).result_processor(dialect, None))
+                for column in self.statement.selected_columns
+            )
+
+        compiled_statement = CompiledStatement(
+            compiled=compiled,
+            sql=sql,
+            parameters=parameters,
+            bind_processors=bind_processors,
+            result_columns=result_columns,
+        )
+        self._compiled[scheme] = compiled_statement
+
+        self.compilations += 1
+        self.compile_seconds += time.perf_counter() - start
+        return compiled_statement
+
+    def bind(self, **values) -> sqlalchemy.sql.ClauseElement:
+        """ Copy of the statement with the values bound, for the backends the
+        registry does not run on the raw connection.
+
+        Args:
+            **values: Values of the bind parameters.
+
+        Returns:
+            ClauseElement: The statement with its bind parameters set.
+        """
+        def set_value(bind: sqlalchemy.sql.elements.BindParameter) -> None:
+            if bind.key in values:
+                bind.value = values[bind.key]
+                bind.required = False
+
+        return cloned_traverse(self.statement, {}, {"bindparam": set_value})
+
+    def _arguments(self, compiled_statement: CompiledStatement, values: dict) -> list:
+        parameters = compiled_statement.compiled.construct_params(values)
+        processors = compiled_statement.bind_processors
+        return [
+            processors[name](parameters[name]) if name in processors else parameters[name]
+            for name in compiled_statement.parameters
+        ]
+
+    @staticmethod
+    def _process(compiled_statement: CompiledStatement, row: Any) -> dict:
+        return {
+            name: processor(value) if processor is not None else value
+            for (name, processor), value in zip(compiled_statement.result_columns, row)
+        }
+
+    async def fetch_all(self, **values) -> List[dict]:
+        """
+        Args:
+            **values: Values of the bind parameters.
+
+        Returns:
+            List[dict]: The rows, keyed by column name.
+        """
+        scheme = self.registry.database.url.scheme
+        dialect = self.registry.dialect(scheme)
+        if dialect is None:
+            rows = await self.registry.database.fetch_all(self.bind(**values))
+            return [dict(row._mapping) for row in rows]
+
+        compiled_statement = self.compile(scheme, dialect)
+        arguments = self._arguments(compiled_statement, values)
+        self.executions += 1
+
+        async with self.registry.database.connection() as connection:
+            raw_connection = connection.raw_connection
+            if scheme in ASYNCPG_SCHEMES:
+                rows = await raw_connection.fetch(compiled_statement.sql, *arguments)
+            else:
+                async with raw_connection.execute(compiled_statement.sql, arguments) as cursor:
+                    rows = await cursor.fetchall()
+
+        return [self._process(compiled_statement, row) for row in rows]
+
+    async def fetch_one(self, **values) -> Optional[dict]:
+        """
+        Args:
+            **values: Values of the bind parameters.
+
+        Returns:
+            Optional[dict]: The first row keyed by column name, None if there is none.
+        """
+        rows = await self.fetch_all(**values)
+        return rows[0] if rows else None
+
+    async def execute(self, **values) -> None:
+        """
+        Args:
+            **values: Values of the bind parameters.
+        """
+        scheme = self.registry.database.url.scheme
+        dialect = self.registry.dialect(scheme)
+        if dialect is None:
+            await self.registry.database.execute(self.bind(**values))
+            return
+
+        compiled_statement = self.compile(scheme, dialect)
+        arguments = self._arguments(compiled_statement, values)
+        self.executions += 1
+
+        async with self.registry.database.connection() as connection:
+            raw_connection = connection.raw_connection
+            if scheme in ASYNCPG_SCHEMES:
+                await raw_connection.execute(compiled_statement.sql, *arguments)
+            else:
+                async with raw_connection.execute(compiled_statement.sql, arguments):
+                    pass
+
+    async def execute_many(self, rows: List[dict]) -> None:
+        """ Execute the statement once per row in a single driver call.
+
+        Args:
+            rows (List[dict]): Values of the bind parameters of each execution.
+        """
+        scheme = self.registry.database.url.scheme
+        dialect = self.registry.dialect(scheme)
+        if dialect is None:
+            await self.registry.database.execute_many(self.statement, rows)
+            return
+
+        compiled_statement = self.compile(scheme, dialect)
+        arguments = [self._arguments(compiled_statement, values) for values in rows]
+        self.executions += len(rows)
+
+        async with self.registry.database.connection() as connection:
+            raw_connection = connection.raw_connection
+            if scheme in ASYNCPG_SCHEMES:
+                await raw_connection.executemany(compiled_statement.sql, arguments)
+            else:
+                async with raw_connection.executemany(compiled_statement.sql, arguments):
+                    pass
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Compilations, executions and the client-side compile time
+            they saved.
+        """
+        compile_seconds = self.compile_seconds / self.compilations if self.compilations else 0.0
+        return {
+            "compilations": self.compilations,
+            "executions": self.executions,
+            "compile_ms": compile_seconds * 1000,
+            "compile_ms_saved": compile_seconds * max(self.executions - self.compilations, 0) * 1000,
+        }
+
+
+class StatementRegistry:
+    """ Hot statements of the repositories, compiled once per process. """
+
+    def __init__(self, database: databases.Database):
+        """
+        Args:
+            database (databases.Database): Database the statements run on.
+        """
+        self.database = database
+        self._statements: Dict[str, PreparedStatement] = {}
+        self._dialects: Dict[str, Optional[Dialect]] = {}
+
+    def register(self, name: str, statement: sqlalchemy.sql.ClauseElement) -> PreparedStatement:
+        """
+        Args:
+            name (str): Unique name of the statement.
+            statement (ClauseElement): Statement with bindparam() for its values.
+
+        Returns:
+            PreparedStatement: The registered statement.
+        """
+        if name in self._statements:
+            raise ValueError(f"Statement {name} is already registered")
+
+        prepared_statement = PreparedStatement(name, statement, self)
+        self._statements[name] = prepared_statement
+        return prepared_statement
+
+    def get(self, name: str) -> PreparedStatement:
+        """
+        Args:
+            name (str): Name of the statement.
+
+        Returns:
+            PreparedStatement: The registered statement.
+        """
+        return self._statements[name]
+
+    def dialect(self, scheme: str) -> Optional[Dialect]:
+        """
+        Args:
+            scheme (str): Scheme of the database URL.
+
+        Returns:
+            Optional[Dialect]: The dialect of the scheme, built once.
+        """
+        if scheme not in self._dialects:
+            self._dialects[scheme] = get_dialect(scheme)
+        return self._dialects[scheme]
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Statistics of every statement keyed by name.
+        """
+        return {name: statement.stats() for name, statement in self._statements.items()}
+
+
+statements = StatementRegistry(database)
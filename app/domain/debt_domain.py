@@ -1,6 +1,117 @@
+import os
 import re
 import random
 import string
+import threading
+import time
+from typing import Callable, Optional
+
+
+# The characters of validate_operation_identifier in ASCII order, so identifiers
+# sort as strings in the order they were generated.
+OPERATION_IDENTIFIER_ALPHABET = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+OPERATION_IDENTIFIER_BASE = len(OPERATION_IDENTIFIER_ALPHABET)
+# 2024-01-01T00:00:00Z in milliseconds.
+OPERATION_IDENTIFIER_EPOCH_MS = 1704067200000
+
+
+class OperationIdentifierGenerator:
+    """ 16-character operation identifiers ordered by creation time.
+
+    An identifier is a number written with the 63 characters of
+    OPERATION_IDENTIFIER_ALPHABET: 7 characters of milliseconds since
+    OPERATION_IDENTIFIER_EPOCH_MS (until year 2148), 4 characters of node and
+    5 characters of a sequence within the millisecond.
+
+    The node of a process is set with set_node, from the id of the
+    operation_identifier_node row the process inserts, and set again after a
+    fork. Two processes alive at the same time have different nodes unless
+    15,752,961 nodes are claimed between them, when the numbering wraps. Within
+    a process the identifiers are strictly increasing, even if the clock goes
+    back.
+    """
+
+    TIMESTAMP_LENGTH = 7
+    NODE_LENGTH = 4
+    SEQUENCE_LENGTH = 5
+
+    def __init__(self, clock: Callable[[], float] = time.time, node: Optional[int] = None):
+        """
+        Args:
+            clock (Callable[[], float]): Seconds since the Unix epoch.
+            node (Optional[int]): Node of the identifiers in every process, set_node
+                is required in each process if None.
+        """
+        self._clock = clock
+        self._fixed_node = node
+        self._node = node
+        self._pid: Optional[int] = None
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(value: int, length: int) -> str:
+        characters = []
+        for _ in range(length):
+            value, index = divmod(value, OPERATION_IDENTIFIER_BASE)
+            characters.append(OPERATION_IDENTIFIER_ALPHABET[index])
+        return "".join(reversed(characters))
+
+    def has_node(self) -> bool:
+        """
+        Returns:
+            bool: Whether this process can generate identifiers without set_node.
+        """
+        return self._fixed_node is not None or (self._pid == os.getpid() and self._node is not None)
+
+    def set_node(self, node: int) -> None:
+        """
+        Args:
+            node (int): Node of the identifiers of this process, a number claimed by
+                no other process, kept modulo the 15,752,961 nodes.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._last_ms = -1
+            self._node = node % OPERATION_IDENTIFIER_BASE ** self.NODE_LENGTH
+
+    def generate(self) -> str:
+        """
+        Returns:
+            str: A new operation identifier, greater than the previous one.
+
+        Raises:
+            RuntimeError: If no node was set in this process.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                if self._fixed_node is None:
+                    raise RuntimeError("No operation identifier node was set in this process")
+                self._pid = os.getpid()
+                self._node = self._fixed_node
+                self._last_ms = -1
+
+            now_ms = max(int(self._clock() * 1000) - OPERATION_IDENTIFIER_EPOCH_MS, self._last_ms)
+
+            if now_ms == self._last_ms:
+                self._sequence += 1
+                if self._sequence == OPERATION_IDENTIFIER_BASE ** self.SEQUENCE_LENGTH:
+                    now_ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+
+            return (
+                self._encode(now_ms, self.TIMESTAMP_LENGTH)
+                + self._encode(self._node, self.NODE_LENGTH)
+                + self._encode(self._sequence, self.SEQUENCE_LENGTH)
+            )
+
+
+operation_identifier_generator = OperationIdentifierGenerator()
 
 
 class DebtDomain:
@@ -10,6 +121,10 @@ class DebtDomain:
         characters = string.ascii_letters + string.digits + "-"
         return ''.join(random.choice(characters) for _ in range(length))
 
+    @staticmethod
+    def generate_sortable_operation_identifier():
+        return operation_identifier_generator.generate()
+
     @staticmethod
     def validate_operation_identifier(identifier):
         pattern = r'^[A-Za-z0-9-]{16}$'
@@ -48,3 +48,39 @@ class PaymentDomain:
         }
 
         return update_payment_data
+
+    @staticmethod
+    def status_event(
+        status: str,
+        operation_identifier: str,
+        client_identifier: str,
+        product_code: str,
+        payment_id: int,
+        bank_code: str,
+        operation_bank_number: str
+    ) -> tuple:
+        """Build the outbox event of a payment status change.
+        Args:
+            status (str): The new status of the payment, "paid" or "pending".
+            operation_identifier (str): The debt of the payment.
+            client_identifier (str): The client of the debt.
+            product_code (str): The product code of the debt.
+            payment_id (int): The id of the payment, its numOperacionERP.
+            bank_code (str): The bank of the notification.
+            operation_bank_number (str): The bank operation number of the notification.
+        Returns:
+            tuple: The event type, "payment.paid" or "payment.reverted", and its payload.
+        """
+
+        event_type = "payment.paid" if status == "paid" else "payment.reverted"
+
+        return event_type, {
+            "numDocumento": operation_identifier,
+            "idConsulta": client_identifier,
+            "codigoProducto": product_code,
+            "numOperacionERP": payment_id,
+            "codigoBanco": bank_code,
+            "numOperacionBanco": operation_bank_number,
+            "estado": status,
+            "fechaCambio": datetime.now().isoformat(),
+        }
@@ -1,3 +1,8 @@
 from app.infrastructure.payment_repository import *
 from app.infrastructure.debt_repository import *
 from app.infrastructure.client_repository import *
+from app.infrastructure.idempotency_repository import *
+from app.infrastructure.revert_job_repository import *
+from app.infrastructure.outbox_repository import *
+from app.infrastructure.outbox_sink import *
+from app.infrastructure.import_checkpoint_repository import *
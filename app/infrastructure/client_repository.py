@@ -1,10 +1,32 @@
+from typing import List, Sequence, Set
+
+import sqlalchemy
 from ormar.exceptions import NoMatch
 
+from app.database.config import reads_from_replica
 from app.database.models import Client
+from app.database.statements import statements
+
+
+client_by_document_identifier = statements.register(
+    "client_by_document_identifier",
+    sqlalchemy.select([Client.Meta.table]).where(
+        Client.Meta.table.c.document_identifier == sqlalchemy.bindparam("document_identifier")
+    )
+)
+
+insert_client = statements.register(
+    "insert_client",
+    Client.Meta.table.insert().values({
+        column.name: sqlalchemy.bindparam(column.name, type_=column.type)
+        for column in Client.Meta.table.columns
+    })
+)
 
 
 class ClientRepository:
     @staticmethod
+    @reads_from_replica
     async def get_client_by_document_identifier(document_identifier: str) -> Client:
         """
         Retrieves a client by their unique ID.
@@ -15,11 +37,14 @@ class ClientRepository:
         Returns:
             Client: The Client object corresponding to the provided ID.
         """
-        try:
-            return await Client.objects.get(document_identifier=document_identifier)
-        except NoMatch:
+        row = await client_by_document_identifier.fetch_one(
+            document_identifier=document_identifier
+        )
+        if row is None:
             return None
 
+        return Client(**row)
+
     @staticmethod
     async def create_client(
         document_identifier: str,
@@ -47,6 +72,43 @@ class ClientRepository:
         )
         return client
 
+    @staticmethod
+    async def get_existing_document_identifiers(document_identifiers: Sequence[str]) -> Set[str]:
+        """
+        Looks up many clients with one IN query on the primary database.
+
+        Args:
+            document_identifiers (Sequence[str]): The document identifiers to look up.
+
+        Returns:
+            Set[str]: The document identifiers that belong to a client.
+        """
+        table = Client.Meta.table
+        rows = await Client.Meta.database.fetch_all(
+            sqlalchemy.select([table.c.document_identifier]).where(
+                table.c.document_identifier.in_(list(document_identifiers))
+            )
+        )
+        return {row[0] for row in rows}
+
+    @staticmethod
+    async def insert_clients(clients: List[dict]) -> None:
+        """
+        Creates many clients with one prepared INSERT executed for every client.
+
+        The clients are inserted in their own transaction, a savepoint within an
+        open one, so if one client already exists none is created and an open
+        transaction can go on.
+
+        Args:
+            clients (List[dict]): Values of every column of each client, keyed by column name.
+        """
+        if not clients:
+            return
+
+        async with Client.Meta.database.transaction():
+            await insert_client.execute_many(clients)
+
     @staticmethod
     async def update_client(
         document_identifier: str,
@@ -1,42 +1,265 @@
 from datetime import datetime
-from typing import List, Optional
+from decimal import Decimal
+from typing import AsyncIterator, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
 
+import sqlalchemy
 from ormar import NoMatch
 
-from app.database.models import Debt, Client
+from app.database.config import ASYNCPG_SCHEMES, UNIQUE_VIOLATION_ERRORS, reads_from_replica
+from app.database.models import Debt, Client, OperationIdentifierNode, Payment
+from app.database.statements import statements
 from app.domain import DebtDomain
+from app.domain.debt_domain import operation_identifier_generator
 from app.exceptions.custom_exception import UniqueIdentifierGenerationError
 
 
+class PendingDebtRow(NamedTuple):
+    """ Columns of a pending debt read by the debt-status response, without the ORM model. """
+    product_code: str
+    operation_identifier: str
+    description: str
+    expiration_date: datetime
+    emition_date: datetime
+    total_debt: Decimal
+    default_debt: Decimal
+    administration_expenses: Decimal
+    minimum_payment: Decimal
+    period: str
+    date_created: datetime
+    fee: str
+    currency: str
+
+
+def _pending_payment_clause() -> sqlalchemy.sql.expression.Exists:
+    payment_table = Payment.Meta.table
+
+    return sqlalchemy.exists().where(
+        payment_table.c.debt == Debt.Meta.table.c.operation_identifier,
+        payment_table.c.status == "pending"
+    )
+
+
+def _client_pending_debts_statement() -> sqlalchemy.sql.Select:
+    client_table = Client.Meta.table
+    debt_table = Debt.Meta.table
+
+    pending_payment = _pending_payment_clause()
+    return sqlalchemy.select(
+        [
+            client_table.c.name.label("client_name"),
+            *(debt_table.c[field] for field in PendingDebtRow._fields)
+        ]
+    ).select_from(
+        client_table.outerjoin(
+            debt_table,
+            sqlalchemy.and_(
+                debt_table.c.client == client_table.c.document_identifier,
+                debt_table.c.product_code == sqlalchemy.bindparam("product_code"),
+                pending_payment
+            )
+        )
+    ).where(
+        client_table.c.document_identifier == sqlalchemy.bindparam("client_identifier")
+    )
+
+
+def _clients_pending_debts_statement(
+    client_identifiers: Sequence[str],
+    product_codes: Sequence[str]
+) -> sqlalchemy.sql.Select:
+    client_table = Client.Meta.table
+    debt_table = Debt.Meta.table
+
+    return sqlalchemy.select(
+        [
+            client_table.c.document_identifier.label("client_identifier"),
+            client_table.c.name.label("client_name"),
+            *(debt_table.c[field] for field in PendingDebtRow._fields)
+        ]
+    ).select_from(
+        client_table.outerjoin(
+            debt_table,
+            sqlalchemy.and_(
+                debt_table.c.client == client_table.c.document_identifier,
+                debt_table.c.product_code.in_(list(product_codes)),
+                _pending_payment_clause()
+            )
+        )
+    ).where(
+        client_table.c.document_identifier.in_(list(client_identifiers))
+    )
+
+
+def _client_debts_version_statement() -> sqlalchemy.sql.Select:
+    client_table = Client.Meta.table
+    debt_table = Debt.Meta.table
+    payment_table = Payment.Meta.table
+
+    return sqlalchemy.select(
+        [
+            client_table.c.date_updated.label("client_updated"),
+            sqlalchemy.func.count(sqlalchemy.distinct(debt_table.c.operation_identifier)).label("debts"),
+            sqlalchemy.func.max(debt_table.c.date_updated).label("debts_updated"),
+            sqlalchemy.func.count(payment_table.c.id).label("payments"),
+            sqlalchemy.func.max(payment_table.c.date_updated).label("payments_updated"),
+        ]
+    ).select_from(
+        client_table.outerjoin(
+            debt_table,
+            sqlalchemy.and_(
+                debt_table.c.client == client_table.c.document_identifier,
+                debt_table.c.product_code == sqlalchemy.bindparam("product_code")
+            )
+        ).outerjoin(
+            payment_table,
+            payment_table.c.debt == debt_table.c.operation_identifier
+        )
+    ).where(
+        client_table.c.document_identifier == sqlalchemy.bindparam("client_identifier")
+    ).group_by(
+        client_table.c.document_identifier,
+        client_table.c.date_updated
+    )
+
+
+def _debt_status_expression() -> sqlalchemy.sql.expression.Case:
+    payment_table = Payment.Meta.table
+    debt_table = Debt.Meta.table
+
+    def payment_with_status(status: str) -> sqlalchemy.sql.expression.Exists:
+        return sqlalchemy.exists().where(
+            payment_table.c.debt == debt_table.c.operation_identifier,
+            payment_table.c.status == status
+        )
+
+    return sqlalchemy.case(
+        (payment_with_status("pending"), "pending"),
+        (payment_with_status("paid"), "paid"),
+        else_=sqlalchemy.null()
+    )
+
+
+def _debts_page_statement(
+    product_code: Optional[str],
+    currency: Optional[str],
+    status: Optional[str],
+    page_size: int
+) -> sqlalchemy.sql.Select:
+    client_table = Client.Meta.table
+    debt_table = Debt.Meta.table
+    debt_status = _debt_status_expression()
+
+    statement = sqlalchemy.select(
+        [
+            *debt_table.columns,
+            client_table.c.name.label("client_name"),
+            debt_status.label("status")
+        ]
+    ).select_from(
+        debt_table.join(client_table, debt_table.c.client == client_table.c.document_identifier)
+    ).where(
+        debt_table.c.operation_identifier > sqlalchemy.bindparam("after")
+    )
+    if product_code is not None:
+        statement = statement.where(debt_table.c.product_code == product_code)
+    if currency is not None:
+        statement = statement.where(debt_table.c.currency == currency)
+    if status is not None:
+        statement = statement.where(debt_status == status)
+
+    return statement.order_by(debt_table.c.operation_identifier).limit(page_size)
+
+
+def _debt_with_client_statement() -> sqlalchemy.sql.Select:
+    client_table = Client.Meta.table
+    debt_table = Debt.Meta.table
+
+    return sqlalchemy.select(
+        [
+            *debt_table.columns,
+            *(column.label(f"client__{column.name}") for column in client_table.columns)
+        ]
+    ).select_from(
+        debt_table.join(client_table, debt_table.c.client == client_table.c.document_identifier)
+    )
+
+
+def _debt_by_operation_identifier_statement() -> sqlalchemy.sql.Select:
+    return _debt_with_client_statement().where(
+        Debt.Meta.table.c.operation_identifier == sqlalchemy.bindparam("operation_identifier")
+    )
+
+
+client_pending_debts = statements.register(
+    "client_pending_debts", _client_pending_debts_statement()
+)
+client_debts_version = statements.register(
+    "client_debts_version", _client_debts_version_statement()
+)
+debt_by_operation_identifier = statements.register(
+    "debt_by_operation_identifier", _debt_by_operation_identifier_statement()
+)
+debt_by_operation_identifier_for_update = statements.register(
+    "debt_by_operation_identifier_for_update",
+    _debt_by_operation_identifier_statement().with_for_update(of=Debt.Meta.table)
+)
+insert_debt = statements.register(
+    "insert_debt",
+    Debt.Meta.table.insert().values({
+        column.name: sqlalchemy.bindparam(column.name, type_=column.type)
+        for column in Debt.Meta.table.columns
+    })
+)
+# SQLite has no row locks: a write that changes nothing takes the database write lock.
+touch_debt = statements.register(
+    "touch_debt",
+    Debt.Meta.table.update().where(
+        Debt.Meta.table.c.operation_identifier == sqlalchemy.bindparam("operation_identifier")
+    ).values(operation_identifier=Debt.Meta.table.c.operation_identifier)
+)
+
+
+def _is_operation_identifier_conflict(error: Exception) -> bool:
+    """ Whether a unique violation comes from the primary key of the debt. """
+    message = str(error)
+    return "debt.operation_identifier" in message or "debt_pkey" in message
+
+
+def _touch_debts_statement(operation_identifiers: List[str]) -> sqlalchemy.sql.Update:
+    """ No-op update of debts, which takes the write lock of a SQLite database. """
+    debt_table = Debt.Meta.table
+    return debt_table.update().where(
+        debt_table.c.operation_identifier.in_(operation_identifiers)
+    ).values(operation_identifier=debt_table.c.operation_identifier)
+
+
+def _lock_debts_statement(operation_identifiers: List[str]) -> sqlalchemy.sql.Select:
+    """ Debts with their client, locked FOR UPDATE in operation identifier order. """
+    debt_table = Debt.Meta.table
+    return _debt_with_client_statement().where(
+        debt_table.c.operation_identifier.in_(operation_identifiers)
+    ).order_by(debt_table.c.operation_identifier).with_for_update(of=debt_table)
+
+
 class DebtRepository:
 
     @staticmethod
-    async def _generate_unique_operation_identifier(max_attempts: int = 5) -> str:
+    async def claim_operation_identifier_node() -> None:
         """
-        Args:
-            max_attempts (int): Maximum number of attempts before failing.
+        Use this method before generating operation identifiers, to give this
+        process a node of its own.
 
-        Returns:
-            str: Unique operation identifier.
+        The first call of each process inserts an operation_identifier_node row
+        and its autoincrement id becomes the node, so no two processes share one.
+        The next calls do nothing.
+        Claim the node outside a transaction: a row rolled back with it leaves its
+        id free for another process on databases that reuse ids, such as SQLite.
+        """
+        if operation_identifier_generator.has_node():
+            return
 
-        Raises:
-            Exception: If a unique identifier cannot be generated after the
-            allowed attempts.
-        """
-        attempts = 0
-        while attempts < max_attempts:
-            identifier = DebtDomain.generate_operation_identifier()
-            try:
-                await Debt.objects.get(operation_identifier=identifier)
-            except NoMatch:
-                return identifier
-            except Exception as e:
-                raise e
-            attempts += 1
-
-        raise UniqueIdentifierGenerationError(
-            f"Failed to generate a unique identifier after {max_attempts} attempts"
-        )
+        node = await OperationIdentifierNode.objects.create()
+        operation_identifier_generator.set_node(node.id)
 
     @staticmethod
     async def add_debt(
@@ -56,6 +279,10 @@ class DebtRepository:
         """
         Use this method to create a new debt instance.
 
+        The operation identifier is time-ordered and unique by construction, from
+        the node this process claimed, so the debt is inserted without looking
+        the identifier up first.
+
         Args:
             client (Client): The client associated with the debt.
             description (str): Description of the debt.
@@ -72,23 +299,73 @@ class DebtRepository:
 
         Returns:
             Debt: The created debt instance.
+
+        Raises:
+            UniqueIdentifierGenerationError: If the identifier already exists, which
+                means two processes generated with the same node.
         """
-        debt = await Debt.objects.create(
-            operation_identifier=await DebtRepository._generate_unique_operation_identifier(),
-            client=client,
-            description=description,
-            emition_date=emition_date,
-            expiration_date=expiration_date,
-            total_debt=total_debt,
-            default_debt=default_debt,
-            administration_expenses=administration_expenses,
-            minimum_payment=minimum_payment,
-            period=period,
-            fee=fee,
-            product_code=product_code,
-            currency=currency,
+        await DebtRepository.claim_operation_identifier_node()
+        operation_identifier = DebtDomain.generate_sortable_operation_identifier()
+
+        try:
+            return await Debt.objects.create(
+                operation_identifier=operation_identifier,
+                client=client,
+                description=description,
+                emition_date=emition_date,
+                expiration_date=expiration_date,
+                total_debt=total_debt,
+                default_debt=default_debt,
+                administration_expenses=administration_expenses,
+                minimum_payment=minimum_payment,
+                period=period,
+                fee=fee,
+                product_code=product_code,
+                currency=currency,
+            )
+        except UNIQUE_VIOLATION_ERRORS as e:
+            if _is_operation_identifier_conflict(e):
+                raise UniqueIdentifierGenerationError(
+                    f"Operation identifier {operation_identifier} already exists"
+                ) from e
+            raise e
+
+    @staticmethod
+    async def get_existing_operation_identifiers(operation_identifiers: Sequence[str]) -> Set[str]:
+        """
+        Looks up many debts with one IN query on the primary database.
+
+        Args:
+            operation_identifiers (Sequence[str]): The operation identifiers to look up.
+
+        Returns:
+            Set[str]: The operation identifiers that belong to a debt.
+        """
+        debt_table = Debt.Meta.table
+        rows = await Debt.Meta.database.fetch_all(
+            sqlalchemy.select([debt_table.c.operation_identifier]).where(
+                debt_table.c.operation_identifier.in_(list(operation_identifiers))
+            )
         )
-        return debt
+        return {row[0] for row in rows}
+
+    @staticmethod
+    async def insert_debts(debts: List[dict]) -> None:
+        """
+        Creates many debts with one prepared INSERT executed for every debt.
+
+        The debts are inserted in their own transaction, a savepoint within an
+        open one, so if one debt violates a constraint none is created and an
+        open transaction can go on.
+
+        Args:
+            debts (List[dict]): Values of every column of each debt, keyed by column name.
+        """
+        if not debts:
+            return
+
+        async with Debt.Meta.database.transaction():
+            await insert_debt.execute_many(debts)
 
     @staticmethod
     async def get_debt_by_operation_identifier(operation_identifier: str) -> Optional[Debt]:
@@ -100,17 +377,101 @@ class DebtRepository:
             Optional[Debt]: The debt instance if found, None otherwise.
         """
         try:
-            return await Debt.objects.select_related('client').get(
+            row = await debt_by_operation_identifier.fetch_one(
                 operation_identifier=operation_identifier
             )
-        except NoMatch as exc:
-            raise NoMatch(
-                f"Debt with operation identifier {operation_identifier} not found."
-            ) from exc
         except Exception as e:
             raise e
 
+        if row is None:
+            raise NoMatch(f"Debt with operation identifier {operation_identifier} not found.")
+
+        return DebtRepository._debt_from_row(row)
+
     @staticmethod
+    async def lock_debt_by_operation_identifier(operation_identifier: str) -> Debt:
+        """
+        Use this method inside a transaction to read a debt and lock it until the
+        transaction ends, so concurrent payments of the debt run one after another.
+
+        Postgres locks the debt row with SELECT ... FOR UPDATE. SQLite has no row
+        locks, so the whole database is locked for writes by a write that changes
+        nothing, before the debt is read.
+
+        Args:
+            operation_identifier (str): The unique identifier of the debt.
+
+        Returns:
+            Debt: The locked debt instance with its client.
+
+        Raises:
+            NoMatch: If the debt does not exist.
+        """
+        try:
+            if Debt.Meta.database.url.scheme not in ASYNCPG_SCHEMES:
+                await touch_debt.execute(operation_identifier=operation_identifier)
+
+            row = await debt_by_operation_identifier_for_update.fetch_one(
+                operation_identifier=operation_identifier
+            )
+        except Exception as e:
+            raise e
+
+        if row is None:
+            raise NoMatch(f"Debt with operation identifier {operation_identifier} not found.")
+
+        return DebtRepository._debt_from_row(row)
+
+    @staticmethod
+    async def lock_debts_by_operation_identifiers(operation_identifiers: Sequence[str]) -> Dict[str, Debt]:
+        """
+        Use this method inside a transaction to read many debts with one IN query
+        and lock them until the transaction ends, like lock_debt_by_operation_identifier.
+
+        The rows are locked in operation identifier order, so transactions locking
+        overlapping sets of debts wait for each other instead of deadlocking.
+
+        Args:
+            operation_identifiers (Sequence[str]): The unique identifiers of the debts.
+
+        Returns:
+            Dict[str, Debt]: The locked debts with their client, by operation
+            identifier. Debts that do not exist are missing.
+        """
+        debt_table = Debt.Meta.table
+        database = Debt.Meta.database
+        operation_identifiers = sorted(set(operation_identifiers))
+
+        if database.url.scheme not in ASYNCPG_SCHEMES:
+            # SQLite has no row locks: the first write of the transaction takes the
+            # write lock of the whole database, so the order of the rows is moot.
+            await database.execute(_touch_debts_statement(operation_identifiers))
+
+        rows = await database.fetch_all(_lock_debts_statement(operation_identifiers))
+
+        debts = (DebtRepository._debt_from_row(dict(row._mapping)) for row in rows)
+        return {debt.operation_identifier: debt for debt in debts}
+
+    @staticmethod
+    def _debt_from_row(row: dict) -> Debt:
+        """
+        Args:
+            row (dict): Debt columns and client columns prefixed with "client__".
+
+        Returns:
+            Debt: The debt instance with its client.
+        """
+        debt_data = {"client": {}}
+        for name, value in row.items():
+            if name.startswith("client__"):
+                debt_data["client"][name[len("client__"):]] = value
+            elif name != "client":
+                debt_data[name] = value
+
+        return Debt(**debt_data)
+
+    @staticmethod
+    @reads_from_replica
     async def get_debts_by_client_identifier(client_identifier: str, codigo_producto: str) -> List[Debt]:
         """
         Use this method to retrieve all debts with pending payments associated with a client.
@@ -135,8 +496,163 @@ class DebtRepository:
             raise e
 
     @staticmethod
+    @reads_from_replica
+    async def get_client_pending_debts(
+        client_identifier: str,
+        codigo_producto: str
+    ) -> Tuple[Optional[str], List[PendingDebtRow]]:
+        """
+        Use this method to retrieve the client name and its debts with pending payments
+        for a product in a single query.
+
+        The client is outer joined with its pending debts, so an existing client without
+        pending debts still returns one row with empty debt columns. Only the columns of
+        PendingDebtRow are selected and no Debt model is built for the rows.
+
+        Args:
+            client_identifier (str): The unique identifier of the client.
+            codigo_producto (str): The product code of the debts.
+
+        Returns:
+            Tuple[Optional[str], List[PendingDebtRow]]: The client name, or None if the
+            client does not exist, and the debts with pending payments.
+        """
+        try:
+            rows = await client_pending_debts.fetch_all(
+                client_identifier=client_identifier,
+                product_code=codigo_producto
+            )
+        except Exception as e:
+            raise e
+
+        if not rows:
+            return None, []
+
+        debts = [
+            PendingDebtRow(*(row[field] for field in PendingDebtRow._fields))
+            for row in rows
+            if row["operation_identifier"] is not None
+        ]
+        return rows[0]["client_name"], debts
+
+    @staticmethod
+    @reads_from_replica
+    async def get_client_debts_version(client_identifier: str, codigo_producto: str) -> Optional[tuple]:
+        """
+        Use this method to read the version of the debts of a client for a product
+        without reading the debts themselves.
+
+        The version is the last update of the client and the count and latest
+        date_updated of its debts for the product and of their payments. Every
+        payment write sets date_updated, so it changes whenever the pending debts
+        of the client can change.
+
+        Args:
+            client_identifier (str): The unique identifier of the client.
+            codigo_producto (str): The product code of the debts.
+
+        Returns:
+            Optional[tuple]: The version, None if the client does not exist.
+        """
+        try:
+            row = await client_debts_version.fetch_one(
+                client_identifier=client_identifier,
+                product_code=codigo_producto
+            )
+        except Exception as e:
+            raise e
+
+        return tuple(row.values()) if row is not None else None
+
+    @staticmethod
+    @reads_from_replica
+    async def get_clients_pending_debts(
+        client_identifiers: Sequence[str],
+        product_codes: Sequence[str]
+    ) -> Tuple[Dict[str, str], Dict[Tuple[str, str], List[PendingDebtRow]]]:
+        """
+        Use this method to retrieve the names and the debts with pending payments of
+        many clients for some products in a single query.
+
+        Like get_client_pending_debts, with IN lists of clients and products: the
+        debts of a client for a product of another client are read too, the caller
+        picks its (client, product) pairs.
+
+        Args:
+            client_identifiers (Sequence[str]): The unique identifiers of the clients.
+            product_codes (Sequence[str]): The product codes of the debts.
+
+        Returns:
+            Tuple[Dict[str, str], Dict[Tuple[str, str], List[PendingDebtRow]]]: The
+            name of each existing client, and the debts with pending payments by
+            client identifier and product code.
+        """
+        try:
+            rows = await Debt.Meta.database.fetch_all(
+                _clients_pending_debts_statement(client_identifiers, product_codes)
+            )
+        except Exception as e:
+            raise e
+
+        client_names = {}
+        debts = {}
+        for row in rows:
+            client_names[row["client_identifier"]] = row["client_name"]
+            if row["operation_identifier"] is not None:
+                debts.setdefault((row["client_identifier"], row["product_code"]), []).append(
+                    PendingDebtRow(*(row[field] for field in PendingDebtRow._fields))
+                )
+        return client_names, debts
+
+    @staticmethod
+    async def stream_debts(
+        product_code: Optional[str] = None,
+        currency: Optional[str] = None,
+        status: Optional[str] = None,
+        page_size: int = 1000
+    ) -> AsyncIterator[Mapping]:
+        """
+        Use this method to read every debt, or the debts matching the filters, one
+        page at a time.
+
+        The pages are read with keyset pagination on the operation identifier: each
+        page is a query for the next page_size debts after the last one read, using
+        the primary key, so only one page is held in memory and no transaction or
+        cursor stays open between pages. Each debt is read once, in operation
+        identifier order, and debts written during the read may be missed.
+
+        Args:
+            product_code (Optional[str]): Only the debts of this product.
+            currency (Optional[str]): Only the debts in this currency.
+            status (Optional[str]): Only the debts with this status: "pending" with a
+                pending payment, else "paid" with a paid payment.
+            page_size (int): Debts read per query.
+
+        Yields:
+            Mapping: The columns of each debt, with the name of its client as
+            client_name and its status, None without payments.
+        """
+        statement = _debts_page_statement(product_code, currency, status, page_size)
+        after = ""
+        while True:
+            rows = await DebtRepository._get_debts_page(statement, after)
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                return
+            after = rows[-1]["operation_identifier"]
+
+    @staticmethod
+    @reads_from_replica
+    async def _get_debts_page(statement: sqlalchemy.sql.Select, after: str) -> List[Mapping]:
+        return await Debt.Meta.database.fetch_all(statement.params(after=after))
+
+    @staticmethod
+    @reads_from_replica
     async def get_all_debts() -> List[Debt]:
         """
+        Loads every debt in memory, use stream_debts to read a large table.
+
         Returns:
             List[Debt]: A list of all debt instances.
         """
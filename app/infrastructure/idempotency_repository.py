@@ -0,0 +1,234 @@
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import sqlalchemy
+
+from app.database.models import IdempotencyKey
+from app.database.statements import statements
+
+
+def _claim_idempotency_key_statement() -> sqlalchemy.sql.expression.TextClause:
+    """ Insert the in-flight marker of a request unless the request already has one.
+
+    ON CONFLICT DO NOTHING has the same syntax on Postgres and SQLite, so the
+    statement is written once for both backends.
+    """
+    table = IdempotencyKey.Meta.table
+
+    return sqlalchemy.text(
+        "INSERT INTO idempotency_key (request_key, token, date_created, expires_at) "
+        "VALUES (:request_key, :token, :date_created, :expires_at) "
+        "ON CONFLICT (request_key) DO NOTHING"
+    ).bindparams(
+        *(
+            sqlalchemy.bindparam(column, type_=table.c[column].type)
+            for column in ("request_key", "token", "date_created", "expires_at")
+        )
+    )
+
+
+claim_idempotency_key = statements.register(
+    "claim_idempotency_key", _claim_idempotency_key_statement()
+)
+idempotency_key_by_request_key = statements.register(
+    "idempotency_key_by_request_key",
+    sqlalchemy.select([IdempotencyKey.Meta.table]).where(
+        IdempotencyKey.Meta.table.c.request_key == sqlalchemy.bindparam("request_key")
+    )
+)
+delete_expired_idempotency_key = statements.register(
+    "delete_expired_idempotency_key",
+    IdempotencyKey.Meta.table.delete().where(
+        IdempotencyKey.Meta.table.c.request_key == sqlalchemy.bindparam("request_key"),
+        IdempotencyKey.Meta.table.c.expires_at <= sqlalchemy.bindparam("now")
+    )
+)
+complete_idempotency_key = statements.register(
+    "complete_idempotency_key",
+    IdempotencyKey.Meta.table.update().where(
+        IdempotencyKey.Meta.table.c.request_key == sqlalchemy.bindparam("request_key"),
+        IdempotencyKey.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).values(
+        response=sqlalchemy.bindparam("response"),
+        expires_at=sqlalchemy.bindparam("expires_at")
+    )
+)
+release_idempotency_key = statements.register(
+    "release_idempotency_key",
+    IdempotencyKey.Meta.table.delete().where(
+        IdempotencyKey.Meta.table.c.request_key == sqlalchemy.bindparam("request_key"),
+        IdempotencyKey.Meta.table.c.token == sqlalchemy.bindparam("token")
+    )
+)
+purge_idempotency_keys = statements.register(
+    "purge_idempotency_keys",
+    IdempotencyKey.Meta.table.delete().where(
+        IdempotencyKey.Meta.table.c.expires_at <= sqlalchemy.bindparam("now")
+    )
+)
+
+
+class IdempotencyRepository:
+    @staticmethod
+    async def claim(request_key: str, token: str, in_flight_ttl: float) -> Optional[dict]:
+        """
+        Use this method to start processing a request, or to find out that another
+        call already processed it or is processing it.
+
+        An expired entry of the request is dropped first, so a marker left by a call
+        that never finished is taken over once its TTL passes.
+
+        Args:
+            request_key (str): The key of the request.
+            token (str): The unique identifier of the calling process.
+            in_flight_ttl (float): Seconds the in-flight marker is valid.
+
+        Returns:
+            Optional[dict]: The entry of the request, the claim succeeded if its token
+            is the given token. None if the entry was released meanwhile.
+        """
+        now = datetime.now()
+
+        await delete_expired_idempotency_key.execute(request_key=request_key, now=now)
+        await claim_idempotency_key.execute(
+            request_key=request_key,
+            token=token,
+            date_created=now,
+            expires_at=now + timedelta(seconds=in_flight_ttl)
+        )
+
+        return await idempotency_key_by_request_key.fetch_one(request_key=request_key)
+
+    @staticmethod
+    async def claim_many(request_keys: Sequence[str], token: str, in_flight_ttl: float) -> Dict[str, dict]:
+        """
+        Use this method to claim many requests at once, like claim, with one
+        statement per step.
+
+        Args:
+            request_keys (Sequence[str]): The keys of the requests, without repeats.
+            token (str): The unique identifier of the calling process.
+            in_flight_ttl (float): Seconds the in-flight markers are valid.
+
+        Returns:
+            Dict[str, dict]: The entry of each request by key, claimed if its token
+            is the given token. Requests whose entry was released meanwhile are missing.
+        """
+        if not request_keys:
+            return {}
+
+        table = IdempotencyKey.Meta.table
+        database = IdempotencyKey.Meta.database
+        request_keys = list(request_keys)
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=in_flight_ttl)
+
+        await database.execute(
+            table.delete().where(table.c.request_key.in_(request_keys), table.c.expires_at <= now)
+        )
+        await claim_idempotency_key.execute_many([
+            {"request_key": request_key, "token": token, "date_created": now, "expires_at": expires_at}
+            for request_key in request_keys
+        ])
+
+        rows = await database.fetch_all(
+            sqlalchemy.select([table]).where(table.c.request_key.in_(request_keys))
+        )
+        return {row["request_key"]: dict(row._mapping) for row in rows}
+
+    @staticmethod
+    async def complete(request_key: str, token: str, response: dict, retention: float) -> None:
+        """
+        Use this method to store the response of a claimed request, so duplicates of
+        the request get it back until the retention passes.
+
+        Args:
+            request_key (str): The key of the request.
+            token (str): The token the request was claimed with.
+            response (dict): The response of the request.
+            retention (float): Seconds the response is kept.
+        """
+        await complete_idempotency_key.execute(
+            request_key=request_key,
+            token=token,
+            response=json.dumps(response),
+            expires_at=datetime.now() + timedelta(seconds=retention)
+        )
+
+    @staticmethod
+    async def complete_many(responses: Dict[str, dict], token: str, retention: float) -> None:
+        """
+        Use this method to store the responses of many claimed requests, like complete.
+
+        Args:
+            responses (Dict[str, dict]): The response of each request by key.
+            token (str): The token the requests were claimed with.
+            retention (float): Seconds the responses are kept.
+        """
+        if not responses:
+            return
+
+        expires_at = datetime.now() + timedelta(seconds=retention)
+        await complete_idempotency_key.execute_many([
+            {
+                "request_key": request_key,
+                "token": token,
+                "response": json.dumps(response),
+                "expires_at": expires_at,
+            }
+            for request_key, response in responses.items()
+        ])
+
+    @staticmethod
+    async def release(request_key: str, token: str) -> None:
+        """
+        Use this method to drop the in-flight marker of a claimed request that did not
+        complete, so the next duplicate processes the request again.
+
+        Args:
+            request_key (str): The key of the request.
+            token (str): The token the request was claimed with.
+        """
+        await release_idempotency_key.execute(request_key=request_key, token=token)
+
+    @staticmethod
+    async def release_many(request_keys: List[str], token: str) -> None:
+        """
+        Use this method to drop the in-flight markers of many claimed requests, like release.
+
+        Args:
+            request_keys (List[str]): The keys of the requests.
+            token (str): The token the requests were claimed with.
+        """
+        if not request_keys:
+            return
+
+        await release_idempotency_key.execute_many([
+            {"request_key": request_key, "token": token} for request_key in request_keys
+        ])
+
+    @staticmethod
+    async def delete_responses(request_keys: Sequence[str]) -> None:
+        """
+        Use this method to drop the stored responses of requests whose effect was
+        undone, so their next duplicate processes the request again. In-flight
+        markers are kept.
+
+        Args:
+            request_keys (Sequence[str]): The keys of the requests.
+        """
+        if not request_keys:
+            return
+
+        table = IdempotencyKey.Meta.table
+        await IdempotencyKey.Meta.database.execute(
+            table.delete().where(table.c.request_key.in_(list(request_keys)), table.c.response.isnot(None))
+        )
+
+    @staticmethod
+    async def purge_expired() -> None:
+        """
+        Use this method to delete the expired entries of every request.
+        """
+        await purge_idempotency_keys.execute(now=datetime.now())
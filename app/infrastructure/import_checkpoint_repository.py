@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Optional
+
+import sqlalchemy
+
+from app.database.models import ImportCheckpoint
+from app.database.statements import statements
+
+
+# Fields of a checkpoint, as DebtImportService reads and writes them.
+CHECKPOINT_FIELDS = ("offset", "rows", "created", "rejected")
+
+import_checkpoint_by_name = statements.register(
+    "import_checkpoint_by_name",
+    sqlalchemy.select([
+        ImportCheckpoint.Meta.table.c[field] for field in CHECKPOINT_FIELDS
+    ]).where(
+        ImportCheckpoint.Meta.table.c.name == sqlalchemy.bindparam("name")
+    )
+)
+delete_import_checkpoint = statements.register(
+    "delete_import_checkpoint",
+    ImportCheckpoint.Meta.table.delete().where(
+        ImportCheckpoint.Meta.table.c.name == sqlalchemy.bindparam("name")
+    )
+)
+insert_import_checkpoint = statements.register(
+    "insert_import_checkpoint",
+    ImportCheckpoint.Meta.table.insert().values({
+        column.name: sqlalchemy.bindparam(column.name, type_=column.type)
+        for column in ImportCheckpoint.Meta.table.columns
+    })
+)
+
+
+class ImportCheckpointRepository:
+    @staticmethod
+    async def get_checkpoint(name: str) -> Optional[dict]:
+        """
+        Args:
+            name (str): The name of the import.
+
+        Returns:
+            Optional[dict]: The offset, rows, created and rejected of the last
+            committed chunk, None if the import has not committed any.
+        """
+        return await import_checkpoint_by_name.fetch_one(name=name)
+
+    @staticmethod
+    async def save_checkpoint(name: str, checkpoint: dict) -> None:
+        """
+        Use this method inside the transaction of a chunk, so the checkpoint is
+        committed or rolled back with the rows of the chunk.
+
+        Args:
+            name (str): The name of the import.
+            checkpoint (dict): The offset, rows, created and rejected after the chunk.
+        """
+        await delete_import_checkpoint.execute(name=name)
+        await insert_import_checkpoint.execute(
+            name=name,
+            date_updated=datetime.now(),
+            **{field: checkpoint[field] for field in CHECKPOINT_FIELDS}
+        )
+
+    @staticmethod
+    async def delete_checkpoint(name: str) -> None:
+        """
+        Args:
+            name (str): The name of the import, so it starts again from the beginning.
+        """
+        await delete_import_checkpoint.execute(name=name)
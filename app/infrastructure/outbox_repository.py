@@ -0,0 +1,151 @@
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import sqlalchemy
+
+from app.database.models import OutboxEvent
+from app.database.statements import statements
+
+
+insert_outbox_event = statements.register(
+    "insert_outbox_event",
+    OutboxEvent.Meta.table.insert().values({
+        column: sqlalchemy.bindparam(column, type_=OutboxEvent.Meta.table.c[column].type)
+        for column in ("event_type", "payload", "attempts", "available_at", "date_created")
+    })
+)
+# Due events are taken with one statement, so dispatchers of several workers take
+# different events. Postgres skips the events another dispatcher is taking.
+claim_outbox_events = statements.register(
+    "claim_outbox_events",
+    OutboxEvent.Meta.table.update().where(
+        OutboxEvent.Meta.table.c.id.in_(
+            sqlalchemy.select([OutboxEvent.Meta.table.c.id]).where(
+                OutboxEvent.Meta.table.c.available_at <= sqlalchemy.bindparam("now")
+            ).order_by(
+                OutboxEvent.Meta.table.c.id
+            ).limit(
+                sqlalchemy.bindparam("limit", type_=sqlalchemy.Integer)
+            ).with_for_update(skip_locked=True)
+        )
+    ).values(
+        token=sqlalchemy.bindparam("token"),
+        attempts=OutboxEvent.Meta.table.c.attempts + 1,
+        available_at=sqlalchemy.bindparam("lease_until")
+    )
+)
+outbox_events_by_token = statements.register(
+    "outbox_events_by_token",
+    sqlalchemy.select([
+        OutboxEvent.Meta.table.c.id,
+        OutboxEvent.Meta.table.c.event_type,
+        OutboxEvent.Meta.table.c.payload,
+        OutboxEvent.Meta.table.c.attempts,
+        OutboxEvent.Meta.table.c.date_created,
+    ]).where(
+        OutboxEvent.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).order_by(OutboxEvent.Meta.table.c.id)
+)
+delete_outbox_events = statements.register(
+    "delete_outbox_events",
+    OutboxEvent.Meta.table.delete().where(
+        OutboxEvent.Meta.table.c.token == sqlalchemy.bindparam("token")
+    )
+)
+retry_outbox_events = statements.register(
+    "retry_outbox_events",
+    OutboxEvent.Meta.table.update().where(
+        OutboxEvent.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).values(
+        token=sqlalchemy.null(),
+        available_at=sqlalchemy.bindparam("available_at"),
+        last_error=sqlalchemy.bindparam("last_error")
+    )
+)
+outbox_backlog = statements.register(
+    "outbox_backlog",
+    sqlalchemy.select([
+        sqlalchemy.func.count(OutboxEvent.Meta.table.c.id).label("pending"),
+        sqlalchemy.func.min(OutboxEvent.Meta.table.c.date_created).label("oldest"),
+    ])
+)
+
+
+class OutboxRepository:
+    @staticmethod
+    async def add_events(events: Sequence[Tuple[str, dict]]) -> None:
+        """
+        Use this method inside the transaction of a change to write the events of
+        the change, so they are stored if and only if the change commits.
+
+        Args:
+            events (Sequence[Tuple[str, dict]]): The type and payload of each event.
+        """
+        if not events:
+            return
+
+        now = datetime.now()
+        await insert_outbox_event.execute_many([
+            {
+                "event_type": event_type,
+                "payload": json.dumps(payload, default=str),
+                "attempts": 0,
+                "available_at": now,
+                "date_created": now,
+            }
+            for event_type, payload in events
+        ])
+
+    @staticmethod
+    async def claim_due_events(token: str, limit: int, lease_until: datetime) -> List[dict]:
+        """
+        Use this method to take the oldest events that are due for delivery. The
+        events are not due again until the lease ends, so an event taken by a
+        dispatcher that stops is delivered again after the lease.
+
+        Args:
+            token (str): The unique identifier of the delivery.
+            limit (int): Maximum number of events.
+            lease_until (datetime): End of the lease of the events.
+
+        Returns:
+            List[dict]: The events in write order, with their payload decoded.
+        """
+        await claim_outbox_events.execute(
+            token=token, limit=limit, now=datetime.now(), lease_until=lease_until
+        )
+        rows = await outbox_events_by_token.fetch_all(token=token)
+        return [{**row, "payload": json.loads(row["payload"])} for row in rows]
+
+    @staticmethod
+    async def delete_events(token: str) -> None:
+        """
+        Use this method to drop the events of a delivery once they are delivered.
+
+        Args:
+            token (str): The token the events were taken with.
+        """
+        await delete_outbox_events.execute(token=token)
+
+    @staticmethod
+    async def retry_events(token: str, available_at: datetime, error: str) -> None:
+        """
+        Use this method to schedule the events of a failed delivery again.
+
+        Args:
+            token (str): The token the events were taken with.
+            available_at (datetime): When the events are due again.
+            error (str): The error of the delivery.
+        """
+        await retry_outbox_events.execute(token=token, available_at=available_at, last_error=error)
+
+    @staticmethod
+    async def get_backlog() -> Tuple[int, Optional[datetime]]:
+        """
+        Returns:
+            Tuple[int, Optional[datetime]]: The number of undelivered events and
+            the creation date of the oldest one, None if there is none.
+        """
+        row = await outbox_backlog.fetch_one()
+        return row["pending"], row["oldest"]
@@ -0,0 +1,91 @@
+# Destinations the outbox dispatcher delivers the payment events to.
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import List
+
+import httpx
+
+from app.settings import settings
+
+
+class OutboxSink(ABC):
+    """ Interface of the destinations of the outbox events.
+
+    A delivery either succeeds for every event of the batch or raises, and the
+    whole batch is delivered again later: receivers deduplicate by event id.
+    """
+
+    @abstractmethod
+    async def send(self, events: List[dict]) -> None:
+        """
+        Args:
+            events (List[dict]): The events, with their id, type, creation date and payload.
+
+        Raises:
+            Exception: If the events were not delivered.
+        """
+
+    async def close(self) -> None:
+        """ Release the resources of the sink. """
+
+
+class FileOutboxSink(OutboxSink):
+    """ Appends each event as a JSON line to a local file. """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the JSONL file.
+        """
+        self.path = path
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a") as file:
+            file.write(lines)
+            file.flush()
+
+    async def send(self, events: List[dict]) -> None:
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        await asyncio.to_thread(self._write, lines)
+
+
+class HttpOutboxSink(OutboxSink):
+    """ POSTs each batch as {"eventos": [...]} to an HTTP endpoint, any 2xx is a delivery. """
+
+    def __init__(self, url: str, timeout: float):
+        """
+        Args:
+            url (str): URL of the endpoint.
+            timeout (float): Seconds a delivery waits for the endpoint.
+        """
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def send(self, events: List[dict]) -> None:
+        response = await self.client.post(
+            self.url,
+            content=json.dumps({"eventos": events}, default=str),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_outbox_sink() -> OutboxSink:
+    """ Build the sink selected by settings.outbox_sink.
+
+    Returns:
+        OutboxSink: A local JSONL file ("file") or an HTTP endpoint ("http").
+    """
+    if settings.outbox_sink == "file":
+        return FileOutboxSink(settings.outbox_file_path)
+
+    if settings.outbox_sink == "http":
+        if not settings.outbox_http_url:
+            raise ValueError("OUTBOX_HTTP_URL is required by the http outbox sink")
+        return HttpOutboxSink(settings.outbox_http_url, settings.outbox_http_timeout)
+
+    raise ValueError(f"Unknown outbox sink: {settings.outbox_sink}")
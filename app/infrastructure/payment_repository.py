@@ -1,8 +1,88 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
 
+import sqlalchemy
 from ormar import NoMatch
+from sqlalchemy.dialects import postgresql
 
+from app.database.config import ASYNCPG_SCHEMES, UNIQUE_VIOLATION_ERRORS
 from app.database.models import Payment, Debt
+from app.database.statements import statements
+
+
+PAYMENT_COLUMNS = (
+    "debt",
+    "emition_date",
+    "bank_code",
+    "operation_bank_number",
+    "gateway",
+    "payment_type",
+    "payment_amount",
+    "status",
+    "date_created",
+    "date_updated",
+)
+
+
+def _upsert_payment_statement() -> sqlalchemy.sql.CompoundSelect:
+    """ Update the payments of a debt, or insert its payment, and return the first one.
+
+    The UPDATE and the INSERT are data-modifying CTEs of the same statement. The
+    INSERT only runs when the debt has no payment to update, and a replayed
+    notification (same operation bank number, same debt) updates the row that a
+    concurrent notification inserted instead of failing.
+    """
+    payment_table = Payment.Meta.table
+
+    updated = payment_table.update().where(
+        payment_table.c.debt == sqlalchemy.bindparam("debt")
+    ).values(
+        status=sqlalchemy.bindparam("status"),
+        date_updated=sqlalchemy.bindparam("date_updated")
+    ).returning(*payment_table.columns).cte("updated")
+
+    new_payment = sqlalchemy.select([
+        sqlalchemy.cast(sqlalchemy.bindparam(column), payment_table.c[column].type)
+        for column in PAYMENT_COLUMNS
+    ]).where(
+        ~sqlalchemy.exists(sqlalchemy.select([updated.c.id]))
+    )
+    insert = postgresql.insert(payment_table).from_select(list(PAYMENT_COLUMNS), new_payment)
+    inserted = insert.on_conflict_do_update(
+        index_elements=[payment_table.c.operation_bank_number],
+        set_={"status": insert.excluded.status, "date_updated": insert.excluded.date_updated},
+        where=payment_table.c.debt == insert.excluded.debt
+    ).returning(*payment_table.columns).cte("inserted")
+
+    return sqlalchemy.union_all(
+        sqlalchemy.select([updated]),
+        sqlalchemy.select([inserted])
+    ).order_by("id").limit(1)
+
+
+payments_by_debt = statements.register(
+    "payments_by_debt",
+    sqlalchemy.select([Payment.Meta.table]).where(
+        Payment.Meta.table.c.debt == sqlalchemy.bindparam("debt")
+    ).order_by(Payment.Meta.table.c.id)
+)
+update_payment_status_by_debt = statements.register(
+    "update_payment_status_by_debt",
+    Payment.Meta.table.update().where(
+        Payment.Meta.table.c.debt == sqlalchemy.bindparam("debt")
+    ).values(
+        status=sqlalchemy.bindparam("status"),
+        date_updated=sqlalchemy.bindparam("date_updated")
+    )
+)
+insert_payment = statements.register(
+    "insert_payment",
+    Payment.Meta.table.insert().values({
+        column: sqlalchemy.bindparam(column) for column in PAYMENT_COLUMNS
+    })
+)
+# Postgres only, the other backends run upsert_payment in a transaction.
+upsert_payment = statements.register("upsert_payment", _upsert_payment_statement())
 
 
 class PaymentRepository:
@@ -61,15 +141,12 @@ class PaymentRepository:
 
         """
         try:
-            payments = await Payment.objects.select_related(
-                'debt'
-            ).filter(debt=debt).all()
-            return payments
-        except NoMatch:
-            return []
+            rows = await payments_by_debt.fetch_all(debt=debt.pk)
         except Exception as e:
             raise e
 
+        return [Payment(**{**row, "debt": debt}) for row in rows]
+
     @staticmethod
     async def update_payment_status(
         debt: Debt,
@@ -84,17 +161,248 @@ class PaymentRepository:
             Payment: An updated "Payment" instance.
         """
 
-        await Payment.objects.filter(
-            debt=debt,
-        ).update(
-            status=status
+        await update_payment_status_by_debt.execute(
+            debt=debt.pk,
+            status=status,
+            date_updated=datetime.now()
         )
+
+        payments = await PaymentRepository.get_payments_by_debt(debt=debt)
+        if not payments:
+            raise ValueError("Payment not found")
+
+        return payments[0]
+
+    @staticmethod
+    async def upsert_payment(
+        debt: Debt,
+        emition_date: datetime,
+        bank_code: str,
+        operation_bank_number: str,
+        gateway: str,
+        payment_type: str,
+        payment_amount: float,
+        status: str,
+    ) -> Payment:
+        """
+        Use this method to set the status of the payments of a debt, creating its
+        payment if it has none, and get the first payment back.
+
+        On Postgres it is a single INSERT ... ON CONFLICT ... RETURNING statement.
+        The other backends run the update, the insert and the select in one
+        transaction.
+
+        Args:
+            debt (Debt): The debt associated with the payment.
+            emition_date (datetime): The date of payment emition.
+            bank_code (str): The bank code.
+            operation_bank_number (str): The operation bank number.
+            gateway (str): The payment gateway.
+            payment_type (str): The type of payment.
+            payment_amount (float): The amount of payment.
+            status (str): The status of the payment.
+
+        Returns:
+            Payment: The first payment of the debt, updated or created.
+
+        Raises:
+            ValueError: If the operation bank number belongs to a payment of another debt.
+        """
+        now = datetime.now()
+        values = {
+            "debt": debt.pk,
+            "emition_date": emition_date,
+            "bank_code": bank_code,
+            "operation_bank_number": operation_bank_number,
+            "gateway": gateway,
+            "payment_type": payment_type,
+            "payment_amount": payment_amount,
+            "status": status,
+            "date_created": now,
+            "date_updated": now,
+        }
+        database = Payment.Meta.database
+
+        if database.url.scheme in ASYNCPG_SCHEMES:
+            row = await upsert_payment.fetch_one(**values)
+        else:
+            async with database.transaction():
+                await update_payment_status_by_debt.execute(
+                    debt=debt.pk,
+                    status=status,
+                    date_updated=now
+                )
+                row = await payments_by_debt.fetch_one(debt=debt.pk)
+                if row is None:
+                    try:
+                        await insert_payment.execute(**values)
+                    except UNIQUE_VIOLATION_ERRORS as e:
+                        raise ValueError(
+                            f"Operation bank number {operation_bank_number} belongs to another debt"
+                        ) from e
+                    row = await payments_by_debt.fetch_one(debt=debt.pk)
+
+        if row is None:
+            raise ValueError(
+                f"Operation bank number {operation_bank_number} belongs to another debt"
+            )
+
+        return Payment(**{**row, "debt": debt})
+
+    @staticmethod
+    async def upsert_payments(payments: List[dict]) -> Dict[str, int]:
+        """
+        Use this method inside a transaction to run upsert_payment for many debts
+        with set-based statements: one UPDATE per status, one SELECT of the first
+        payments, and one INSERT executed for every debt without a payment.
+
+        Args:
+            payments (List[dict]): The upsert_payment values of each debt, with the
+                operation identifier of the debt as "debt", one per debt.
+
+        Returns:
+            Dict[str, int]: The id of the first payment of each debt. Debts whose
+            operation bank number belongs to a payment of another debt are missing.
+        """
+        payment_table = Payment.Meta.table
+        database = Payment.Meta.database
+        now = datetime.now()
+
+        debts_by_status = {}
+        for payment in payments:
+            debts_by_status.setdefault(payment["status"], []).append(payment["debt"])
+        for status, debts in debts_by_status.items():
+            await database.execute(
+                payment_table.update().where(payment_table.c.debt.in_(debts)).values(
+                    status=status,
+                    date_updated=now
+                )
+            )
+
+        first_payments = await PaymentRepository._first_payment_ids(
+            [payment["debt"] for payment in payments]
+        )
+        new_payments = [
+            {**payment, "date_created": now, "date_updated": now}
+            for payment in payments
+            if payment["debt"] not in first_payments
+        ]
+        if not new_payments:
+            return first_payments
+
+        # Savepoints, so a payment of another debt does not abort the transaction.
         try:
-            return await Payment.objects.filter(debt=debt).first()
-        except NoMatch as exc:
-            raise ValueError("Payment not found") from exc
-        except Exception as e:
-            raise e
+            async with database.transaction():
+                await insert_payment.execute_many(new_payments)
+        except UNIQUE_VIOLATION_ERRORS:
+            for payment in new_payments:
+                try:
+                    async with database.transaction():
+                        await insert_payment.execute(**payment)
+                except UNIQUE_VIOLATION_ERRORS:
+                    pass
+
+        first_payments.update(
+            await PaymentRepository._first_payment_ids([payment["debt"] for payment in new_payments])
+        )
+        return first_payments
+
+    @staticmethod
+    async def lock_paid_payments(
+        bank_code: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        operation_bank_numbers: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        """
+        Use this method inside a transaction to find paid payments, either of a bank
+        in an emition date range or by operation bank number, in id order, and lock
+        them until the transaction ends. SQLite has no row locks, the caller holds
+        the database write lock instead.
+
+        Args:
+            bank_code (Optional[str]): The bank code of the payments.
+            date_from (Optional[datetime]): First emition date of the payments.
+            date_to (Optional[datetime]): Last emition date of the payments, the whole day included.
+            after_id (int): Only payments with a greater id, to read the payments in pages.
+            limit (Optional[int]): Maximum number of payments.
+            operation_bank_numbers (Optional[Sequence[str]]): The operation bank
+                numbers of the payments, instead of the bank and dates.
+
+        Returns:
+            List[dict]: The id, debt, bank code and operation bank number of each
+            payment, with the client and product code of its debt.
+        """
+        payment_table = Payment.Meta.table
+        debt_table = Debt.Meta.table
+
+        if operation_bank_numbers is not None:
+            conditions = [payment_table.c.operation_bank_number.in_(list(operation_bank_numbers))]
+        else:
+            conditions = [
+                payment_table.c.bank_code == bank_code,
+                payment_table.c.emition_date >= date_from,
+                payment_table.c.emition_date < date_to + timedelta(days=1),
+            ]
+
+        statement = sqlalchemy.select(
+            [
+                payment_table.c.id,
+                payment_table.c.debt,
+                payment_table.c.bank_code,
+                payment_table.c.operation_bank_number,
+                debt_table.c.client,
+                debt_table.c.product_code,
+            ]
+        ).select_from(
+            payment_table.join(debt_table, payment_table.c.debt == debt_table.c.operation_identifier)
+        ).where(
+            payment_table.c.status == "paid",
+            payment_table.c.id > after_id,
+            *conditions
+        ).order_by(payment_table.c.id).limit(limit).with_for_update(of=payment_table)
+
+        rows = await Payment.Meta.database.fetch_all(statement)
+        return [dict(row._mapping) for row in rows]
+
+    @staticmethod
+    async def set_payments_status(payment_ids: Sequence[int], status: str) -> None:
+        """
+        Use this method to set the status of many payments with one UPDATE.
+
+        Args:
+            payment_ids (Sequence[int]): The ids of the payments.
+            status (str): The status of the payments.
+        """
+        if not payment_ids:
+            return
+
+        payment_table = Payment.Meta.table
+        await Payment.Meta.database.execute(
+            payment_table.update().where(payment_table.c.id.in_(list(payment_ids))).values(
+                status=status,
+                date_updated=datetime.now()
+            )
+        )
+
+    @staticmethod
+    async def _first_payment_ids(debts: Sequence[str]) -> Dict[str, int]:
+        """
+        Args:
+            debts (Sequence[str]): The operation identifiers of the debts.
+
+        Returns:
+            Dict[str, int]: The id of the first payment of each debt that has one.
+        """
+        payment_table = Payment.Meta.table
+        rows = await Payment.Meta.database.fetch_all(
+            sqlalchemy.select([payment_table.c.debt, sqlalchemy.func.min(payment_table.c.id)]).where(
+                payment_table.c.debt.in_(list(debts))
+            ).group_by(payment_table.c.debt)
+        )
+        return {row[0]: row[1] for row in rows}
 
     @staticmethod
     async def delete_payment(payment_id: int) -> bool:
@@ -0,0 +1,234 @@
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import sqlalchemy
+
+from app.database.models import RevertJob
+from app.database.statements import statements
+
+
+# Statuses of the jobs that still have payments to revert.
+UNFINISHED_STATUSES = ("pending", "running")
+
+claim_revert_job = statements.register(
+    "claim_revert_job",
+    RevertJob.Meta.table.update().where(
+        RevertJob.Meta.table.c.id == sqlalchemy.bindparam("id"),
+        # An IN list would be expanded at execution, the registry runs the compiled SQL.
+        sqlalchemy.or_(*(RevertJob.Meta.table.c.status == status for status in UNFINISHED_STATUSES)),
+        sqlalchemy.or_(
+            RevertJob.Meta.table.c.token.is_(None),
+            RevertJob.Meta.table.c.token == sqlalchemy.bindparam("token"),
+            RevertJob.Meta.table.c.heartbeat_at <= sqlalchemy.bindparam("expired_before"),
+        )
+    ).values(
+        status="running",
+        token=sqlalchemy.bindparam("token"),
+        heartbeat_at=sqlalchemy.bindparam("now"),
+        date_updated=sqlalchemy.bindparam("now")
+    )
+)
+# The heartbeat write also locks the job row, SQLite takes the database write lock.
+beat_revert_job = statements.register(
+    "beat_revert_job",
+    RevertJob.Meta.table.update().where(
+        RevertJob.Meta.table.c.id == sqlalchemy.bindparam("id"),
+        RevertJob.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).values(heartbeat_at=sqlalchemy.bindparam("now"))
+)
+# The operation bank numbers of a job are read once per run, not with every chunk.
+revert_job_by_id_and_token = statements.register(
+    "revert_job_by_id_and_token",
+    sqlalchemy.select([
+        column for column in RevertJob.Meta.table.c if column.name != "operation_bank_numbers"
+    ]).where(
+        RevertJob.Meta.table.c.id == sqlalchemy.bindparam("id"),
+        RevertJob.Meta.table.c.token == sqlalchemy.bindparam("token"),
+        RevertJob.Meta.table.c.status == "running"
+    )
+)
+advance_revert_job = statements.register(
+    "advance_revert_job",
+    RevertJob.Meta.table.update().where(
+        RevertJob.Meta.table.c.id == sqlalchemy.bindparam("id"),
+        RevertJob.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).values(
+        cursor=sqlalchemy.bindparam("cursor"),
+        reverted=RevertJob.Meta.table.c.reverted + sqlalchemy.bindparam("reverted"),
+        date_updated=sqlalchemy.bindparam("now")
+    )
+)
+finish_revert_job = statements.register(
+    "finish_revert_job",
+    RevertJob.Meta.table.update().where(
+        RevertJob.Meta.table.c.id == sqlalchemy.bindparam("id"),
+        RevertJob.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).values(
+        status=sqlalchemy.bindparam("status"),
+        error=sqlalchemy.bindparam("error"),
+        token=sqlalchemy.null(),
+        heartbeat_at=sqlalchemy.null(),
+        date_updated=sqlalchemy.bindparam("now")
+    )
+)
+release_revert_job = statements.register(
+    "release_revert_job",
+    RevertJob.Meta.table.update().where(
+        RevertJob.Meta.table.c.id == sqlalchemy.bindparam("id"),
+        RevertJob.Meta.table.c.token == sqlalchemy.bindparam("token")
+    ).values(token=sqlalchemy.null(), heartbeat_at=sqlalchemy.null())
+)
+
+
+class RevertJobRepository:
+    @staticmethod
+    async def create_job(
+        bank_code: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        operation_bank_numbers: Optional[List[str]] = None
+    ) -> RevertJob:
+        """
+        Use this method to create a pending revert job, either for the payments of
+        a bank in an emition date range or for a list of operation bank numbers.
+
+        Args:
+            bank_code (Optional[str]): The bank code of the payments.
+            date_from (Optional[datetime]): First emition date of the payments.
+            date_to (Optional[datetime]): Last emition date of the payments, included.
+            operation_bank_numbers (Optional[List[str]]): The operation bank numbers
+                of the payments, instead of the bank and dates.
+
+        Returns:
+            RevertJob: The created job.
+        """
+        return await RevertJob.objects.create(
+            bank_code=bank_code,
+            date_from=date_from,
+            date_to=date_to,
+            operation_bank_numbers=(
+                json.dumps(operation_bank_numbers) if operation_bank_numbers is not None else None
+            )
+        )
+
+    @staticmethod
+    async def get_job(job_id: int) -> Optional[RevertJob]:
+        """
+        Args:
+            job_id (int): The id of the job.
+
+        Returns:
+            Optional[RevertJob]: The job, None if it does not exist.
+        """
+        return await RevertJob.objects.get_or_none(id=job_id)
+
+    @staticmethod
+    async def get_operation_bank_numbers(job_id: int) -> Optional[List[str]]:
+        """
+        Args:
+            job_id (int): The id of the job.
+
+        Returns:
+            Optional[List[str]]: The operation bank numbers of a job given as a
+            list, None for a job of a bank and dates.
+        """
+        table = RevertJob.Meta.table
+        operation_bank_numbers = await RevertJob.Meta.database.fetch_val(
+            sqlalchemy.select([table.c.operation_bank_numbers]).where(table.c.id == job_id)
+        )
+        return json.loads(operation_bank_numbers) if operation_bank_numbers is not None else None
+
+    @staticmethod
+    async def get_unfinished_job_ids() -> List[int]:
+        """
+        Returns:
+            List[int]: The ids of the pending and running jobs, oldest first.
+        """
+        table = RevertJob.Meta.table
+        rows = await RevertJob.Meta.database.fetch_all(
+            sqlalchemy.select([table.c.id]).where(
+                table.c.status.in_(UNFINISHED_STATUSES)
+            ).order_by(table.c.id)
+        )
+        return [row["id"] for row in rows]
+
+    @staticmethod
+    async def claim_job(job_id: int, token: str, heartbeat_ttl: float) -> bool:
+        """
+        Use this method to start running an unfinished job. A job claimed by another
+        process is taken over once its heartbeat is older than the TTL, so the job
+        of a process that died is resumed.
+
+        Args:
+            job_id (int): The id of the job.
+            token (str): The unique identifier of the calling process.
+            heartbeat_ttl (float): Seconds without heartbeat after which a claim expires.
+
+        Returns:
+            bool: Whether the job is now claimed with the given token.
+        """
+        now = datetime.now()
+        await claim_revert_job.execute(
+            id=job_id, token=token, now=now, expired_before=now - timedelta(seconds=heartbeat_ttl)
+        )
+        return await revert_job_by_id_and_token.fetch_one(id=job_id, token=token) is not None
+
+    @staticmethod
+    async def lock_job(job_id: int, token: str) -> Optional[dict]:
+        """
+        Use this method inside a transaction to renew the heartbeat of a claimed job
+        and lock it until the transaction ends.
+
+        Args:
+            job_id (int): The id of the job.
+            token (str): The token the job was claimed with.
+
+        Returns:
+            Optional[dict]: The job without its operation bank numbers, None if
+            the claim was taken over meanwhile.
+        """
+        await beat_revert_job.execute(id=job_id, token=token, now=datetime.now())
+        return await revert_job_by_id_and_token.fetch_one(id=job_id, token=token)
+
+    @staticmethod
+    async def advance_job(job_id: int, token: str, cursor: int, reverted: int) -> None:
+        """
+        Use this method in the transaction of a chunk to save the progress of the job.
+
+        Args:
+            job_id (int): The id of the job.
+            token (str): The token the job was claimed with.
+            cursor (int): The new cursor of the job.
+            reverted (int): Payments reverted by the chunk.
+        """
+        await advance_revert_job.execute(
+            id=job_id, token=token, cursor=cursor, reverted=reverted, now=datetime.now()
+        )
+
+    @staticmethod
+    async def finish_job(job_id: int, token: str, status: str, error: Optional[str] = None) -> None:
+        """
+        Use this method to end a claimed job.
+
+        Args:
+            job_id (int): The id of the job.
+            token (str): The token the job was claimed with.
+            status (str): "completed" or "failed".
+            error (Optional[str]): The error that stopped a failed job.
+        """
+        await finish_revert_job.execute(
+            id=job_id, token=token, status=status, error=error, now=datetime.now()
+        )
+
+    @staticmethod
+    async def release_job(job_id: int, token: str) -> None:
+        """
+        Use this method to drop the claim of a job that stops before its end, so
+        the next claim resumes it without waiting for the TTL.
+
+        Args:
+            job_id (int): The id of the job.
+            token (str): The token the job was claimed with.
+        """
+        await release_revert_job.execute(id=job_id, token=token)
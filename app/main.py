@@ -1,12 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from typing import Literal, Optional
 
-from app.database.config import database
-from app.schemas.request import DebtStatusPOSTRequest
-from app.schemas.request.payment_post_request import PaymentUpdatePOSTRequest
-from app.schemas.response import DebtUpdatePOSTResponse, DebtStatusPOSTResponse
-from app.schemas.request import RevertDebtPaymentPOSTRequest
-from app.schemas.response import RevertDebtPaymentPOSTResponse
-from app.service import PaymentService, DebtService
+from fastapi import FastAPI, Header
+from fastapi.responses import Response, StreamingResponse
+
+from app.adapter import IdempotencyAdapter, OutboxAdapter, RevertJobAdapter
+from app.database.config import create_schema, database, warm_up_database
+from app.infrastructure import create_outbox_sink
+from app.schemas.request import DebtBulkPOSTRequest, DebtStatusBatchPOSTRequest, DebtStatusPOSTRequest
+from app.schemas.request.payment_post_request import PaymentBatchPOSTRequest, PaymentUpdatePOSTRequest
+from app.schemas.response import (
+    DebtBulkPOSTResponse,
+    DebtUpdatePOSTResponse,
+    DebtStatusBatchPOSTResponse,
+    DebtStatusPOSTResponse,
+    PaymentBatchPOSTResponse
+)
+from app.schemas.request import RevertDebtPaymentPOSTRequest, RevertJobPOSTRequest
+from app.schemas.response import OutboxMetricsResponse, RevertDebtPaymentPOSTResponse, RevertJobResponse
+from app.service import PaymentService, DebtService, RevertJobService
+from app.settings import settings
+from app.utils.responses import FastJSONResponse
+from app.utils.tools import build_response
 
 
 app = FastAPI(
@@ -14,19 +30,51 @@ app = FastAPI(
     description="API to validate the Client Debts status",
     version="0.1.0",
     docs_url="/",
+    default_response_class=FastJSONResponse,
 )
 
 API_VERSION = "v1"
 
+background_tasks: set[asyncio.Task] = set()
+
 
 @app.on_event("startup")
 async def startup():
+    # Built first, a misconfigured sink fails the startup instead of the dispatcher.
+    outbox_sink = create_outbox_sink()
+
+    if settings.db_create_schema_on_startup:
+        await asyncio.to_thread(create_schema)
+
     if not database.is_connected:
         await database.connect()
+        await warm_up_database(database)
+        if database.replica is not None and database.replica.is_connected:
+            await warm_up_database(database.replica)
+
+    background_tasks.add(asyncio.create_task(
+        IdempotencyAdapter.purge_expired_periodically(settings.idempotency_purge_interval)
+    ))
+    background_tasks.add(asyncio.create_task(
+        RevertJobAdapter.resume_unfinished_periodically(settings.revert_job_resume_interval)
+    ))
+    background_tasks.add(asyncio.create_task(
+        OutboxAdapter.dispatch_periodically(settings.outbox_poll_interval, outbox_sink)
+    ))
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    for task in background_tasks:
+        task.cancel()
+    # Tasks that had already failed are logged, they must not skip the disconnect.
+    results = await asyncio.gather(*background_tasks, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logging.error(f"Background task failed: {result!r}")
+    background_tasks.clear()
+    await RevertJobAdapter.stop()
+
     if database.is_connected:
         await database.disconnect()
 
@@ -36,12 +84,19 @@ async def shutdown():
     response_model=DebtStatusPOSTResponse,
     status_code=200
 )
-async def payment_post_endpoint(post_request: DebtStatusPOSTRequest):
+async def payment_post_endpoint(
+    post_request: DebtStatusPOSTRequest,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     POST endpoint to check the debts of a client
 
+    The response carries the ETag of the debts of the client, and a request
+    whose If-None-Match lists it gets a 304 Not Modified without a body.
+
     Args:
         post_request (POSTRequest): Request body
+        if_none_match (Optional[str]): ETags of the responses the caller has
 
     Returns:
         DebtStatusPOSTResponse: Response body
@@ -71,9 +126,68 @@ async def payment_post_endpoint(post_request: DebtStatusPOSTRequest):
         }
 
     """
-    service_payment = await DebtService.debt_status(post_request.dict())
-    
-    return DebtStatusPOSTResponse(**service_payment)
+    etag, service_payment = await DebtService.debt_status_if_modified(post_request, if_none_match)
+    headers = {"ETag": etag} if etag is not None else None
+
+    if service_payment is None:
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse(build_response(DebtStatusPOSTResponse, service_payment), headers=headers)
+
+
+@app.post(
+    f"/{API_VERSION}/debt-status/batch",
+    response_model=DebtStatusBatchPOSTResponse,
+    status_code=200
+)
+async def debt_status_batch_endpoint(post_request: DebtStatusBatchPOSTRequest):
+    """
+    POST endpoint to check the debts of many clients at once
+
+    Args:
+        post_request (DebtStatusBatchPOSTRequest): Request body, the idConsulta
+            and codigoProducto of each client in "consultas"
+
+    Returns:
+        DebtStatusBatchPOSTResponse: The debt-status response of each client
+
+    Examples:
+
+        {
+            "codigoRespuesta": "00",
+            "descripcionResp": "OK",
+            "resultados": [
+                {
+                    "fila": 1,
+                    "idConsulta": "10000002",
+                    "codigoProducto": "001",
+                    "Cliente": "Juan Perez",
+                    "CodigoRespuesta": "00",
+                    "DescRespuesta": "OK",
+                    "deudasPendientes": [
+                        {
+                            "CodigoProducto": "001",
+                            "NumDocumento": "B01-0000000001",
+                            "DescDocumento": "FACTURA",
+                            "FechaVencimiento": "11092019",
+                            "FechaEmision": "11092019",
+                            "Deuda": 2080.00,
+                            "Mora": 0.00,
+                            "GastosAdm": 0.00,
+                            "PagoMinimo": 100.00,
+                            "Periodo": "00",
+                            "Anio": "2019",
+                            "Cuota": "00",
+                            "MonedaDoc": "1"
+                        }
+                    ]
+                }
+            ]
+        }
+    """
+    batch_service = await DebtService.debts_status(post_request)
+
+    return FastJSONResponse(build_response(DebtStatusBatchPOSTResponse, batch_service))
 
 
 @app.post(
@@ -110,9 +224,47 @@ async def update_debt_payment_endpoint(post_request: PaymentUpdatePOSTRequest):
         }
     """
 
-    debt_service = await PaymentService.update_debt_payment(post_request.dict())
+    debt_service = await PaymentService.update_debt_payment(post_request)
 
-    return DebtUpdatePOSTResponse(**debt_service)
+    return FastJSONResponse(build_response(DebtUpdatePOSTResponse, debt_service))
+
+
+@app.post(
+    f"/{API_VERSION}/update-debt-payment/batch",
+    response_model=PaymentBatchPOSTResponse,
+    status_code=200
+)
+async def update_debt_payment_batch_endpoint(post_request: PaymentBatchPOSTRequest):
+    """
+    POST endpoint to notify many payments at once
+
+    Args:
+        post_request (PaymentBatchPOSTRequest): Request body, a list of
+            update-debt-payment bodies in "pagos"
+
+    Returns:
+        PaymentBatchPOSTResponse: The update-debt-payment response of each payment
+
+    Examples:
+
+        {
+            "codigoRespuesta": "00",
+            "descripcionResp": "OK",
+            "resultados": [
+                {
+                    "fila": 1,
+                    "numOperacionBanco": "654321234567",
+                    "codigoRespuesta": "00",
+                    "nombreCliente": "Juan Perez",
+                    "numOperacionERP": "1",
+                    "descripcionResp": "OK"
+                }
+            ]
+        }
+    """
+    batch_service = await PaymentService.update_debt_payments(post_request)
+
+    return FastJSONResponse(build_response(PaymentBatchPOSTResponse, batch_service))
 
 
 @app.post(
@@ -133,6 +285,171 @@ async def revert_debt_payment_endpoint(post_request: RevertDebtPaymentPOSTReques
     Examples:
     """
 
-    reverse_service = await PaymentService.revert_payment_debt(post_request.dict())
+    reverse_service = await PaymentService.revert_payment_debt(post_request)
+
+    return FastJSONResponse(build_response(RevertDebtPaymentPOSTResponse, reverse_service))
+
+
+@app.post(
+    f"/{API_VERSION}/debts/bulk",
+    response_model=DebtBulkPOSTResponse,
+    status_code=200
+)
+async def bulk_debts_endpoint(post_request: DebtBulkPOSTRequest):
+    """
+    POST endpoint to create many debts at once
+
+    Args:
+        post_request (DebtBulkPOSTRequest): Request body
+
+    Returns:
+        DebtBulkPOSTResponse: Response body
+
+    Examples:
+
+        {
+            "codigoRespuesta": "01",
+            "descripcionResp": "PROCESADO CON ERRORES",
+            "recibidas": 2,
+            "creadas": 1,
+            "clientesCreados": 0,
+            "deudas": [
+                {"fila": 1, "numDocumento": "B01-0000000003"}
+            ],
+            "errores": [
+                {"fila": 2, "numDocumento": null, "errores": ["codigoProducto: Must have length 3"]}
+            ]
+        }
+    """
+    bulk_service = await DebtService.bulk_create_debts(post_request)
+
+    return FastJSONResponse(build_response(DebtBulkPOSTResponse, bulk_service))
+
+
+@app.get(
+    f"/{API_VERSION}/debts/export",
+    response_class=StreamingResponse,
+    status_code=200
+)
+async def export_debts_endpoint(
+    codigoProducto: Optional[str] = None,
+    monedaDoc: Optional[str] = None,
+    estado: Optional[Literal["pending", "paid"]] = None
+):
+    """
+    GET endpoint to export the debts as NDJSON, one debt per line
+
+    Args:
+        codigoProducto (Optional[str]): Only the debts of this product
+        monedaDoc (Optional[str]): Only the debts in this currency
+        estado (Optional[str]): Only the debts with a pending payment, or the
+            paid ones
+
+    Returns:
+        StreamingResponse: The debts in operation identifier order, streamed as
+        they are read
+
+    Examples:
+
+        {"numDocumento": "B01-0000000001", "idCliente": "10000002", "nombreCliente": "Juan Perez", "codigoProducto": "001", "descDocumento": "FACTURA", "fechaEmision": "11092019", "fechaVencimiento": "11102019", "deuda": 2080.0, "mora": 0.0, "gastosAdm": 0.0, "pagoMinimo": 100.0, "periodo": "00", "cuota": "00", "monedaDoc": "1", "estado": "pending"}
+    """
+    return StreamingResponse(
+        DebtService.export_debts(product_code=codigoProducto, currency=monedaDoc, status=estado),
+        media_type="application/x-ndjson"
+    )
+
+
+@app.post(
+    f"/{API_VERSION}/revert-jobs",
+    response_model=RevertJobResponse,
+    status_code=200
+)
+async def create_revert_job_endpoint(post_request: RevertJobPOSTRequest):
+    """
+    POST endpoint to revert the payments of a bank incident in the background
+
+    Args:
+        post_request (RevertJobPOSTRequest): Request body, the bank and emition
+            dates of the payments, or their bank operation numbers
+
+    Returns:
+        RevertJobResponse: The created job, read its progress with GET /v1/revert-jobs/{id}
+
+    Examples:
+
+        {
+            "codigoBanco": "0001",
+            "fechaDesde": "01012024",
+            "fechaHasta": "02012024"
+        }
+    """
+    job_service = await RevertJobService.create_revert_job(post_request)
+
+    return FastJSONResponse(build_response(RevertJobResponse, job_service))
+
+
+@app.get(
+    f"/{API_VERSION}/revert-jobs/{{job_id}}",
+    response_model=RevertJobResponse,
+    status_code=200
+)
+async def get_revert_job_endpoint(job_id: int):
+    """
+    GET endpoint to follow a revert job
+
+    Args:
+        job_id (int): The idReversion of the job
+
+    Returns:
+        RevertJobResponse: Status of the job and payments reverted so far
+
+    Examples:
+
+        {
+            "codigoRespuesta": "00",
+            "descripcionResp": "OK",
+            "idReversion": 1,
+            "estado": "running",
+            "revertidos": 1500,
+            "error": null
+        }
+    """
+    job_service = await RevertJobService.get_revert_job(job_id)
+
+    return FastJSONResponse(build_response(RevertJobResponse, job_service))
+
+
+@app.get(
+    f"/{API_VERSION}/outbox/metrics",
+    response_model=OutboxMetricsResponse,
+    status_code=200
+)
+async def outbox_metrics_endpoint():
+    """
+    GET endpoint to follow the delivery of the payment events
+
+    Returns:
+        OutboxMetricsResponse: Undelivered events and seconds since the oldest of
+        them was written, and the delivery counters of the worker that answers
+
+    Examples:
+
+        {
+            "pendientes": 12,
+            "retrasoSegundos": 0.8,
+            "entregados": 15230,
+            "entregasFallidas": 2,
+            "ultimoRetrasoEntregaSegundos": 0.05,
+            "ultimoError": null
+        }
+    """
+    metrics = await OutboxAdapter.metrics()
 
-    return RevertDebtPaymentPOSTResponse(**reverse_service)
+    return FastJSONResponse(build_response(OutboxMetricsResponse, dict(
+        pendientes=metrics["pending"],
+        retrasoSegundos=metrics["lag"],
+        entregados=metrics["delivered"],
+        entregasFallidas=metrics["failed_deliveries"],
+        ultimoRetrasoEntregaSegundos=metrics["last_delivery_lag"],
+        ultimoError=metrics["last_error"]
+    )))
@@ -0,0 +1,118 @@
+# Constrained field types shared by the request and response schemas.
+import re
+import sys
+from typing import Any, Callable, Optional, Type
+
+from pydantic import ConstrainedStr
+from pydantic.validators import str_validator
+
+from app.utils.tools import parse_date
+
+
+def _constrained_text_type(
+    check: Callable[[Any], str],
+    min_length: Optional[int],
+    max_length: Optional[int],
+    pattern: Optional[str]
+) -> Type[str]:
+    """ A str type validated by check alone, which declares its constraints in the OpenAPI schema.
+
+    Each validator of a field is a call per field per validation, so check also
+    converts the values pydantic accepts for a str, instead of str_validator.
+    """
+    return type(
+        "ConstrainedTextValue",
+        (ConstrainedStr,),
+        {
+            "min_length": min_length,
+            "max_length": max_length,
+            "regex": re.compile(pattern) if pattern is not None else None,
+            "__get_validators__": classmethod(lambda cls: iter((check,))),
+        }
+    )
+
+
+def text(
+    length: Optional[int] = None,
+    *,
+    min_length: Optional[int] = None,
+    max_length: Optional[int] = None,
+    length_error: str,
+    pattern: Optional[str] = None,
+    pattern_error: Optional[str] = None
+) -> Type[str]:
+    """ A str with a length and optionally a pattern, rejected with the messages of the field.
+
+    pydantic's constr raises its own generic messages, the schemas keep theirs.
+    The length is checked first, then the pattern with re.match, compiled once.
+
+    Args:
+        length (Optional[int]): Exact length, instead of min_length and max_length.
+        min_length (Optional[int]): Minimum length.
+        max_length (Optional[int]): Maximum length.
+        length_error (str): Message of a value with a wrong length.
+        pattern (Optional[str]): Regular expression the value must match.
+        pattern_error (Optional[str]): Message of a value that does not match the pattern.
+
+    Returns:
+        Type[str]: The field type.
+    """
+    if length is not None:
+        min_length = max_length = length
+    lowest = min_length or 0
+    highest = max_length if max_length is not None else sys.maxsize
+
+    if pattern is None:
+        def check(value: Any) -> str:
+            if value.__class__ is not str:
+                value = str_validator(value)
+            if not lowest <= len(value) <= highest:
+                raise ValueError(length_error)
+            return value
+    else:
+        match = re.compile(pattern).match
+
+        def check(value: Any) -> str:
+            if value.__class__ is not str:
+                value = str_validator(value)
+            if not lowest <= len(value) <= highest:
+                raise ValueError(length_error)
+            if match(value) is None:
+                raise ValueError(pattern_error)
+            return value
+
+    return _constrained_text_type(check, min_length, max_length, pattern)
+
+
+def date_text(
+    date_format: str = "%d%m%Y",
+    *,
+    format_error: str,
+    length: Optional[int] = None,
+    length_error: Optional[str] = None
+) -> Type[str]:
+    """ A str holding a date in a fixed format, rejected with the messages of the field.
+
+    The date is parsed with parse_date, which caches the dates already seen.
+
+    Args:
+        date_format (str): strptime format of the date.
+        format_error (str): Message of a value that is not a date in the format.
+        length (Optional[int]): Exact length, checked before the format.
+        length_error (Optional[str]): Message of a value with a wrong length.
+
+    Returns:
+        Type[str]: The field type.
+    """
+    def check(value: Any) -> str:
+        if value.__class__ is not str:
+            value = str_validator(value)
+        if length is not None and len(value) != length:
+            raise ValueError(length_error)
+        try:
+            parse_date(value, date_format)
+        except ValueError as exc:
+            raise ValueError(format_error) from exc
+        return value
+
+    return _constrained_text_type(check, length, length, None)
@@ -1,3 +1,5 @@
 from app.schemas.request.debt_post_request import *
 from app.schemas.request.payment_post_request import *
 from app.schemas.request.revert_post_request import *
+from app.schemas.request.debt_bulk_request import *
+from app.schemas.request.revert_job_request import *
@@ -0,0 +1,50 @@
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, condecimal
+
+from app.schemas.constraints import date_text, text
+
+_NAME = text(max_length=255, length_error="Must not exceed 255 characters")
+_DATE = date_text("%d%m%Y", format_error="Must be in the format DDMMYYYY")
+_TWO_CHARACTERS = text(2, length_error="Must have length 2")
+
+
+class DebtBulkRow(BaseModel):
+    idCliente: text(
+        min_length=1,
+        max_length=14,
+        length_error="Must have between 1 and 14 characters",
+        pattern=r'^[A-Za-z0-9]*$',
+        pattern_error="Must be alphanumeric"
+    ) = Field(..., description="Client document identifier")
+    nombreCliente: Optional[_NAME] = Field(None, description="Client name, to create a missing client")
+    empresa: Optional[_NAME] = Field(None, description="Company of a missing client")
+    tipoProducto: Optional[_NAME] = Field(None, description="Product type of a missing client")
+    numDocumento: Optional[text(
+        min_length=1,
+        max_length=16,
+        length_error="Must have between 1 and 16 characters",
+        pattern=r'^[A-Za-z0-9-]*$',
+        pattern_error="Must be alphanumeric or contain hyphens"
+    )] = Field(None, description="Operation identifier, generated if missing")
+    codigoProducto: text(3, length_error="Must have length 3") = Field(..., description="Product code")
+    descDocumento: _NAME = Field(..., description="Debt description")
+    fechaEmision: _DATE = Field(..., description="Emission date in DDMMYYYY format")
+    fechaVencimiento: _DATE = Field(..., description="Expiration date in DDMMYYYY format")
+    deuda: condecimal(max_digits=12, decimal_places=2, ge=0) = Field(..., description="Total debt")
+    mora: condecimal(max_digits=12, decimal_places=2, ge=0) = Field(Decimal("0.00"), description="Default debt")
+    gastosAdm: condecimal(max_digits=10, decimal_places=2, ge=0) = Field(
+        Decimal("0.00"), description="Administration expenses"
+    )
+    pagoMinimo: condecimal(max_digits=10, decimal_places=2, ge=0) = Field(..., description="Minimum payment")
+    periodo: _TWO_CHARACTERS = Field(..., description="Payment period")
+    cuota: _TWO_CHARACTERS = Field(..., description="Payment fee")
+    monedaDoc: text(
+        min_length=1, max_length=10, length_error="Must have between 1 and 10 characters"
+    ) = Field(..., description="Document currency")
+
+
+class DebtBulkPOSTRequest(BaseModel):
+    deudas: List[dict] = Field(..., description="Debts to create, validated one by one")
+    crearClientes: bool = Field(False, description="Create the clients that do not exist")
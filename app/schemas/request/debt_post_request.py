@@ -1,134 +1,39 @@
-from pydantic import BaseModel, validator
+from typing import List
 
+from pydantic import BaseModel, Field
 
-class DebtStatusPOSTRequest(BaseModel):
-    tipoConsulta: str
-    idConsulta: str
-    codigoBanco: str
-    codigoProducto: str
-    canalPago: str
-    codigoEmpresa: str
+from app.schemas.constraints import text
 
-    @validator("tipoConsulta")
-    def validate_tipo_consulta(cls, value):
-        if len(value) != 1:
-            raise ValueError("tipoConsulta must be 1 character long")
-        return value
 
-    @validator("idConsulta")
-    def validate_id_consulta(cls, value):
-        if len(value) > 14:
-            raise ValueError("idConsulta must be less than 14 characters")
-        return value
+class DebtStatusPOSTRequest(BaseModel):
+    tipoConsulta: text(1, length_error="tipoConsulta must be 1 character long")
+    idConsulta: text(max_length=14, length_error="idConsulta must be less than 14 characters")
+    codigoBanco: text(4, length_error="codigoBanco must be 4 characters long")
+    codigoProducto: text(3, length_error="codigoProducto must be 3 characters long")
+    canalPago: text(2, length_error="canalPago must be 2 characters long")
+    codigoEmpresa: text(3, length_error="codigoEmpresa must be 3 characters long")
 
-    @validator("codigoBanco")
-    def validate_codigo_banco(cls, value):
-        if len(value) != 4:
-            raise ValueError("codigoBanco must be 4 characters long")
-        return value
 
-    @validator("codigoProducto")
-    def validate_codigo_producto(cls, value):
-        if len(value) != 3:
-            raise ValueError("codigoProducto must be 3 characters long")
-        return value
+class DebtStatusBatchItem(BaseModel):
+    idConsulta: text(max_length=14, length_error="idConsulta must be less than 14 characters")
+    codigoProducto: text(3, length_error="codigoProducto must be 3 characters long")
 
-    @validator("canalPago")
-    def validate_canal_pago(cls, value):
-        if len(value) != 2:
-            raise ValueError("canalPago must be 2 characters long")
-        return value
 
-    @validator("codigoEmpresa")
-    def validate_codigo_empresa(cls, value):
-        if len(value) != 3:
-            raise ValueError("codigoEmpresa must be 3 characters long")
-        return value
+class DebtStatusBatchPOSTRequest(BaseModel):
+    consultas: List[dict] = Field(..., description="idConsulta and codigoProducto of each client, validated one by one")
 
 
 class DebtPOSTRequest(BaseModel):
-    fechaTxn: str
-    horaTxn: str
-    canalPago: str
-    codigoBanco: str
-    numOperacionERP: str
-    formaPago: str
-    tipoConsulta: str
-    idConsulta: str
-    codigoProducto: str
-    numDocumento: str
+    fechaTxn: text(8, length_error="fechaTxn must be 8 characters long")
+    horaTxn: text(6, length_error="horaTxn must be 6 characters long")
+    canalPago: text(2, length_error="canalPago must be 2 characters long")
+    codigoBanco: text(4, length_error="codigoBanco must be 4 characters long")
+    numOperacionERP: text(max_length=15, length_error="numOperacionERP must be less than 15 characters")
+    formaPago: text(2, length_error="formaPago must be 2 characters long")
+    tipoConsulta: text(1, length_error="tipoConsulta must be 1 character long")
+    idConsulta: text(max_length=14, length_error="idConsulta must be less than 14 characters")
+    codigoProducto: text(3, length_error="codigoProducto must be 3 characters long")
+    numDocumento: text(max_length=20, length_error="numDocumento must be less than 20 characters")
     importePagado: float
-    monedaDoc: str
-    codigoEmpresa: str
-
-    @validator("fechaTxn")
-    def validate_fechatxn(cls, value):
-        if len(value) != 8:
-            raise ValueError("fechaTxn must be 8 characters long")
-        return value
-
-    @validator("horaTxn")
-    def validate_horatxn(cls, value):
-        if len(value) != 6:
-            raise ValueError("horaTxn must be 6 characters long")
-        return value
-
-    @validator("canalPago")
-    def validate_canal_pago(cls, value):
-        if len(value) != 2:
-            raise ValueError("canalPago must be 2 characters long")
-        return value
-
-    @validator("codigoBanco")
-    def validate_codigo_banco(cls, value):
-        if len(value) != 4:
-            raise ValueError("codigoBanco must be 4 characters long")
-        return value
-
-    @validator("numOperacionERP")
-    def validate_num_operacion_erp(cls, value):
-        if len(value) > 15:
-            raise ValueError("numOperacionERP must be less than 15 characters")
-        return value
-
-    @validator("formaPago")
-    def validate_forma_pago(cls, value):
-        if len(value) != 2:
-            raise ValueError("formaPago must be 2 characters long")
-        return value
-
-    @validator("tipoConsulta")
-    def validate_tipo_consulta(cls, value):
-        if len(value) != 1:
-            raise ValueError("tipoConsulta must be 1 character long")
-        return value
-
-    @validator("idConsulta")
-    def validate_id_consulta(cls, value):
-        if len(value) > 14:
-            raise ValueError("idConsulta must be less than 14 characters")
-        return value
-
-    @validator("codigoProducto")
-    def validate_codigo_producto(cls, value):
-        if len(value) != 3:
-            raise ValueError("codigoProducto must be 3 characters long")
-        return value
-
-    @validator("numDocumento")
-    def validate_num_documento(cls, value):
-        if len(value) > 20:
-            raise ValueError("numDocumento must be less than 20 characters")
-        return value
-
-    @validator("monedaDoc")
-    def validate_moneda_doc(cls, value):
-        if len(value) != 1:
-            raise ValueError("monedaDoc must be 1 character long")
-        return value
-
-    @validator("codigoEmpresa")
-    def validate_codigo_empresa(cls, value):
-        if len(value) != 3:
-            raise ValueError("codigoEmpresa must be 3 characters long")
-        return value
+    monedaDoc: text(1, length_error="monedaDoc must be 1 character long")
+    codigoEmpresa: text(3, length_error="codigoEmpresa must be 3 characters long")
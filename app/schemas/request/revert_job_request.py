@@ -0,0 +1,49 @@
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, root_validator, validator
+
+from app.schemas.constraints import date_text, text
+from app.utils.tools import parse_date
+
+_DATE = date_text("%d%m%Y", format_error='Must be in the format DDMMAAAA.')
+_OPERATION_BANK_NUMBER = re.compile(r'^[A-Za-z0-9]*$')
+
+
+class RevertJobPOSTRequest(BaseModel):
+    codigoBanco: Optional[text(
+        4,
+        length_error='codigoBanco must have 4 characters.',
+        pattern=r'^[A-Za-z0-9]*$',
+        pattern_error='codigoBanco must be alphanumeric.'
+    )] = Field(None, description="Bank code of the payments to revert")
+    fechaDesde: Optional[_DATE] = Field(None, description="First emission date in DDMMYYYY format")
+    fechaHasta: Optional[_DATE] = Field(None, description="Last emission date in DDMMYYYY format, included")
+    numOperacionesBanco: Optional[List[str]] = Field(
+        None, description="Bank operation numbers of the payments to revert, instead of the bank and dates"
+    )
+
+    @validator('numOperacionesBanco')
+    def validate_num_operaciones_banco(cls, value):
+        if value is None:
+            return value
+        if not value:
+            raise ValueError('numOperacionesBanco must not be empty.')
+        for number in value:
+            if len(number) > 12 or not _OPERATION_BANK_NUMBER.match(number):
+                raise ValueError('numOperacionesBanco must have alphanumeric numbers of up to 12 characters.')
+        return value
+
+    @root_validator(skip_on_failure=True)
+    def validate_filter(cls, values):
+        by_filter = any(values.get(field) is not None for field in ('codigoBanco', 'fechaDesde', 'fechaHasta'))
+        if values.get('numOperacionesBanco') is not None:
+            if by_filter:
+                raise ValueError('Give either numOperacionesBanco or codigoBanco, fechaDesde and fechaHasta.')
+            return values
+
+        if any(values.get(field) is None for field in ('codigoBanco', 'fechaDesde', 'fechaHasta')):
+            raise ValueError('Give either numOperacionesBanco or codigoBanco, fechaDesde and fechaHasta.')
+        if parse_date(values['fechaDesde']) > parse_date(values['fechaHasta']):
+            raise ValueError('fechaDesde must not be after fechaHasta.')
+        return values
@@ -1,2 +1,5 @@
 from app.schemas.response.debt_response import *
 from app.schemas.response.revert_response import *
+from app.schemas.response.debt_bulk_response import *
+from app.schemas.response.revert_job_response import *
+from app.schemas.response.outbox_response import *
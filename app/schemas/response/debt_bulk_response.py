@@ -0,0 +1,24 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class DebtBulkRowError(BaseModel):
+    fila: int
+    numDocumento: Optional[str]
+    errores: List[str]
+
+
+class DebtBulkCreatedDebt(BaseModel):
+    fila: int
+    numDocumento: str
+
+
+class DebtBulkPOSTResponse(BaseModel):
+    codigoRespuesta: str
+    descripcionResp: str
+    recibidas: int
+    creadas: int
+    clientesCreados: int
+    deudas: List[DebtBulkCreatedDebt]
+    errores: List[DebtBulkRowError]
@@ -0,0 +1,12 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class OutboxMetricsResponse(BaseModel):
+    pendientes: int
+    retrasoSegundos: float
+    entregados: int
+    entregasFallidas: int
+    ultimoRetrasoEntregaSegundos: Optional[float]
+    ultimoError: Optional[str]
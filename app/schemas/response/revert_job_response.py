@@ -0,0 +1,12 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class RevertJobResponse(BaseModel):
+    codigoRespuesta: str
+    descripcionResp: str
+    idReversion: Optional[int]
+    estado: Optional[str]
+    revertidos: int = 0
+    error: Optional[str]
@@ -1,3 +1,5 @@
 # Connect the domain with particular uses cases for the app.
 from app.service.payment_service import *
 from app.service.debt_service import *
+from app.service.debt_import_service import *
+from app.service.revert_job_service import *
@@ -0,0 +1,177 @@
+import csv
+import json
+import time
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from app.adapter import DebtAdapter
+from app.database.config import database
+from app.infrastructure import DebtRepository, ImportCheckpointRepository
+from app.service.debt_service import DebtService
+from app.utils.tools import chunked
+
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+class DebtImportService:
+    @staticmethod
+    def read_records(path: str, file_format: str, offset: int = 0) -> Iterator[Tuple[int, Any]]:
+        """ Stream the records of a billing file
+
+        CSV files have a header with the DebtBulkRow field names, and empty
+        values are read as missing. JSONL files have an object per line, a line
+        that is not JSON is read as None.
+
+        Args:
+            path (str): Path of the file
+            file_format (str): "csv" or "jsonl"
+            offset (int): Byte offset to start reading from, 0 for the start
+
+        Returns:
+            Iterator[Tuple[int, Any]]: Byte offset after each record, and the record
+        """
+        with open(path, "rb") as file:
+            if file_format == "csv":
+                header = next(csv.reader([file.readline().decode("utf-8-sig")]), [])
+                offset = max(offset, file.tell())
+            file.seek(offset)
+            position = offset
+
+            def lines() -> Iterator[str]:
+                nonlocal position
+                for line in file:
+                    position += len(line)
+                    yield line.decode("utf-8")
+
+            if file_format == "csv":
+                # The reader only consumes the lines of the record it returns.
+                for values in csv.reader(lines()):
+                    if values:
+                        yield position, {
+                            field: value or None for field, value in zip(header, values)
+                        }
+                return
+
+            for line in lines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield position, record
+
+    @staticmethod
+    def validate_records(
+        records: Iterator[Tuple[int, Any]],
+        first_row: int
+    ) -> Iterator[Tuple[int, int, Any, Optional[dict], List[str]]]:
+        """ Validate records as they are read
+
+        Args:
+            records (Iterator[Tuple[int, Any]]): Byte offset after each record, and the record
+            first_row (int): Row number of the first record
+
+        Returns:
+            Iterator[Tuple[int, int, Any, Optional[dict], List[str]]]: Row number,
+            byte offset, record, and the DebtBulkRow data or the errors of each record
+        """
+        for row_number, (offset, record) in enumerate(records, start=first_row):
+            validated_row, errors = DebtService.validate_bulk_row(record)
+            yield row_number, offset, record, validated_row, errors
+
+    @staticmethod
+    async def load_checkpoint(name: str) -> dict:
+        """
+        Args:
+            name (str): Name of the import
+
+        Returns:
+            dict: The progress committed with the last chunk, or the start of the file if there is none
+        """
+        checkpoint = await ImportCheckpointRepository.get_checkpoint(name)
+        if checkpoint is None:
+            return {"offset": 0, "rows": 0, "created": 0, "rejected": 0}
+        return dict(checkpoint)
+
+    @staticmethod
+    async def import_file(
+        path: str,
+        file_format: str,
+        checkpoint_name: str,
+        errors_path: str,
+        chunk_size: int,
+        create_clients: bool,
+        on_progress: Optional[Callable[[dict, float], None]] = None
+    ) -> dict:
+        """ Import the debts of a billing file in constant memory
+
+        The file is read, validated and written one chunk at a time, each chunk
+        in a transaction that also saves the checkpoint of the import, so a
+        committed chunk always has its checkpoint. An import that stops resumes
+        from the last committed chunk without writing any of its rows again.
+        The rejected rows of a chunk are appended before its commit, so a stop
+        right before it can report them twice.
+
+        Args:
+            path (str): Path of the billing file
+            file_format (str): "csv" or "jsonl"
+            checkpoint_name (str): Name of the import checkpoint
+            errors_path (str): Path of the JSONL file the rejected rows are appended to
+            chunk_size (int): Rows of each transaction
+            create_clients (bool): Create the clients that do not exist
+            on_progress (Optional[Callable[[dict, float], None]]): Called after each
+                chunk with the checkpoint and the rows per second of this run
+
+        Returns:
+            dict: The final checkpoint
+        """
+        if file_format not in IMPORT_FORMATS:
+            raise ValueError(f"Unknown format {file_format}, expected one of {IMPORT_FORMATS}")
+
+        checkpoint = await DebtImportService.load_checkpoint(checkpoint_name)
+        rows = DebtImportService.validate_records(
+            DebtImportService.read_records(path, file_format, checkpoint["offset"]),
+            checkpoint["rows"] + 1
+        )
+        # Claimed before the transactions, a node rolled back with a chunk could be claimed again.
+        await DebtRepository.claim_operation_identifier_node()
+        start = time.perf_counter()
+        imported_rows = 0
+
+        with open(errors_path, "a") as errors_file:
+            for chunk in chunked(rows, chunk_size):
+                valid_rows = [
+                    (row_number, validated_row)
+                    for row_number, _, _, validated_row, errors in chunk
+                    if not errors
+                ]
+                async with database.transaction():
+                    result = await DebtAdapter.bulk_create_debts(valid_rows, create_clients)
+
+                    rejected = 0
+                    for row_number, _, record, _, errors in chunk:
+                        if row_number in result["errors"]:
+                            errors = [result["errors"][row_number]]
+                        if errors:
+                            rejected += 1
+                            errors_file.write(json.dumps({
+                                "fila": row_number,
+                                "numDocumento": record.get("numDocumento") if isinstance(record, dict) else None,
+                                "errores": errors
+                            }) + "\n")
+                    errors_file.flush()
+
+                    checkpoint = {
+                        "offset": chunk[-1][1],
+                        "rows": chunk[-1][0],
+                        "created": checkpoint["created"] + len(result["created"]),
+                        "rejected": checkpoint["rejected"] + rejected,
+                    }
+                    await ImportCheckpointRepository.save_checkpoint(checkpoint_name, checkpoint)
+
+                imported_rows += len(chunk)
+                if on_progress is not None:
+                    on_progress(checkpoint, imported_rows / (time.perf_counter() - start))
+
+        return checkpoint
@@ -1,22 +1,30 @@
 import logging
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
 
 from app.adapter import DebtAdapter
-from app.schemas.request import DebtStatusPOSTRequest
+from app.schemas.request import (
+    DebtBulkPOSTRequest, DebtBulkRow, DebtStatusBatchItem, DebtStatusBatchPOSTRequest, DebtStatusPOSTRequest
+)
+from app.settings import settings
+from app.utils.responses import render_json
+from app.utils.tools import chunked, validated
 
 
 class DebtService:
     @staticmethod
-    async def debt_status(debt: dict) -> dict:
+    async def debt_status(debt: Union[DebtStatusPOSTRequest, dict]) -> dict:
         """ Check debts of a client
 
         Args:
-            debt (dict): Debt data
+            debt (Union[DebtStatusPOSTRequest, dict]): Debt data, a validated request is not validated again
 
         Returns:
             dict: Updated Debt data
         """
         try:
-            validated_debt_request = DebtStatusPOSTRequest(**debt).dict()
+            validated_debt_request = dict(validated(DebtStatusPOSTRequest, debt))
             
             return await DebtAdapter.checking_debt_status(validated_debt_request)
         
@@ -27,4 +35,251 @@ class DebtService:
                 "codigoRespuesta": "99",
                 "descripcionResp": "ERROR DESCONOCIDO",
                 "deudasPendientes": []
-            }
\ No newline at end of file
+            }
+
+    @staticmethod
+    async def debt_status_if_modified(
+        debt: Union[DebtStatusPOSTRequest, dict],
+        if_none_match: Optional[str] = None
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        """ Check debts of a client unless the caller already has their current version
+
+        Args:
+            debt (Union[DebtStatusPOSTRequest, dict]): Debt data, a validated request is not validated again
+            if_none_match (Optional[str]): If-None-Match header of the request
+
+        Returns:
+            Tuple[Optional[str], Optional[dict]]: ETag of the debts, None on errors, and
+            the debt-status response, None when if_none_match matches the ETag
+        """
+        try:
+            validated_debt_request = dict(validated(DebtStatusPOSTRequest, debt))
+
+            return await DebtAdapter.checking_debt_status_if_modified(validated_debt_request, if_none_match)
+
+        except Exception as e:
+            logging.error(e)
+            return None, {
+                "Cliente": "",
+                "codigoRespuesta": "99",
+                "descripcionResp": "ERROR DESCONOCIDO",
+                "deudasPendientes": []
+            }
+
+    @staticmethod
+    async def debts_status(batch: Union[DebtStatusBatchPOSTRequest, dict]) -> dict:
+        """ Check debts of many clients at once
+
+        Every item is validated on its own, an invalid item gets a 99 response and
+        does not stop the others. The valid items are checked in chunks of
+        DEBT_STATUS_BATCH_CHUNK_SIZE, each with one query for all its clients.
+
+        Args:
+            batch (Union[DebtStatusBatchPOSTRequest, dict]): idConsulta and codigoProducto of each client
+
+        Returns:
+            dict: Debt status response of each client, with its row number
+
+        Examples:
+            {
+                "codigoRespuesta": "00",
+                "descripcionResp": "OK",
+                "resultados": [
+                    {
+                        "fila": 1,
+                        "idConsulta": "10000002",
+                        "codigoProducto": "001",
+                        "Cliente": "",
+                        "CodigoRespuesta": "22",
+                        "DescRespuesta": "CLIENTE SIN DEUDAS PENDIENTES",
+                        "deudasPendientes": []
+                    }
+                ]
+            }
+        """
+        unknown_error = {
+            "Cliente": "",
+            "CodigoRespuesta": "99",
+            "DescRespuesta": "ERROR DESCONOCIDO",
+            "deudasPendientes": []
+        }
+
+        try:
+            queries = validated(DebtStatusBatchPOSTRequest, batch).consultas
+
+            if len(queries) > settings.debt_status_batch_max_items:
+                return {
+                    "codigoRespuesta": "13",
+                    "descripcionResp": f"MAXIMO {settings.debt_status_batch_max_items} CONSULTAS POR SOLICITUD",
+                    "resultados": []
+                }
+
+            responses = [unknown_error] * len(queries)
+            validated_queries = []
+            for index, query in enumerate(queries):
+                try:
+                    validated_queries.append((index, DebtStatusBatchItem(**query).dict()))
+                except (ValidationError, TypeError) as e:
+                    logging.error(e)
+
+            for chunk in chunked(validated_queries, settings.debt_status_batch_chunk_size):
+                try:
+                    chunk_responses = await DebtAdapter.checking_debts_status([query for _, query in chunk])
+                except Exception as e:
+                    logging.error(e)
+                    continue
+
+                for (index, _), response in zip(chunk, chunk_responses):
+                    responses[index] = response
+
+            return {
+                "codigoRespuesta": "00",
+                "descripcionResp": "OK",
+                "resultados": [
+                    {
+                        "fila": index,
+                        "idConsulta": query.get("idConsulta") if isinstance(query, dict) else None,
+                        "codigoProducto": query.get("codigoProducto") if isinstance(query, dict) else None,
+                        **response
+                    }
+                    for index, (query, response) in enumerate(zip(queries, responses), start=1)
+                ]
+            }
+
+        except Exception as e:
+            logging.error(e)
+            return {
+                "codigoRespuesta": "99",
+                "descripcionResp": "ERROR DESCONOCIDO",
+                "resultados": []
+            }
+
+    @staticmethod
+    async def export_debts(
+        product_code: Optional[str] = None,
+        currency: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> AsyncIterator[bytes]:
+        """ Export the debts matching the filters as NDJSON, one JSON object per line
+
+        The lines of each page of DEBT_EXPORT_PAGE_SIZE debts are yielded together,
+        so memory does not grow with the number of debts. A failure after the first
+        line cannot change the response any more: it is logged and raised, which
+        aborts the response.
+
+        Args:
+            product_code (Optional[str]): Only the debts of this product
+            currency (Optional[str]): Only the debts in this currency
+            status (Optional[str]): Only the "pending" or the "paid" debts
+
+        Yields:
+            bytes: NDJSON lines of the debts
+
+        Examples:
+            {"numDocumento": "B01-0000000001", "idCliente": "10000002", "nombreCliente": "Juan Perez", ...}
+        """
+        lines = []
+        try:
+            async for debt in DebtAdapter.export_debts(product_code, currency, status):
+                lines.append(render_json(debt) + b"\n")
+                if len(lines) >= settings.debt_export_page_size:
+                    yield b"".join(lines)
+                    lines = []
+        except Exception as e:
+            logging.error(e)
+            raise
+
+        if lines:
+            yield b"".join(lines)
+
+    @staticmethod
+    def validate_bulk_row(row: Any) -> Tuple[Optional[dict], List[str]]:
+        """ Validate a row of a bulk of debts
+
+        Args:
+            row (Any): Row as received
+
+        Returns:
+            Tuple[Optional[dict], List[str]]: The DebtBulkRow data and no errors,
+            or None and the errors of each invalid field as "field: message"
+        """
+        if not isinstance(row, dict):
+            return None, ["Must be an object"]
+
+        try:
+            return DebtBulkRow(**row).dict(), []
+        except ValidationError as e:
+            return None, [
+                f"{'.'.join(str(location) for location in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ]
+
+    @staticmethod
+    async def bulk_create_debts(bulk: Union[DebtBulkPOSTRequest, dict]) -> dict:
+        """ Create many debts, reporting the rows that cannot be created
+
+        Every row is validated before the first insert; invalid rows are reported
+        with their field errors and do not stop the valid ones.
+
+        Args:
+            bulk (Union[DebtBulkPOSTRequest, dict]): Debts to create and whether to create missing clients
+
+        Returns:
+            dict: Created debts and errors of each rejected row
+        """
+        try:
+            validated_bulk_request = validated(DebtBulkPOSTRequest, bulk)
+            received = len(validated_bulk_request.deudas)
+
+            if received > settings.debt_bulk_max_rows:
+                return {
+                    "codigoRespuesta": "13",
+                    "descripcionResp": f"MAXIMO {settings.debt_bulk_max_rows} DEUDAS POR SOLICITUD",
+                    "recibidas": received,
+                    "creadas": 0,
+                    "clientesCreados": 0,
+                    "deudas": [],
+                    "errores": []
+                }
+
+            rows = []
+            errors = {}
+            for row_number, row in enumerate(validated_bulk_request.deudas, start=1):
+                validated_row, row_errors = DebtService.validate_bulk_row(row)
+                if row_errors:
+                    errors[row_number] = row_errors
+                else:
+                    rows.append((row_number, validated_row))
+
+            result = await DebtAdapter.bulk_create_debts(rows, validated_bulk_request.crearClientes)
+            for row_number, error in result["errors"].items():
+                errors[row_number] = [error]
+
+            return {
+                "codigoRespuesta": "00" if not errors else "01",
+                "descripcionResp": "OK" if not errors else "PROCESADO CON ERRORES",
+                "recibidas": received,
+                "creadas": len(result["created"]),
+                "clientesCreados": result["created_clients"],
+                "deudas": result["created"],
+                "errores": [
+                    {
+                        "fila": row_number,
+                        "numDocumento": validated_bulk_request.deudas[row_number - 1].get("numDocumento"),
+                        "errores": row_errors
+                    }
+                    for row_number, row_errors in sorted(errors.items())
+                ]
+            }
+
+        except Exception as e:
+            logging.error(e)
+            return {
+                "codigoRespuesta": "99",
+                "descripcionResp": "ERROR DESCONOCIDO",
+                "recibidas": 0,
+                "creadas": 0,
+                "clientesCreados": 0,
+                "deudas": [],
+                "errores": []
+            }
@@ -1,18 +1,26 @@
 import logging
+from typing import Union
 
+from pydantic import ValidationError
+
+from app.adapter.idempotency_adapter import IdempotencyAdapter
 from app.adapter.payment_adapter import PaymentAdapter
-from app.schemas.request import PaymentUpdatePOSTRequest
+from app.schemas.request import PaymentBatchPOSTRequest, PaymentUpdatePOSTRequest
 from app.schemas.request.revert_post_request import RevertDebtPaymentPOSTRequest
+from app.settings import settings
+from app.utils.tools import chunked, validated
 
 
 class PaymentService:
 
     @staticmethod
-    async def update_debt_payment(payment: dict) -> dict:
+    async def update_debt_payment(payment: Union[PaymentUpdatePOSTRequest, dict]) -> dict:
         """ Update payment data
 
+        Retries of the same bank operation get the response of the first call back.
+
         Args:
-            payment (dict): Payment data
+            payment (Union[PaymentUpdatePOSTRequest, dict]): Payment data, a validated request is not validated again
 
         Returns:
             dict: Updated payment data
@@ -28,11 +36,16 @@ class PaymentService:
 
         try:
 
-            validated_payment = PaymentUpdatePOSTRequest(**payment).dict()
+            validated_payment = dict(validated(PaymentUpdatePOSTRequest, payment))
 
-            return await PaymentAdapter.update_payments(
-                payment_data=validated_payment,
-                status="paid"
+            return await IdempotencyAdapter.process(
+                operation="payment",
+                bank_code=validated_payment["codigoBanco"],
+                operation_bank_number=validated_payment["numOperacionBanco"],
+                handler=lambda: PaymentAdapter.update_payments(
+                    payment_data=validated_payment,
+                    status="paid"
+                )
             )
         except Exception as e:
             logging.error(e)
@@ -44,11 +57,13 @@ class PaymentService:
             }
 
     @staticmethod
-    async def revert_payment_debt(payment: dict) -> dict:
+    async def revert_payment_debt(payment: Union[RevertDebtPaymentPOSTRequest, dict]) -> dict:
         """ Update payment data
 
+        Retries of the same bank operation get the response of the first call back.
+
         Args:
-            payment (dict): Payment data
+            payment (Union[RevertDebtPaymentPOSTRequest, dict]): Payment data, a validated request is not validated again
 
         Returns:
             dict: Updated payment data
@@ -65,11 +80,16 @@ class PaymentService:
 
         try:
 
-            validated_payment = RevertDebtPaymentPOSTRequest(**payment).dict()
+            validated_payment = dict(validated(RevertDebtPaymentPOSTRequest, payment))
 
-            return await PaymentAdapter.update_payments(
-                payment_data=validated_payment,
-                status="pending"
+            return await IdempotencyAdapter.process(
+                operation="revert",
+                bank_code=validated_payment["codigoBanco"],
+                operation_bank_number=validated_payment["numOperacionBanco"],
+                handler=lambda: PaymentAdapter.update_payments(
+                    payment_data=validated_payment,
+                    status="pending"
+                )
             )
         except Exception as e:
             logging.error(e)
@@ -79,3 +99,93 @@ class PaymentService:
                 "numOperacionERP": "",
                 "descripcionResp": "ERROR DESCONOCIDO",
             }
+
+    @staticmethod
+    async def update_debt_payments(batch: Union[PaymentBatchPOSTRequest, dict]) -> dict:
+        """ Update the payment data of many notifications
+
+        Each chunk of PAYMENT_BATCH_CHUNK_SIZE notifications is applied in one
+        transaction. Every notification gets the response update_debt_payment
+        would give it, and a failed chunk does not undo the previous ones.
+
+        Args:
+            batch (Union[PaymentBatchPOSTRequest, dict]): Payment data of each notification
+
+        Returns:
+            dict: Response of each notification, with its row number
+
+        Examples:
+            {
+                "codigoRespuesta": "00",
+                "descripcionResp": "OK",
+                "resultados": [
+                    {
+                        "fila": 1,
+                        "numOperacionBanco": "654321234567",
+                        "codigoRespuesta": "00",
+                        "descripcionResp": "OK",
+                        "nombreCliente": "Juan Perez",
+                        "numOperacionERP": "654321"
+                    }
+                ]
+            }
+        """
+        unknown_error = {
+            "codigoRespuesta": "99",
+            "nombreCliente": "",
+            "numOperacionERP": "",
+            "descripcionResp": "ERROR DESCONOCIDO",
+        }
+
+        try:
+            payments = validated(PaymentBatchPOSTRequest, batch).pagos
+
+            if len(payments) > settings.payment_batch_max_items:
+                return {
+                    "codigoRespuesta": "13",
+                    "descripcionResp": f"MAXIMO {settings.payment_batch_max_items} PAGOS POR SOLICITUD",
+                    "resultados": []
+                }
+
+            responses = [unknown_error] * len(payments)
+            validated_payments = []
+            for index, payment in enumerate(payments):
+                try:
+                    validated_payments.append((index, PaymentUpdatePOSTRequest(**payment).dict()))
+                except (ValidationError, TypeError) as e:
+                    logging.error(e)
+
+            for chunk in chunked(validated_payments, settings.payment_batch_chunk_size):
+                try:
+                    chunk_responses = await PaymentAdapter.update_payments_batch(
+                        [payment for _, payment in chunk],
+                        operation="payment",
+                        status="paid"
+                    )
+                except Exception as e:
+                    logging.error(e)
+                    continue
+
+                for (index, _), response in zip(chunk, chunk_responses):
+                    responses[index] = response
+
+            return {
+                "codigoRespuesta": "00",
+                "descripcionResp": "OK",
+                "resultados": [
+                    {
+                        "fila": index,
+                        "numOperacionBanco": payment.get("numOperacionBanco") if isinstance(payment, dict) else None,
+                        **response
+                    }
+                    for index, (payment, response) in enumerate(zip(payments, responses), start=1)
+                ]
+            }
+
+        except Exception as e:
+            logging.error(e)
+            return {
+                "codigoRespuesta": "99",
+                "descripcionResp": "ERROR DESCONOCIDO",
+                "resultados": []
+            }
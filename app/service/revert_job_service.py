@@ -0,0 +1,125 @@
+import logging
+from typing import Union
+
+from app.adapter import RevertJobAdapter
+from app.infrastructure import RevertJobRepository
+from app.schemas.request import RevertJobPOSTRequest
+from app.settings import settings
+from app.utils.tools import parse_date, validated
+
+
+class RevertJobService:
+    @staticmethod
+    async def create_revert_job(request: Union[RevertJobPOSTRequest, dict]) -> dict:
+        """ Start reverting the payments of a bank incident in the background
+
+        The payments are given either by bank and emition date range or by
+        operation bank number. The job reverts them in chunks after the response,
+        its progress is read with get_revert_job.
+
+        Args:
+            request (Union[RevertJobPOSTRequest, dict]): Bank and dates, or operation bank numbers
+
+        Returns:
+            dict: The created job
+
+        Examples:
+            {
+                "codigoRespuesta": "00",
+                "descripcionResp": "OK",
+                "idReversion": 1,
+                "estado": "pending",
+                "revertidos": 0,
+                "error": None
+            }
+        """
+        try:
+            validated_request = validated(RevertJobPOSTRequest, request)
+            operation_bank_numbers = validated_request.numOperacionesBanco
+
+            if operation_bank_numbers is not None and (
+                len(operation_bank_numbers) > settings.revert_job_max_operation_numbers
+            ):
+                return {
+                    "codigoRespuesta": "13",
+                    "descripcionResp": (
+                        f"MAXIMO {settings.revert_job_max_operation_numbers} OPERACIONES POR SOLICITUD"
+                    ),
+                    "idReversion": None,
+                    "estado": None,
+                    "revertidos": 0,
+                    "error": None
+                }
+
+            if operation_bank_numbers is not None:
+                job = await RevertJobRepository.create_job(
+                    operation_bank_numbers=list(dict.fromkeys(operation_bank_numbers))
+                )
+            else:
+                job = await RevertJobRepository.create_job(
+                    bank_code=validated_request.codigoBanco,
+                    date_from=parse_date(validated_request.fechaDesde),
+                    date_to=parse_date(validated_request.fechaHasta)
+                )
+
+            RevertJobAdapter.start(job.id)
+
+            return RevertJobService._job_response(job)
+
+        except Exception as e:
+            logging.error(e)
+            return {
+                "codigoRespuesta": "99",
+                "descripcionResp": "ERROR DESCONOCIDO",
+                "idReversion": None,
+                "estado": None,
+                "revertidos": 0,
+                "error": None
+            }
+
+    @staticmethod
+    async def get_revert_job(job_id: int) -> dict:
+        """ Progress of a revert job
+
+        Args:
+            job_id (int): The id of the job
+
+        Returns:
+            dict: The status of the job and the payments reverted so far
+        """
+        try:
+            job = await RevertJobRepository.get_job(job_id)
+
+            if job is None:
+                return {
+                    "codigoRespuesta": "99",
+                    "descripcionResp": "REVERSION NO ENCONTRADA",
+                    "idReversion": job_id,
+                    "estado": None,
+                    "revertidos": 0,
+                    "error": None
+                }
+
+            return RevertJobService._job_response(job)
+
+        except Exception as e:
+            logging.error(e)
+            return {
+                "codigoRespuesta": "99",
+                "descripcionResp": "ERROR DESCONOCIDO",
+                "idReversion": job_id,
+                "estado": None,
+                "revertidos": 0,
+                "error": None
+            }
+
+    @staticmethod
+    def _job_response(job) -> dict:
+        return {
+            "codigoRespuesta": "00",
+            "descripcionResp": "OK",
+            "idReversion": job.id,
+            "estado": job.status,
+            "revertidos": job.reverted,
+            "error": job.error
+        }
@@ -1,8 +1,99 @@
+import os
+import tempfile
+from typing import Optional
+
 from pydantic import BaseSettings, Field
 
 
 class Settings(BaseSettings):
     db_url: str = Field("sqlite:///test.db", env='DATABASE_URL')
+    # Optional read replica for the read-only queries, the primary serves them without it.
+    db_replica_url: Optional[str] = Field(None, env='DATABASE_REPLICA_URL')
+
+    # Connection pool of the asyncpg backend, ignored by the other backends.
+    db_pool_min_size: int = Field(10, env='DATABASE_POOL_MIN_SIZE')
+    db_pool_max_size: int = Field(10, env='DATABASE_POOL_MAX_SIZE')
+    db_pool_max_queries: int = Field(50000, env='DATABASE_POOL_MAX_QUERIES')
+    db_pool_max_inactive_connection_lifetime: float = Field(
+        300.0,
+        env='DATABASE_POOL_MAX_INACTIVE_CONNECTION_LIFETIME'
+    )
+    db_statement_cache_size: int = Field(100, env='DATABASE_STATEMENT_CACHE_SIZE')
+    # Seconds a transaction waits for a lock, such as the debt lock of a payment.
+    db_lock_timeout: float = Field(30.0, env='DATABASE_LOCK_TIMEOUT')
+
+    # Create the missing tables when a worker starts, for local databases without migrations.
+    db_create_schema_on_startup: bool = Field(False, env='DATABASE_CREATE_SCHEMA_ON_STARTUP')
+
+    # Responses of the payment and revert requests, replayed to the bank retries.
+    idempotency_retention: float = Field(24 * 60 * 60, env='IDEMPOTENCY_RETENTION')
+    # Seconds a request stays in flight before a duplicate takes it over.
+    idempotency_in_flight_ttl: float = Field(60.0, env='IDEMPOTENCY_IN_FLIGHT_TTL')
+    # Seconds a duplicate waits for the request in flight, and how often it checks.
+    idempotency_wait_timeout: float = Field(30.0, env='IDEMPOTENCY_WAIT_TIMEOUT')
+    idempotency_poll_interval: float = Field(0.05, env='IDEMPOTENCY_POLL_INTERVAL')
+    # Seconds between the deletions of the expired responses by each worker.
+    idempotency_purge_interval: float = Field(60 * 60, env='IDEMPOTENCY_PURGE_INTERVAL')
+
+    # Validate again the request models the services receive and the responses of the adapters, for debugging.
+    strict_validation: bool = Field(False, env='STRICT_VALIDATION')
+
+    # Rows of the bulk debt endpoint: per request, and per executemany INSERT.
+    debt_bulk_max_rows: int = Field(100000, env='DEBT_BULK_MAX_ROWS')
+    debt_bulk_chunk_size: int = Field(1000, env='DEBT_BULK_CHUNK_SIZE')
+
+    # Notifications of the batch payment endpoint: per request, and per transaction.
+    payment_batch_max_items: int = Field(10000, env='PAYMENT_BATCH_MAX_ITEMS')
+    payment_batch_chunk_size: int = Field(500, env='PAYMENT_BATCH_CHUNK_SIZE')
+
+    # Clients of the batch debt-status endpoint: per request, and per query.
+    debt_status_batch_max_items: int = Field(1000, env='DEBT_STATUS_BATCH_MAX_ITEMS')
+    debt_status_batch_chunk_size: int = Field(500, env='DEBT_STATUS_BATCH_CHUNK_SIZE')
+
+    # Debts read per query by the debt export.
+    debt_export_page_size: int = Field(1000, env='DEBT_EXPORT_PAGE_SIZE')
+
+    # Payments reverted per transaction by a mass revert job, and seconds between two transactions.
+    revert_job_chunk_size: int = Field(500, env='REVERT_JOB_CHUNK_SIZE')
+    revert_job_chunk_pause: float = Field(0.01, env='REVERT_JOB_CHUNK_PAUSE')
+    # Seconds without heartbeat after which another worker resumes a running job.
+    revert_job_heartbeat_ttl: float = Field(60.0, env='REVERT_JOB_HEARTBEAT_TTL')
+    # Seconds between the looks of each worker for unfinished jobs to resume.
+    revert_job_resume_interval: float = Field(30.0, env='REVERT_JOB_RESUME_INTERVAL')
+    # Operation bank numbers of a revert job given as a list.
+    revert_job_max_operation_numbers: int = Field(100000, env='REVERT_JOB_MAX_OPERATION_NUMBERS')
+
+    # Destination of the payment events: "file" appends them to OUTBOX_FILE_PATH, "http" POSTs them.
+    outbox_sink: str = Field("file", env='OUTBOX_SINK')
+    outbox_file_path: str = Field(
+        os.path.join(tempfile.gettempdir(), "payment-service-events.jsonl"),
+        env='OUTBOX_FILE_PATH'
+    )
+    outbox_http_url: Optional[str] = Field(None, env='OUTBOX_HTTP_URL')
+    outbox_http_timeout: float = Field(5.0, env='OUTBOX_HTTP_TIMEOUT')
+    # Events per delivery, and seconds the dispatcher sleeps when the outbox is drained.
+    outbox_batch_size: int = Field(100, env='OUTBOX_BATCH_SIZE')
+    outbox_poll_interval: float = Field(1.0, env='OUTBOX_POLL_INTERVAL')
+    # Seconds a delivery keeps its events, they are delivered again after it if it stops.
+    outbox_lease: float = Field(30.0, env='OUTBOX_LEASE')
+    # Seconds before the retry of a failed delivery, doubled by each attempt up to the maximum.
+    outbox_retry_base_delay: float = Field(1.0, env='OUTBOX_RETRY_BASE_DELAY')
+    outbox_retry_max_delay: float = Field(300.0, env='OUTBOX_RETRY_MAX_DELAY')
+
+    # "memory" keeps a cache per worker, "sqlite" shares it between the workers of a host.
+    cache_backend: str = Field("memory", env='CACHE_BACKEND')
+    cache_sqlite_path: str = Field(
+        os.path.join(tempfile.gettempdir(), "payment-service-cache.sqlite3"),
+        env='CACHE_SQLITE_PATH'
+    )
+    # Seconds a cache call waits for the lock of the SQLite file, it is skipped after it.
+    cache_sqlite_timeout: float = Field(0.05, env='CACHE_SQLITE_TIMEOUT')
+    # Writes of a worker between two evictions of the entries over the bounds of a cache.
+    cache_sqlite_evict_interval: int = Field(100, env='CACHE_SQLITE_EVICT_INTERVAL')
+
+    debt_status_cache_max_size: int = Field(10000, env='DEBT_STATUS_CACHE_MAX_SIZE')
+    debt_status_cache_max_bytes: int = Field(32 * 1024 * 1024, env='DEBT_STATUS_CACHE_MAX_BYTES')
+    debt_status_cache_ttl: float = Field(30.0, env='DEBT_STATUS_CACHE_TTL')
 
 
 settings = Settings()
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from typing import Callable, Optional
+
+import pytest
+
+
+@pytest.fixture
+def run_script(tmp_path) -> Callable[..., Optional[dict]]:
+    """ Run scripts in a new interpreter on a SQLite file of the test.
+
+    The database URL and the settings are read when the app is imported, so
+    tests on a real database run their script in a new interpreter, with
+    DATABASE_URL on tmp_path / "test.db" and the given environment variables.
+    Scripts set up the file with app.tests.seed and print one JSON object.
+
+    The returned function takes the script, its arguments, the expected exit
+    code (0 by default) and the environment variables, and returns the JSON
+    object printed by the script, None if it printed nothing.
+    """
+    def run(script: str, *args: str, returncode: int = 0, **env: str) -> Optional[dict]:
+        result = subprocess.run(
+            [sys.executable, "-c", textwrap.dedent(script), *args],
+            env={
+                **os.environ,
+                "PYTHONPATH": os.getcwd(),
+                "DATABASE_URL": f"sqlite:///{tmp_path / 'test.db'}",
+                **env,
+            },
+            capture_output=True,
+            text=True
+        )
+
+        assert result.returncode == returncode, result.stderr
+        return json.loads(result.stdout) if result.stdout else None
+
+    return run
@@ -0,0 +1,97 @@
+import os
+from typing import List, Optional
+
+import sqlalchemy
+
+import app.database.models  # noqa: F401 (registers the tables in metadata)
+from app.database.config import metadata
+
+# Columns of the rows inserted by insert, a row only gives the columns it changes.
+DEFAULT_ROWS = {
+    "client": {
+        "document_identifier": "10000003",
+        "name": "Client",
+        "company": "Company",
+        "product_type": "Product",
+        "date_created": "2024-01-01 00:00:00",
+        "date_updated": "2024-01-01 00:00:00",
+    },
+    "debt": {
+        "client": "10000003",
+        "description": "Debt",
+        "emition_date": "2024-01-01 00:00:00",
+        "expiration_date": "2024-02-01 00:00:00",
+        "total_debt": 100,
+        "default_debt": 0,
+        "administration_expenses": 0,
+        "minimum_payment": 10,
+        "period": "01",
+        "fee": "00",
+        "product_code": "001",
+        "currency": "1",
+        "date_created": "2024-01-01 00:00:00",
+        "date_updated": "2024-01-01 00:00:00",
+    },
+    "payment": {
+        "emition_date": "2024-01-01 00:00:00",
+        "bank_code": "1020",
+        "gateway": "01",
+        "payment_type": "1",
+        "payment_amount": 100,
+        "status": "pending",
+        "date_created": "2024-01-01 00:00:00",
+        "date_updated": "2024-01-01 00:00:00",
+    },
+}
+
+
+def create_database(url: Optional[str] = None) -> sqlalchemy.engine.Engine:
+    """ Create the tables in the SQLite file of DATABASE_URL.
+
+    Meant for the scripts run by the run_script fixture, which sets DATABASE_URL.
+
+    Args:
+        url (Optional[str]): Another database to create, such as the replica.
+
+    Returns:
+        sqlalchemy.engine.Engine: A synchronous engine on the file.
+    """
+    engine = sqlalchemy.create_engine(url or os.environ["DATABASE_URL"])
+    metadata.create_all(engine)
+    return engine
+
+
+def insert(engine: sqlalchemy.engine.Engine, table: str, *rows: dict) -> None:
+    """ Insert rows in a table in one transaction, completed with DEFAULT_ROWS.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of create_database.
+        table (str): "client", "debt", "payment", or another table given in full.
+        rows (dict): The columns of each row that differ from DEFAULT_ROWS, the
+            same columns for every row.
+    """
+    rows = [{**DEFAULT_ROWS.get(table, {}), **row} for row in rows]
+    columns = list(rows[0])
+
+    with engine.begin() as connection:
+        connection.execute(
+            sqlalchemy.text(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(f':{column}' for column in columns)})"
+            ),
+            rows
+        )
+
+
+def query(engine: sqlalchemy.engine.Engine, sql: str) -> List[list]:
+    """ Rows of a query as lists, ready to be dumped as JSON.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of create_database.
+        sql (str): The query.
+
+    Returns:
+        List[list]: The values of each row.
+    """
+    with engine.begin() as connection:
+        return [list(row) for row in connection.exec_driver_sql(sql)]
@@ -3,16 +3,27 @@ from unittest.mock import AsyncMock, patch
 import pytest
 
 from app.adapter import DebtAdapter
+from app.adapter.debt_adapter import debt_status_cache, debt_status_etag_cache
+from app.domain.debt_domain import OperationIdentifierGenerator
+from app.infrastructure.debt_repository import PendingDebtRow
+from app.schemas.request import DebtBulkRow
 from app.tests.mock import debt_instance, client_instance
 
 
+@pytest.fixture(autouse=True)
+def clear_debt_status_cache():
+    debt_status_cache.clear()
+    debt_status_etag_cache.clear()
+    yield
+    debt_status_cache.clear()
+    debt_status_etag_cache.clear()
+
+
 @pytest.mark.asyncio
-@patch('app.infrastructure.DebtRepository.get_debts_by_client_identifier', new_callable=AsyncMock)
-@patch('app.infrastructure.ClientRepository.get_client_by_document_identifier', new_callable=AsyncMock)
-async def test_checking_debt_status_success(mock_get_client, mock_get_debts):
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_success(mock_get_client_debts):
 
-    mock_get_client.return_value = client_instance
-    mock_get_debts.return_value = [debt_instance]
+    mock_get_client_debts.return_value = (client_instance.name, [debt_instance])
     
     debt_data = {
         "idConsulta": "123320000013",
@@ -49,10 +60,9 @@ async def test_checking_debt_status_success(mock_get_client, mock_get_debts):
 
 
 @pytest.mark.asyncio
-@patch('app.infrastructure.DebtRepository.get_debts_by_client_identifier', new_callable=AsyncMock)
-@patch('app.infrastructure.ClientRepository.get_client_by_document_identifier', new_callable=AsyncMock)
-async def test_checking_debt_status_failure(mock_get_client, mock_get_debts):
-    mock_get_debts.side_effect = Exception("Error al obtener las deudas")
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_failure(mock_get_client_debts):
+    mock_get_client_debts.side_effect = Exception("Error al obtener las deudas")
 
     debt_data = {"idConsulta": "123456789"}
 
@@ -77,7 +87,7 @@ async def test_formating_debts(mock_get_debts):
     debts = [debt_instance]
     client =  client_instance
 
-    result = DebtAdapter._formating_debts(debts, client)
+    result = DebtAdapter._formating_debts(debts, client.name)
 
     expected_result = {
         "Cliente": "John Doe",
@@ -104,3 +114,210 @@ async def test_formating_debts(mock_get_debts):
 
     assert result["Cliente"] == expected_result["Cliente"]
     assert result["deudasPendientes"][0]["CodigoProducto"] == expected_result["deudasPendientes"][0]["CodigoProducto"]
+
+
+def test_formating_debts_from_rows_matches_models():
+    row = PendingDebtRow(*(getattr(debt_instance, field) for field in PendingDebtRow._fields))
+
+    assert DebtAdapter._formating_debts([row], client_instance.name) == \
+        DebtAdapter._formating_debts([debt_instance], client_instance.name)
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_client_not_found(mock_get_client_debts):
+    mock_get_client_debts.return_value = (None, [])
+
+    debt_data = {"idConsulta": "99999999", "codigoProducto": "001"}
+
+    result = await DebtAdapter.checking_debt_status(debt_data)
+
+    assert result["CodigoRespuesta"] == "16"
+    assert result["deudasPendientes"] == []
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_without_pending_debts(mock_get_client_debts):
+    mock_get_client_debts.return_value = (client_instance.name, [])
+
+    debt_data = {"idConsulta": "10000001", "codigoProducto": "001"}
+
+    result = await DebtAdapter.checking_debt_status(debt_data)
+
+    assert result["CodigoRespuesta"] == "22"
+    assert result["DescRespuesta"] == "CLIENTE SIN DEUDAS PENDIENTES"
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_served_from_cache(mock_get_client_debts):
+    mock_get_client_debts.return_value = (client_instance.name, [debt_instance])
+
+    debt_data = {"idConsulta": "10000001", "codigoProducto": "OJw"}
+
+    first = await DebtAdapter.checking_debt_status(debt_data)
+    second = await DebtAdapter.checking_debt_status(debt_data)
+
+    mock_get_client_debts.assert_awaited_once()
+    assert second == first
+    assert isinstance(debt_status_cache.get("10000001:OJw"), bytes)
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_cache_invalidated(mock_get_client_debts):
+    mock_get_client_debts.return_value = (client_instance.name, [debt_instance])
+
+    debt_data = {"idConsulta": "10000001", "codigoProducto": "OJw"}
+
+    await DebtAdapter.checking_debt_status(debt_data)
+    DebtAdapter.invalidate_debt_status("10000001", "OJw")
+    await DebtAdapter.checking_debt_status(debt_data)
+
+    assert mock_get_client_debts.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+@patch('app.infrastructure.DebtRepository.get_client_debts_version', new_callable=AsyncMock)
+async def test_checking_debt_status_if_modified(mock_get_version, mock_get_client_debts):
+    mock_get_version.return_value = ("2024-01-01 00:00:00", 1, "2024-01-01 00:00:00", 1, "2024-01-02 00:00:00")
+    mock_get_client_debts.return_value = (client_instance.name, [debt_instance])
+
+    debt_data = {"idConsulta": "10000001", "codigoProducto": "OJw"}
+
+    etag, response = await DebtAdapter.checking_debt_status_if_modified(debt_data, None)
+    assert response == await DebtAdapter.checking_debt_status(debt_data)
+    assert mock_get_version.await_count == 2
+
+    # The cached response is answered with its ETag, without reading the version again.
+    assert await DebtAdapter.checking_debt_status_if_modified(debt_data, etag) == (etag, None)
+    assert await DebtAdapter.checking_debt_status_if_modified(debt_data, '"0"') == (etag, response)
+    assert mock_get_version.await_count == 2
+    mock_get_client_debts.assert_awaited_once()
+
+    # Without the cached response the debts are not read when the version matches.
+    DebtAdapter.invalidate_debt_status("10000001", "OJw")
+    assert await DebtAdapter.checking_debt_status_if_modified(debt_data, etag) == (etag, None)
+    mock_get_client_debts.assert_awaited_once()
+
+    mock_get_version.return_value = ("2024-01-01 00:00:00", 1, "2024-01-01 00:00:00", 1, "2024-01-03 00:00:00")
+    new_etag, new_response = await DebtAdapter.checking_debt_status_if_modified(debt_data, etag)
+    assert new_etag != etag
+    assert new_response == response
+    assert mock_get_client_debts.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+@patch('app.infrastructure.DebtRepository.get_client_debts_version', new_callable=AsyncMock)
+async def test_checking_debt_status_if_modified_during_the_read(mock_get_version, mock_get_client_debts):
+    # A payment is written between the read of the version and the read of the debts.
+    mock_get_version.side_effect = [
+        ("2024-01-01 00:00:00", 1, "2024-01-01 00:00:00", 1, "2024-01-02 00:00:00"),
+        ("2024-01-01 00:00:00", 1, "2024-01-01 00:00:00", 1, "2024-01-03 00:00:00"),
+    ]
+    mock_get_client_debts.return_value = (client_instance.name, [debt_instance])
+
+    debt_data = {"idConsulta": "10000001", "codigoProducto": "OJw"}
+
+    etag, response = await DebtAdapter.checking_debt_status_if_modified(debt_data, None)
+
+    assert response["CodigoRespuesta"] == "00"
+    assert debt_status_etag_cache.get("10000001:OJw") is None
+    assert debt_status_cache.get("10000001:OJw") is None
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.get_client_pending_debts', new_callable=AsyncMock)
+async def test_checking_debt_status_errors_not_cached(mock_get_client_debts):
+    mock_get_client_debts.side_effect = Exception("Error al obtener las deudas")
+
+    debt_data = {"idConsulta": "10000001", "codigoProducto": "OJw"}
+
+    await DebtAdapter.checking_debt_status(debt_data)
+    await DebtAdapter.checking_debt_status(debt_data)
+
+    assert mock_get_client_debts.await_count == 2
+
+
+def bulk_row(**values) -> dict:
+    return DebtBulkRow(**{
+        "idCliente": "10000001",
+        "codigoProducto": "001",
+        "descDocumento": "FACTURA",
+        "fechaEmision": "01012024",
+        "fechaVencimiento": "01022024",
+        "deuda": "100.00",
+        "pagoMinimo": "10.00",
+        "periodo": "01",
+        "cuota": "00",
+        "monedaDoc": "1",
+        **values
+    }).dict()
+
+
+@pytest.mark.asyncio
+@patch('app.domain.debt_domain.operation_identifier_generator', OperationIdentifierGenerator(node=1))
+@patch('app.infrastructure.DebtRepository.claim_operation_identifier_node', new_callable=AsyncMock)
+@patch('app.infrastructure.ClientRepository.insert_clients', new_callable=AsyncMock)
+@patch('app.infrastructure.ClientRepository.get_existing_document_identifiers', new_callable=AsyncMock)
+@patch('app.infrastructure.DebtRepository.insert_debts', new_callable=AsyncMock)
+@patch('app.infrastructure.DebtRepository.get_existing_operation_identifiers', new_callable=AsyncMock)
+async def test_bulk_create_debts_reports_rows(
+    mock_existing_debts, mock_insert_debts, mock_existing_clients, mock_insert_clients, mock_claim
+):
+    mock_existing_debts.return_value = {"B01-0000000001"}
+    mock_existing_clients.return_value = {"10000001"}
+
+    result = await DebtAdapter.bulk_create_debts(
+        [
+            (1, bulk_row(numDocumento="B01-0000000010")),
+            (2, bulk_row(numDocumento="B01-0000000010")),
+            (3, bulk_row(numDocumento="B01-0000000001")),
+            (4, bulk_row(idCliente="10000002", nombreCliente="New client")),
+            (5, bulk_row(idCliente="10000003")),
+        ],
+        create_clients=True
+    )
+
+    assert result["errors"] == {
+        2: "numDocumento: Repeated in the request",
+        3: "numDocumento: Already exists",
+        5: "nombreCliente: Required to create the client",
+    }
+    assert [debt["fila"] for debt in result["created"]] == [1, 4]
+    assert result["created_clients"] == 1
+    mock_insert_clients.assert_awaited_once()
+    mock_insert_debts.assert_awaited_once()
+    assert [debt["client"] for debt in mock_insert_debts.await_args.args[0]] == ["10000001", "10000002"]
+    mock_claim.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch('app.adapter.debt_adapter.settings.debt_bulk_chunk_size', 2)
+@patch('app.infrastructure.ClientRepository.get_existing_document_identifiers', new_callable=AsyncMock)
+@patch('app.infrastructure.DebtRepository.insert_debts', new_callable=AsyncMock)
+@patch('app.infrastructure.DebtRepository.get_existing_operation_identifiers', new_callable=AsyncMock)
+async def test_bulk_create_debts_retries_failed_chunk_row_by_row(
+    mock_existing_debts, mock_insert_debts, mock_existing_clients
+):
+    mock_existing_debts.return_value = set()
+    mock_existing_clients.return_value = {"10000001"}
+
+    async def insert_debts(debts):
+        if any(debt["operation_identifier"] == "B01-0000000002" for debt in debts):
+            raise Exception("Database error")
+
+    mock_insert_debts.side_effect = insert_debts
+
+    result = await DebtAdapter.bulk_create_debts(
+        [(row, bulk_row(numDocumento=f"B01-000000000{row}")) for row in range(1, 6)],
+        create_clients=False
+    )
+
+    assert result["errors"] == {2: "Could not be inserted"}
+    assert [debt["fila"] for debt in result["created"]] == [1, 3, 4, 5]
+    assert [len(call.args[0]) for call in mock_insert_debts.await_args_list] == [2, 1, 1, 2, 1]
+
@@ -0,0 +1,103 @@
+# A batch of debt-status queries on a SQLite file, checked in chunks of two:
+# each client gets the response of the single endpoint, from one query per chunk
+# with clients missing from the cache.
+BATCH_SCRIPT = """
+    import asyncio
+    import json
+    from unittest.mock import patch
+
+    from app.adapter.debt_adapter import debt_status_cache
+    from app.database.config import database
+    from app.infrastructure import DebtRepository
+    from app.service import DebtService
+    from app.tests.seed import create_database, insert
+
+    engine = create_database()
+    insert(engine, "client", *(
+        {"document_identifier": client, "name": f"Client {client}"} for client in ("10000003", "10000004")
+    ))
+    debts = ((1, "001", "pending"), (2, "002", "pending"), (3, "001", "paid"))
+    insert(engine, "debt", *(
+        {"operation_identifier": f"B01-000000000{number}", "product_code": product_code}
+        for number, product_code, _ in debts
+    ))
+    insert(engine, "payment", *(
+        {"debt": f"B01-000000000{number}", "operation_bank_number": f"A0000000000{number}", "status": status}
+        for number, _, status in debts
+    ))
+
+    queries = [
+        {"idConsulta": "10000003", "codigoProducto": "001"},
+        {"idConsulta": "10000003", "codigoProducto": "002"},
+        {"idConsulta": "10000004", "codigoProducto": "001"},
+        {"idConsulta": "99999999", "codigoProducto": "001"},
+        {"idConsulta": "10000003"},
+        {"idConsulta": "10000003", "codigoProducto": "0001"},
+        {"idConsulta": "10000003", "codigoProducto": "001"},
+    ]
+
+    async def main():
+        result = {}
+        async with database:
+            with patch.object(
+                DebtRepository, "get_clients_pending_debts", wraps=DebtRepository.get_clients_pending_debts
+            ) as get_clients_pending_debts, patch.object(
+                DebtRepository, "get_client_pending_debts", side_effect=AssertionError
+            ):
+                response = await DebtService.debts_status({"consultas": queries})
+                results = response["resultados"]
+                result["codigoRespuesta"] = response["codigoRespuesta"]
+                result["queries"] = get_clients_pending_debts.call_count
+                result["results"] = [
+                    [item["fila"], item["idConsulta"], item["codigoProducto"], item["CodigoRespuesta"]]
+                    for item in results
+                ]
+                result["debts"] = [[debt["NumDocumento"] for debt in item["deudasPendientes"]] for item in results]
+
+                await DebtService.debts_status({"consultas": queries[:2]})
+                result["queries_after_cached_batch"] = get_clients_pending_debts.call_count
+
+            debt_status_cache.clear()
+            singles = [
+                await DebtService.debt_status({
+                    **query, "tipoConsulta": "1", "codigoBanco": "1020", "canalPago": "10", "codigoEmpresa": "998"
+                })
+                for query in queries[:4]
+            ]
+            result["same_as_single"] = [
+                {key: value for key, value in item.items() if key not in ("fila", "idConsulta", "codigoProducto")}
+                for item in results[:4]
+            ] == singles
+
+            response = await DebtService.debts_status({"consultas": queries[:1] * 11})
+            result["too_many"] = {
+                key: response[key] for key in ("codigoRespuesta", "descripcionResp", "resultados")
+            }
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_debt_status_batch_on_sqlite(run_script):
+    result = run_script(
+        BATCH_SCRIPT,
+        DEBT_STATUS_BATCH_CHUNK_SIZE="2",
+        DEBT_STATUS_BATCH_MAX_ITEMS="10",
+        CACHE_BACKEND="memory",
+    )
+
+    assert result == {
+        "codigoRespuesta": "00",
+        "queries": 2,
+        "results": [
+            [1, "10000003", "001", "00"], [2, "10000003", "002", "00"], [3, "10000004", "001", "22"],
+            [4, "99999999", "001", "16"], [5, "10000003", None, "99"], [6, "10000003", "0001", "99"],
+            [7, "10000003", "001", "00"],
+        ],
+        "debts": [["B01-0000000001"], ["B01-0000000002"], [], [], [], [], ["B01-0000000001"]],
+        "queries_after_cached_batch": 2,
+        "same_as_single": True,
+        "too_many": {"codigoRespuesta": "13", "descripcionResp": "MAXIMO 10 CONSULTAS POR SOLICITUD", "resultados": []},
+    }
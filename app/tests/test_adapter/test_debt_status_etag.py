@@ -0,0 +1,78 @@
+# Conditional debt-status requests on a SQLite file: the ETag of a client stays
+# the same until a payment of its debts is written, and a request with the
+# current ETag gets a 304 without reading the debts.
+ETAG_SCRIPT = """
+    import asyncio
+    import json
+    from unittest.mock import patch
+
+    from app.adapter import DebtAdapter
+    from app.database.config import database
+    from app.infrastructure import DebtRepository, PaymentRepository
+    from app.main import payment_post_endpoint
+    from app.schemas.request import DebtStatusPOSTRequest
+    from app.tests.seed import create_database, insert
+
+    engine = create_database()
+    insert(engine, "client", {})
+    insert(engine, "debt", {"operation_identifier": "B01-0000000001"})
+    insert(engine, "payment", {"debt": "B01-0000000001", "operation_bank_number": "A00000000001"})
+
+    def request(client):
+        return DebtStatusPOSTRequest(
+            tipoConsulta="1", idConsulta=client, codigoBanco="1020", codigoProducto="001", canalPago="10",
+            codigoEmpresa="998"
+        )
+
+    async def post(client, if_none_match=None):
+        response = await payment_post_endpoint(request(client), if_none_match)
+        return {
+            "status": response.status_code,
+            "etag": response.headers.get("etag"),
+            "codigoRespuesta": json.loads(response.body)["CodigoRespuesta"] if response.body else None,
+        }
+
+    async def main():
+        result = {}
+        async with database:
+            result["first"] = first = await post("10000003")
+
+            with patch.object(DebtRepository, "get_client_debts_version", side_effect=AssertionError):
+                result["cached"] = await post("10000003", first["etag"])
+
+            DebtAdapter.invalidate_debt_status("10000003", "001")
+            with patch.object(DebtRepository, "get_client_pending_debts", side_effect=AssertionError):
+                result["uncached"] = await post("10000003", f'W/"0", {first["etag"]}')
+
+            payment_ids = [payment.id for payment in await PaymentRepository.get_payments_by_debt(
+                await DebtRepository.get_debt_by_operation_identifier("B01-0000000001")
+            )]
+            await PaymentRepository.set_payments_status(payment_ids, "paid")
+            DebtAdapter.invalidate_debt_status("10000003", "001")
+            result["paid"] = paid = await post("10000003", first["etag"])
+            result["paid_again"] = await post("10000003", paid["etag"])
+
+            result["unknown"] = unknown = await post("99999999")
+            result["unknown_again"] = await post("99999999", unknown["etag"])
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_debt_status_etag_on_sqlite(run_script):
+    result = run_script(ETAG_SCRIPT, CACHE_BACKEND="memory")
+
+    etag, paid_etag, unknown_etag = result["first"]["etag"], result["paid"]["etag"], result["unknown"]["etag"]
+    assert None not in (etag, paid_etag, unknown_etag)
+    assert paid_etag != etag
+    assert result == {
+        "first": {"status": 200, "etag": etag, "codigoRespuesta": "00"},
+        "cached": {"status": 304, "etag": etag, "codigoRespuesta": None},
+        "uncached": {"status": 304, "etag": etag, "codigoRespuesta": None},
+        "paid": {"status": 200, "etag": paid_etag, "codigoRespuesta": "22"},
+        "paid_again": {"status": 304, "etag": paid_etag, "codigoRespuesta": None},
+        "unknown": {"status": 200, "etag": unknown_etag, "codigoRespuesta": "16"},
+        "unknown_again": {"status": 304, "etag": unknown_etag, "codigoRespuesta": None},
+    }
@@ -0,0 +1,158 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.adapter import IdempotencyAdapter
+from app.adapter.idempotency_adapter import IN_FLIGHT_RESPONSE
+from app.tests.mock import mock_debt_update_service_response
+
+
+REQUEST_KEY = "payment:1020:A05478452120"
+
+
+def claimed(entry_token: str, response: dict = None) -> dict:
+    return {
+        "request_key": REQUEST_KEY,
+        "token": entry_token,
+        "response": json.dumps(response) if response is not None else None,
+    }
+
+
+async def process(handler: AsyncMock) -> dict:
+    return await IdempotencyAdapter.process(
+        operation="payment",
+        bank_code="1020",
+        operation_bank_number="A05478452120",
+        handler=handler
+    )
+
+
+@pytest.mark.asyncio
+@patch('app.adapter.idempotency_adapter.uuid.uuid4')
+@patch('app.infrastructure.IdempotencyRepository.complete', new_callable=AsyncMock)
+@patch('app.infrastructure.IdempotencyRepository.claim', new_callable=AsyncMock)
+async def test_process_stores_the_response_of_the_first_call(mock_claim, mock_complete, mock_uuid4):
+    mock_uuid4.return_value.hex = "token"
+    mock_claim.return_value = claimed("token")
+    handler = AsyncMock(return_value=mock_debt_update_service_response)
+
+    response = await process(handler)
+
+    assert response == mock_debt_update_service_response
+    handler.assert_awaited_once()
+    mock_claim.assert_awaited_once_with(REQUEST_KEY, "token", 60.0)
+    mock_complete.assert_awaited_once_with(
+        REQUEST_KEY, "token", mock_debt_update_service_response, 24 * 60 * 60
+    )
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.IdempotencyRepository.complete', new_callable=AsyncMock)
+@patch('app.infrastructure.IdempotencyRepository.claim', new_callable=AsyncMock)
+async def test_process_returns_the_stored_response_of_a_duplicate(mock_claim, mock_complete):
+    mock_claim.return_value = claimed("first call", mock_debt_update_service_response)
+    handler = AsyncMock()
+
+    response = await process(handler)
+
+    assert response == mock_debt_update_service_response
+    handler.assert_not_awaited()
+    mock_complete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch('app.adapter.idempotency_adapter.settings.idempotency_poll_interval', 0)
+@patch('app.infrastructure.IdempotencyRepository.claim', new_callable=AsyncMock)
+async def test_process_waits_for_the_request_in_flight(mock_claim):
+    mock_claim.side_effect = [
+        claimed("first call"),
+        claimed("first call"),
+        claimed("first call", mock_debt_update_service_response),
+    ]
+    handler = AsyncMock()
+
+    response = await process(handler)
+
+    assert response == mock_debt_update_service_response
+    assert mock_claim.await_count == 3
+    handler.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch('app.adapter.idempotency_adapter.settings.idempotency_wait_timeout', 0)
+@patch('app.infrastructure.IdempotencyRepository.claim', new_callable=AsyncMock)
+async def test_process_times_out_waiting_for_the_request_in_flight(mock_claim):
+    mock_claim.return_value = claimed("first call")
+    handler = AsyncMock()
+
+    with pytest.raises(TimeoutError):
+        await process(handler)
+
+    handler.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch('app.adapter.idempotency_adapter.uuid.uuid4')
+@patch('app.infrastructure.IdempotencyRepository.release', new_callable=AsyncMock)
+@patch('app.infrastructure.IdempotencyRepository.complete', new_callable=AsyncMock)
+@patch('app.infrastructure.IdempotencyRepository.claim', new_callable=AsyncMock)
+async def test_process_releases_failed_responses(mock_claim, mock_complete, mock_release, mock_uuid4):
+    mock_uuid4.return_value.hex = "token"
+    mock_claim.return_value = claimed("token")
+    not_found = {
+        "codigoRespuesta": "99",
+        "nombreCliente": "",
+        "numOperacionERP": "",
+        "descripcionResp": "DEUDA NO ENCONTRADA",
+    }
+    handler = AsyncMock(return_value=not_found)
+
+    response = await process(handler)
+
+    assert response == not_found
+    mock_complete.assert_not_awaited()
+    mock_release.assert_awaited_once_with(REQUEST_KEY, "token")
+
+
+@pytest.mark.asyncio
+@patch('app.adapter.idempotency_adapter.uuid.uuid4')
+@patch('app.infrastructure.IdempotencyRepository.release', new_callable=AsyncMock)
+@patch('app.infrastructure.IdempotencyRepository.claim', new_callable=AsyncMock)
+async def test_process_releases_on_exception(mock_claim, mock_release, mock_uuid4):
+    mock_uuid4.return_value.hex = "token"
+    mock_claim.return_value = claimed("token")
+    handler = AsyncMock(side_effect=Exception("Unexpected error"))
+
+    with pytest.raises(Exception, match="Unexpected error"):
+        await process(handler)
+
+    mock_release.assert_awaited_once_with(REQUEST_KEY, "token")
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.IdempotencyRepository.claim_many', new_callable=AsyncMock)
+async def test_claim_batch_splits_claimed_stored_and_in_flight_requests(mock_claim_many):
+    mock_claim_many.return_value = {
+        "a": {"request_key": "a", "token": "token", "response": None},
+        "b": {"request_key": "b", "token": "other", "response": json.dumps(mock_debt_update_service_response)},
+        "c": {"request_key": "c", "token": "other", "response": None},
+    }
+
+    claimed_keys, responses = await IdempotencyAdapter.claim_batch(["a", "b", "a", "c"], "token")
+
+    mock_claim_many.assert_awaited_once_with(["a", "b", "c"], "token", 60.0)
+    assert claimed_keys == {"a": 0}
+    assert responses == {"b": mock_debt_update_service_response, "c": IN_FLIGHT_RESPONSE}
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.IdempotencyRepository.release_many', new_callable=AsyncMock)
+@patch('app.infrastructure.IdempotencyRepository.complete_many', new_callable=AsyncMock)
+async def test_complete_batch_stores_only_successful_responses(mock_complete_many, mock_release_many):
+    failed = {**mock_debt_update_service_response, "codigoRespuesta": "99"}
+
+    await IdempotencyAdapter.complete_batch({"a": mock_debt_update_service_response, "b": failed}, "token")
+
+    mock_complete_many.assert_awaited_once_with({"a": mock_debt_update_service_response}, "token", 24 * 60 * 60)
+    mock_release_many.assert_awaited_once_with(["b"], "token")
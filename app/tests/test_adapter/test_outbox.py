@@ -0,0 +1,99 @@
+# Payment events on a SQLite file: written with the payment and its revert,
+# delivered to a stub HTTP server that fails once, and to a file by the
+# dispatcher as soon as a payment commits.
+OUTBOX_SCRIPT = """
+    import asyncio
+    import json
+    import os
+    import sys
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from app.adapter import OutboxAdapter
+    from app.database.config import database
+    from app.infrastructure import FileOutboxSink, HttpOutboxSink
+    from app.service import PaymentService
+    from app.tests.mock import debt_update_data
+    from app.tests.seed import create_database, insert, query
+
+    engine = create_database()
+    insert(engine, "client", {})
+    insert(engine, "debt", {"operation_identifier": "B01-0000000002"}, {"operation_identifier": "B01-0000000003"})
+    path = sys.argv[1]
+
+    received = []
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            received.append(body)
+            self.send_response(500 if len(received) == 1 else 204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    async def main():
+        result = {}
+        async with database:
+            await PaymentService.update_debt_payment(debt_update_data)
+            await PaymentService.revert_payment_debt(debt_update_data)
+            await PaymentService.update_debt_payment({**debt_update_data, "numDocumento": "B01-0000000009"})
+            result["written"] = query(engine, "SELECT event_type, attempts FROM outbox_event ORDER BY id")
+
+            sink = HttpOutboxSink(f"http://127.0.0.1:{server.server_port}/events", 5)
+            result["first_delivered"] = await OutboxAdapter.dispatch_once(sink, 10)
+            result["after_failure"] = query(
+                engine, "SELECT attempts, token IS NULL, last_error IS NOT NULL FROM outbox_event ORDER BY id"
+            )
+            result["retry_delivered"] = await OutboxAdapter.dispatch_once(sink, 10)
+            await sink.close()
+
+            result["received"] = [
+                [event["evento"], event["datos"]["numDocumento"], event["datos"]["estado"]]
+                for event in received[-1]["eventos"]
+            ]
+            result["posts"] = len(received)
+            result["same_batch_posted"] = received[0] == received[1]
+
+            metrics = await OutboxAdapter.metrics()
+            result["metrics"] = {key: metrics[key] for key in ("pending", "delivered", "failed_deliveries")}
+
+            dispatcher = asyncio.create_task(OutboxAdapter.dispatch_periodically(60, FileOutboxSink(path)))
+            await asyncio.sleep(0.1)
+            await PaymentService.update_debt_payment(
+                {**debt_update_data, "numDocumento": "B01-0000000003", "numOperacionBanco": "A00000000003"}
+            )
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                await asyncio.sleep(0.05)
+            dispatcher.cancel()
+            with open(path) as file:
+                result["dispatched_to_file"] = [json.loads(line)["datos"]["numDocumento"] for line in file]
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_outbox_dispatch_on_sqlite(run_script, tmp_path):
+    result = run_script(OUTBOX_SCRIPT, str(tmp_path / "events.jsonl"), OUTBOX_RETRY_BASE_DELAY="0")
+
+    assert result == {
+        "written": [["payment.paid", 0], ["payment.reverted", 0]],
+        "first_delivered": 0,
+        "after_failure": [[1, 1, 1], [1, 1, 1]],
+        "retry_delivered": 2,
+        "received": [
+            ["payment.paid", "B01-0000000002", "paid"], ["payment.reverted", "B01-0000000002", "pending"]
+        ],
+        "posts": 2,
+        "same_batch_posted": True,
+        "metrics": {"pending": 0, "delivered": 2, "failed_deliveries": 1},
+        "dispatched_to_file": ["B01-0000000003"],
+    }
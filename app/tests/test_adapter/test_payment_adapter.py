@@ -1,26 +1,46 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from ormar import NoMatch
 
 from app.adapter import PaymentAdapter
+from app.tests.mock import debt_instance, payment_instance
+
+
+@pytest.fixture(autouse=True)
+def mock_transaction():
+    with patch('app.adapter.payment_adapter.database.transaction', new_callable=MagicMock) as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_add_events():
+    with patch('app.adapter.payment_adapter.OutboxRepository.add_events', new_callable=AsyncMock) as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_invalidate_idempotency():
+    with patch('app.adapter.payment_adapter.IdempotencyAdapter.invalidate', new_callable=AsyncMock) as mock:
+        yield mock
 
 
 @pytest.mark.asyncio
 @patch(
-    'app.infrastructure.debt_repository.DebtRepository.get_debt_by_operation_identifier',
+    'app.infrastructure.debt_repository.DebtRepository.lock_debt_by_operation_identifier',
     new_callable=AsyncMock)
 @patch('app.domain.payment_domain.PaymentDomain.formating_fields', new_callable=AsyncMock)
 @patch('app.adapter.PaymentAdapter._update_or_create_payment', new_callable=AsyncMock)
 async def test_update_payments_success(
         mock_update_or_create_payment,
         mock_formatting_fields,
-        mock_get_debt
+        mock_lock_debt,
+        mock_invalidate_idempotency
 ):
 
     mock_debt = AsyncMock()
     mock_debt.client.name = "CLIENT001"
-    mock_get_debt.return_value = mock_debt
+    mock_lock_debt.return_value = mock_debt
 
     mock_payment = AsyncMock()
     mock_payment.id = "654321"
@@ -28,6 +48,8 @@ async def test_update_payments_success(
 
     payment_data = {
         "numDocumento": "123320000013",
+        "codigoBanco": "0001",
+        "numOperacionBanco": "A00000000001",
         "operation_bank_number": "1234567890",
         "payment_amount": 100.0,
         "gateway": "some_gateway",
@@ -49,53 +71,72 @@ async def test_update_payments_success(
     }
 
     assert result == expected_result
-    mock_get_debt.assert_awaited_once_with("123320000013")
+    mock_lock_debt.assert_awaited_once_with("123320000013")
     mock_formatting_fields.assert_called_once_with(payment_data, "paid")
+    mock_invalidate_idempotency.assert_awaited_once_with("revert", [("0001", "A00000000001")])
 
 
 @pytest.mark.asyncio
-@patch('app.infrastructure.PaymentRepository.get_payments_by_debt', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.update_payment_status', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.create_payment', new_callable=AsyncMock)
-async def test_update_or_create_payment_existing_payment(
-        mock_create_payment,
-        mock_update_payment,
-        mock_get_payments_by_debt
+@patch('app.adapter.debt_adapter.DebtAdapter.invalidate_debt_status')
+@patch(
+    'app.infrastructure.debt_repository.DebtRepository.lock_debt_by_operation_identifier',
+    new_callable=AsyncMock)
+@patch('app.adapter.PaymentAdapter._update_or_create_payment', new_callable=AsyncMock)
+async def test_update_payments_invalidates_debt_status(
+        mock_update_or_create_payment,
+        mock_lock_debt,
+        mock_invalidate
 ):
-    mock_payment = AsyncMock()
-    mock_get_payments_by_debt.return_value = [mock_payment]
+    mock_lock_debt.return_value = debt_instance
+    mock_update_or_create_payment.return_value = payment_instance
 
     payment_data = {
-        'operation_bank_number': '1234567890',
-        'emition_date': '2024-08-22T18:52:06',
-        'bank_code': '001',
-        'gateway': 'Gateway',
-        'payment_type': 'credit_card',
-        'payment_amount': 100.00,
-        'status': 'pending'
+        "numDocumento": debt_instance.operation_identifier,
+        "numOperacionBanco": "A05478452120",
+        "fechaTxn": "24052024",
     }
 
-    debt = AsyncMock()
-
-    await PaymentAdapter._update_or_create_payment(debt=debt, payment_data=payment_data)
+    await PaymentAdapter.update_payments(payment_data, status="pending")
 
-    mock_get_payments_by_debt.assert_awaited_once_with(debt=debt)
-
-    mock_update_payment.assert_awaited_once_with(debt=debt, status='pending')
+    mock_invalidate.assert_called_once_with(
+        debt_instance.client.pk,
+        debt_instance.product_code
+    )
 
 
 @pytest.mark.asyncio
-@patch('app.infrastructure.PaymentRepository.get_payments_by_debt', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.update_payment_status', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.create_payment', new_callable=AsyncMock)
-async def test_update_or_create_payment_no_existing_payment(
-        mock_create_payment,
-        mock_update_payment,
-        mock_get_payments_by_debt
+@patch(
+    'app.infrastructure.debt_repository.DebtRepository.lock_debt_by_operation_identifier',
+    new_callable=AsyncMock)
+@patch('app.adapter.PaymentAdapter._update_or_create_payment', new_callable=AsyncMock)
+async def test_update_payments_locks_debt_in_transaction(
+        mock_update_or_create_payment,
+        mock_lock_debt,
+        mock_transaction
 ):
+    calls = []
+    transaction = mock_transaction.return_value
+    transaction.__aenter__.side_effect = lambda *args: calls.append("begin")
+    transaction.__aexit__.side_effect = lambda *args: calls.append("commit")
+    mock_lock_debt.side_effect = lambda *args: calls.append("lock") or debt_instance
+    mock_update_or_create_payment.side_effect = (
+        lambda *args: calls.append("write") or payment_instance
+    )
+
+    payment_data = {
+        "numDocumento": debt_instance.operation_identifier,
+        "numOperacionBanco": "A05478452120",
+        "fechaTxn": "24052024",
+    }
 
-    mock_get_payments_by_debt.return_value = []
+    await PaymentAdapter.update_payments(payment_data, status="pending")
 
+    assert calls == ["begin", "lock", "write", "commit"]
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.PaymentRepository.upsert_payment', new_callable=AsyncMock)
+async def test_update_or_create_payment(mock_upsert_payment):
     payment_data = {
         'operation_bank_number': '1234567890',
         'emition_date': '2024-08-22T18:52:06',
@@ -107,11 +148,10 @@ async def test_update_or_create_payment_no_existing_payment(
     }
     debt = AsyncMock()
 
-    await PaymentAdapter._update_or_create_payment(debt=debt, payment_data=payment_data)
-
-    mock_get_payments_by_debt.assert_awaited_once_with(debt=debt)
+    payment = await PaymentAdapter._update_or_create_payment(debt=debt, payment_data=payment_data)
 
-    mock_create_payment.assert_awaited_once_with(
+    assert payment == mock_upsert_payment.return_value
+    mock_upsert_payment.assert_awaited_once_with(
         debt=debt,
         emition_date='2024-08-22T18:52:06',
         bank_code='001',
@@ -124,10 +164,10 @@ async def test_update_or_create_payment_no_existing_payment(
 
 
 @pytest.mark.asyncio
-@patch('app.infrastructure.PaymentRepository.get_payments_by_debt', new_callable=AsyncMock)
-async def test_update_or_create_payment_raises_exception(mock_get_payments_by_debt):
+@patch('app.infrastructure.PaymentRepository.upsert_payment', new_callable=AsyncMock)
+async def test_update_or_create_payment_raises_exception(mock_upsert_payment):
 
-    mock_get_payments_by_debt.side_effect = Exception("Unexpected error")
+    mock_upsert_payment.side_effect = Exception("Unexpected error")
 
     payment_data = {
         'operation_bank_number': '1234567890',
@@ -143,25 +183,21 @@ async def test_update_or_create_payment_raises_exception(mock_get_payments_by_de
     with pytest.raises(Exception, match="Unexpected error"):
         await PaymentAdapter._update_or_create_payment(debt=debt, payment_data=payment_data)
 
-    mock_get_payments_by_debt.assert_awaited_once_with(debt=debt)
+    mock_upsert_payment.assert_awaited_once()
 
 
 @pytest.mark.asyncio
 @patch(
-    'app.infrastructure.debt_repository.DebtRepository.get_debt_by_operation_identifier',
+    'app.infrastructure.debt_repository.DebtRepository.lock_debt_by_operation_identifier',
     new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.get_payments_by_debt', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.update_payment_status', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.create_payment', new_callable=AsyncMock)
+@patch('app.infrastructure.PaymentRepository.upsert_payment', new_callable=AsyncMock)
 @patch('app.domain.payment_domain.PaymentDomain.formating_fields', new_callable=AsyncMock)
 async def test_update_payments_debt_not_found(
         mock_formatting,
-        mock_create_payment,
-        mock_update_payment,
-        mock_get_payment,
-        mock_get_debt
+        mock_upsert_payment,
+        mock_lock_debt
 ):
-    mock_get_debt.side_effect = NoMatch("No matching record found")
+    mock_lock_debt.side_effect = NoMatch("No matching record found")
 
     payment_data = {
         "numDocumento": "123320000013",
@@ -183,27 +219,22 @@ async def test_update_payments_debt_not_found(
     }
 
     assert result == expected_result
-    mock_get_debt.assert_awaited_once_with("123320000013")
-    mock_create_payment.assert_not_awaited()
-    mock_update_payment.assert_not_awaited()
+    mock_lock_debt.assert_awaited_once_with("123320000013")
+    mock_upsert_payment.assert_not_awaited()
 
 
 @pytest.mark.asyncio
 @patch(
-    'app.infrastructure.debt_repository.DebtRepository.get_debt_by_operation_identifier',
+    'app.infrastructure.debt_repository.DebtRepository.lock_debt_by_operation_identifier',
     new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.get_payments_by_debt', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.create_payment', new_callable=AsyncMock)
-@patch('app.infrastructure.PaymentRepository.update_payment_status', new_callable=AsyncMock)
+@patch('app.infrastructure.PaymentRepository.upsert_payment', new_callable=AsyncMock)
 @patch('app.domain.payment_domain.PaymentDomain.formating_fields', new_callable=AsyncMock)
 async def test_update_payments_unexpected_exception(
         mock_formatting,
-        mock_update_payment,
-        mock_create_payment,
-        mock_get_payment,
-        mock_get_debt
+        mock_upsert_payment,
+        mock_lock_debt
 ):
-    mock_get_debt.side_effect = Exception("Unexpected error")
+    mock_lock_debt.side_effect = Exception("Unexpected error")
 
     payment_data = {
         "numDocumento": "123320000013",
@@ -218,6 +249,5 @@ async def test_update_payments_unexpected_exception(
     with pytest.raises(Exception, match="Unexpected error"):
         await PaymentAdapter.update_payments(payment_data)
 
-    mock_get_debt.assert_awaited_once_with("123320000013")
-    mock_create_payment.assert_not_awaited()
-    mock_update_payment.assert_not_awaited()
+    mock_lock_debt.assert_awaited_once_with("123320000013")
+    mock_upsert_payment.assert_not_awaited()
@@ -0,0 +1,77 @@
+# A batch of payment notifications on a SQLite file, applied in chunks of two:
+# each notification gets the response a single notification would get.
+BATCH_SCRIPT = """
+    import asyncio
+    import json
+
+    from app.database.config import database
+    from app.service import PaymentService
+    from app.tests.mock import debt_update_data
+    from app.tests.seed import create_database, insert, query
+
+    engine = create_database()
+    insert(engine, "client", {})
+    insert(engine, "debt", *({"operation_identifier": f"B01-000000000{number}"} for number in range(1, 5)))
+    insert(engine, "payment", {"debt": "B01-0000000004", "operation_bank_number": "X00000000004"})
+
+    def payment(number, operation_bank_number, **values):
+        return {
+            **debt_update_data,
+            "numDocumento": f"B01-000000000{number}",
+            "numOperacionBanco": operation_bank_number,
+            **values
+        }
+
+    async def main():
+        async with database:
+            single = await PaymentService.update_debt_payment(payment(3, "A00000000006"))
+
+            response = await PaymentService.update_debt_payments({"pagos": [
+                payment(1, "A00000000001"),
+                payment(1, "A00000000001"),
+                payment(9, "A00000000003"),
+                payment(1, "A00000000004", horaTxn="1"),
+                payment(2, "X00000000004"),
+                payment(3, "A00000000006"),
+                payment(4, "A00000000007"),
+            ]})
+
+        print(json.dumps({
+            "response": response,
+            "single": single,
+            "payments": query(engine, "SELECT debt, operation_bank_number, status FROM payment ORDER BY id"),
+            "idempotency_keys": query(
+                engine, "SELECT request_key, response IS NOT NULL FROM idempotency_key ORDER BY request_key"
+            ),
+        }))
+
+    asyncio.run(main())
+"""
+
+
+def test_payment_batch_on_sqlite(run_script):
+    result = run_script(BATCH_SCRIPT, PAYMENT_BATCH_CHUNK_SIZE="2")
+
+    response = result["response"]
+    assert response["codigoRespuesta"] == "00"
+    assert [
+        (item["fila"], item["codigoRespuesta"], item["descripcionResp"], item["numOperacionERP"])
+        for item in response["resultados"]
+    ] == [
+        (1, "00", "OK", "3"),
+        (2, "00", "OK", "3"),
+        (3, "99", "DEUDA NO ENCONTRADA", ""),
+        (4, "99", "ERROR DESCONOCIDO", ""),
+        (5, "99", "ERROR DESCONOCIDO", ""),
+        (6, "00", "OK", "2"),
+        (7, "00", "OK", "1"),
+    ]
+    assert response["resultados"][5] == {"fila": 6, "numOperacionBanco": "A00000000006", **result["single"]}
+    assert result["payments"] == [
+        ["B01-0000000004", "X00000000004", "paid"],
+        ["B01-0000000003", "A00000000006", "paid"],
+        ["B01-0000000001", "A00000000001", "paid"],
+    ]
+    assert result["idempotency_keys"] == [
+        ["payment:1020:A00000000001", 1], ["payment:1020:A00000000006", 1], ["payment:1020:A00000000007", 1]
+    ]
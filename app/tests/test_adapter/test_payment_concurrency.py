@@ -0,0 +1,79 @@
+# Hundreds of payments and reverts of the same debt arrive together on a SQLite
+# file. The debt lock runs them one after another, so the debt keeps a single
+# payment whose status is the one written last.
+CONCURRENCY_SCRIPT = """
+    import asyncio
+    import json
+
+    from app.adapter import PaymentAdapter
+    from app.database.config import database
+    from app.database.models import Payment
+    from app.infrastructure import DebtRepository, PaymentRepository
+    from app.tests.seed import create_database, insert
+
+    NOTIFICATIONS = 200
+
+    # Seeded outside of database, every notification must open its own connection
+    # like the requests do instead of inheriting one from the main task.
+    engine = create_database()
+    insert(engine, "client", {"document_identifier": "10000001"})
+    insert(engine, "debt", {"operation_identifier": "B01-000000000001", "client": "10000001"})
+
+    written = []
+    upsert_payment = PaymentRepository.upsert_payment
+
+    async def record_upsert_payment(**values):
+        payment = await upsert_payment(**values)
+        written.append(payment.status)
+        return payment
+
+    PaymentRepository.upsert_payment = staticmethod(record_upsert_payment)
+
+    async def main():
+        async with database:
+            payment_data = {
+                "fechaTxn": "24052024",
+                "codigoBanco": "1020",
+                "numOperacionBanco": "A05478452120",
+                "formaPago": "01",
+                "tipoConsulta": "1",
+                "numDocumento": "B01-000000000001",
+                "importePagado": 1500,
+            }
+
+            results = await asyncio.gather(
+                *(
+                    PaymentAdapter.update_payments(
+                        payment_data, status="paid" if number % 2 else "pending"
+                    )
+                    for number in range(NOTIFICATIONS)
+                ),
+                return_exceptions=True
+            )
+            payments = await Payment.objects.filter(debt="B01-000000000001").all()
+            _, pending_debts = await DebtRepository.get_client_pending_debts("10000001", "001")
+
+        print(json.dumps({
+            "errors": [repr(result) for result in results if isinstance(result, Exception)],
+            "codes": sorted({result["codigoRespuesta"] for result in results}),
+            "payment_ids": len({result["numOperacionERP"] for result in results}),
+            "writes": len(written),
+            "payments": len(payments),
+            "last_write": payments[0].status == written[-1],
+            "pending_listed": bool(pending_debts) == (payments[0].status == "pending"),
+        }))
+
+    asyncio.run(main())
+"""
+
+
+def test_concurrent_payments_of_a_debt_on_sqlite(run_script):
+    assert run_script(CONCURRENCY_SCRIPT) == {
+        "errors": [],
+        "codes": ["00"],
+        "payment_ids": 1,
+        "writes": 200,
+        "payments": 1,
+        "last_write": True,
+        "pending_listed": True,
+    }
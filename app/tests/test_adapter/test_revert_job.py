@@ -0,0 +1,113 @@
+# Revert jobs on a SQLite file in chunks of two: a job whose worker stopped after
+# its first chunk is resumed from its cursor, and a live claim is not taken over.
+REVERT_JOB_SCRIPT = """
+    import asyncio
+    import json
+
+    from app.adapter import RevertJobAdapter
+    from app.adapter.revert_job_adapter import running_jobs
+    from app.database.config import database
+    from app.infrastructure import RevertJobRepository
+    from app.service import RevertJobService
+    from app.tests.seed import create_database, insert, query
+
+    engine = create_database()
+    payments = [
+        ("1020", "2024-01-01 00:00:00.000000", "paid"),
+        ("1020", "2024-01-02 10:00:00.000000", "paid"),
+        ("2030", "2024-01-02 10:00:00.000000", "paid"),
+        ("1020", "2024-01-02 10:00:00.000000", "pending"),
+        ("1020", "2024-01-03 00:00:00.000000", "paid"),
+        ("1020", "2024-01-02 23:59:59.000000", "paid"),
+    ]
+    # Dates in the format SQLAlchemy stores them, SQLite compares them as text.
+    insert(engine, "client", {})
+    insert(engine, "debt", *(
+        {"operation_identifier": f"B01-000000000{number}"} for number in range(1, len(payments) + 1)
+    ))
+    insert(engine, "payment", *(
+        {
+            "debt": f"B01-000000000{number}",
+            "emition_date": emition_date,
+            "bank_code": bank_code,
+            "operation_bank_number": f"A0000000000{number}",
+            "status": status,
+        }
+        for number, (bank_code, emition_date, status) in enumerate(payments, start=1)
+    ))
+
+    def job_row(job_id):
+        return query(engine, f"SELECT status, cursor, reverted FROM revert_job WHERE id = {job_id}")[0]
+
+    def payment_statuses():
+        return query(engine, "SELECT id, status FROM payment ORDER BY id")
+
+    async def main():
+        result = {}
+        async with database:
+            created = await RevertJobService.create_revert_job(
+                {"codigoBanco": "1020", "fechaDesde": "01012024", "fechaHasta": "02012024"}
+            )
+            await RevertJobAdapter.stop()
+            job_id = created["idReversion"]
+            result["created"] = created["estado"]
+
+            # A worker claims the job, reverts a chunk and stops without releasing it.
+            result["claimed"] = await RevertJobRepository.claim_job(job_id, "stopped", 60)
+            result["first_chunk_done"] = await RevertJobAdapter.revert_chunk(job_id, "stopped", 2, None)
+            result["claimed_by_other"] = await RevertJobRepository.claim_job(job_id, "other", 60)
+            result["stopped_job"] = job_row(job_id)
+
+            await RevertJobAdapter.run(job_id)
+            result["resumed_job"] = job_row(job_id)
+            result["payments_by_range"] = payment_statuses()
+
+            # The list is read once for both chunks of the job.
+            list_reads = []
+            get_operation_bank_numbers = RevertJobRepository.get_operation_bank_numbers
+
+            async def counted_get_operation_bank_numbers(job_id):
+                list_reads.append(job_id)
+                return await get_operation_bank_numbers(job_id)
+
+            RevertJobRepository.get_operation_bank_numbers = counted_get_operation_bank_numbers
+            created = await RevertJobService.create_revert_job(
+                {"numOperacionesBanco": ["A00000000003", "Z00000000000", "A00000000005", "A00000000003"]}
+            )
+            await asyncio.gather(*running_jobs.values())
+            result["list_reads"] = len(list_reads)
+            result["list_job"] = await RevertJobService.get_revert_job(created["idReversion"])
+            result["missing_job"] = (await RevertJobService.get_revert_job(999))["descripcionResp"]
+
+        result["payments_by_list"] = payment_statuses()
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_revert_job_resumed_on_sqlite(run_script):
+    result = run_script(REVERT_JOB_SCRIPT, REVERT_JOB_CHUNK_SIZE="2", REVERT_JOB_HEARTBEAT_TTL="0")
+
+    assert result == {
+        "created": "pending",
+        "claimed": True,
+        "first_chunk_done": False,
+        "claimed_by_other": False,
+        "stopped_job": ["running", 2, 2],
+        "resumed_job": ["completed", 6, 3],
+        "payments_by_range": [[1, "pending"], [2, "pending"], [3, "paid"], [4, "pending"], [5, "paid"], [6, "pending"]],
+        "list_job": {
+            "codigoRespuesta": "00",
+            "descripcionResp": "OK",
+            "idReversion": 2,
+            "estado": "completed",
+            "revertidos": 2,
+            "error": None,
+        },
+        "list_reads": 1,
+        "missing_job": "REVERSION NO ENCONTRADA",
+        "payments_by_list": [
+            [1, "pending"], [2, "pending"], [3, "pending"], [4, "pending"], [5, "pending"], [6, "pending"]
+        ],
+    }
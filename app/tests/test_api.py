@@ -1,8 +1,10 @@
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 
-from main import app
+from main import app, background_tasks, shutdown, startup
 from app.tests.mock import (
     debt_update_data,
     mock_debt_update_service_response,
@@ -50,3 +52,37 @@ def test_update_debt_payment_invalid_data_endpoint(mock_update_debt_payment):
     assert any("value_error" in error["type"] for error in response_data["detail"])
 
     mock_update_debt_payment.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch('main.database')
+async def test_startup_fails_on_misconfigured_outbox_sink(mock_database):
+    mock_database.connect = AsyncMock()
+
+    with patch('app.infrastructure.outbox_sink.settings.outbox_sink', "http"), \
+            patch('app.infrastructure.outbox_sink.settings.outbox_http_url', None):
+        with pytest.raises(ValueError, match="OUTBOX_HTTP_URL"):
+            await startup()
+
+    mock_database.connect.assert_not_awaited()
+    assert not background_tasks
+
+
+@pytest.mark.asyncio
+@patch('main.RevertJobAdapter.stop', new_callable=AsyncMock)
+@patch('main.database')
+async def test_shutdown_disconnects_after_failed_background_task(mock_database, mock_stop, caplog):
+    async def fail():
+        raise RuntimeError("dispatcher failed")
+
+    mock_database.disconnect = AsyncMock()
+    failed = asyncio.create_task(fail())
+    background_tasks.update({failed, asyncio.create_task(asyncio.sleep(60))})
+    await asyncio.sleep(0)
+
+    await shutdown()
+
+    assert not background_tasks
+    mock_stop.assert_awaited_once()
+    mock_database.disconnect.assert_awaited_once()
+    assert "dispatcher failed" in caplog.text
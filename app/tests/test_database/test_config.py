@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import databases
+import pytest
+import sqlalchemy
+
+from app.database.config import (
+    RoutingDatabase,
+    create_schema,
+    get_database_options,
+    warm_up_database,
+)
+
+
+@patch('app.database.config.settings.db_lock_timeout', 10.0)
+def test_get_database_options_sqlite():
+    assert get_database_options("sqlite:///test.db") == {"timeout": 10.0}
+
+
+@patch('app.database.config.settings.db_pool_min_size', 2)
+@patch('app.database.config.settings.db_pool_max_size', 20)
+@patch('app.database.config.settings.db_statement_cache_size', 0)
+@patch('app.database.config.settings.db_lock_timeout', 2.5)
+def test_get_database_options_postgresql():
+    options = get_database_options("postgresql://paracas:paracas@db:5432/payment_service")
+
+    assert options["min_size"] == 2
+    assert options["max_size"] == 20
+    assert options["statement_cache_size"] == 0
+    assert options["server_settings"] == {"lock_timeout": "2500ms"}
+    assert "max_inactive_connection_lifetime" in options
+    assert "max_queries" in options
+
+
+@pytest.mark.asyncio
+@patch('app.database.config.settings.db_pool_min_size', 3)
+async def test_warm_up_database_opens_min_size_connections():
+    database = MagicMock()
+    database.url = databases.DatabaseURL("postgresql://paracas:paracas@db:5432/payment_service")
+    database.fetch_val = AsyncMock(return_value=1)
+
+    await warm_up_database(database)
+
+    assert database.fetch_val.await_count == 3
+
+
+def test_import_app_does_not_touch_database(tmp_path):
+    db_path = tmp_path / "cold_start.db"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "PYTHONPATH": os.getcwd()}
+
+    subprocess.run([sys.executable, "-c", "import app.main"], env=env, check=True)
+
+    assert not db_path.exists()
+
+
+def test_create_schema_creates_tables(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+
+    with patch('app.database.config.get_engine', return_value=engine):
+        create_schema()
+
+    assert {"client", "debt", "payment"} <= set(sqlalchemy.inspect(engine).get_table_names())
+
+
+def create_named_database(path, name: str) -> str:
+    url = f"sqlite:///{path}"
+    engine = sqlalchemy.create_engine(url)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE source (name TEXT)")
+        connection.exec_driver_sql(f"INSERT INTO source VALUES ('{name}')")
+    return url
+
+
+@pytest.mark.asyncio
+async def test_routing_database_reads_from_replica(tmp_path):
+    primary_url = create_named_database(tmp_path / "primary.db", "primary")
+    replica_url = create_named_database(tmp_path / "replica.db", "replica")
+    database = RoutingDatabase(primary_url, replica=databases.Database(replica_url))
+
+    async with database:
+        replica_read = await database.read_from_replica(
+            lambda: database.fetch_val("SELECT name FROM source")
+        )
+        primary_read = await database.fetch_val("SELECT name FROM source")
+
+    assert replica_read == "replica"
+    assert primary_read == "primary"
+
+
+@pytest.mark.asyncio
+async def test_routing_database_falls_back_to_primary(tmp_path):
+    primary_url = create_named_database(tmp_path / "primary.db", "primary")
+    replica_url = create_named_database(tmp_path / "replica.db", "replica")
+    database = RoutingDatabase(primary_url, replica=databases.Database(replica_url))
+    attempts = []
+
+    async def read():
+        attempts.append(len(attempts) + 1)
+        if len(attempts) == 1:
+            raise ConnectionResetError("Connection lost")
+        return await database.fetch_val("SELECT name FROM source")
+
+    async with database:
+        read_value = await database.read_from_replica(read)
+
+    assert read_value == "primary"
+    assert attempts == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_routing_database_raises_query_errors_of_replica(tmp_path):
+    primary_url = create_named_database(tmp_path / "primary.db", "primary")
+    database = RoutingDatabase(
+        primary_url,
+        replica=databases.Database(f"sqlite:///{tmp_path / 'empty_replica.db'}")
+    )
+    attempts = []
+
+    async def read():
+        attempts.append(len(attempts) + 1)
+        return await database.fetch_val("SELECT name FROM source")
+
+    async with database:
+        with pytest.raises(sqlite3.OperationalError):
+            await database.read_from_replica(read)
+
+    assert attempts == [1]
+
+
+@pytest.mark.asyncio
+async def test_routing_database_without_replica(tmp_path):
+    database = RoutingDatabase(create_named_database(tmp_path / "primary.db", "primary"))
+
+    async with database:
+        read = await database.read_from_replica(
+            lambda: database.fetch_val("SELECT name FROM source")
+        )
+
+    assert read == "primary"
+
+
+def test_routing_database_rejects_replica_of_other_backend():
+    with pytest.raises(ValueError):
+        RoutingDatabase(
+            "sqlite:///primary.db",
+            replica=databases.Database("postgresql://paracas:paracas@db:5432/payment_service")
+        )
@@ -0,0 +1,140 @@
+from datetime import datetime
+from decimal import Decimal
+
+import databases
+import pytest
+import sqlalchemy
+
+from app.database.statements import StatementRegistry, get_dialect
+
+
+metadata = sqlalchemy.MetaData()
+invoice = sqlalchemy.Table(
+    "invoice",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("owner", sqlalchemy.String(10)),
+    sqlalchemy.Column("amount", sqlalchemy.Numeric(12, 2)),
+    sqlalchemy.Column("issued_at", sqlalchemy.DateTime),
+)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    url = f"sqlite:///{tmp_path / 'statements.db'}"
+    metadata.create_all(sqlalchemy.create_engine(url))
+    return StatementRegistry(databases.Database(url))
+
+
+@pytest.mark.asyncio
+async def test_statement_compiled_once_and_rows_processed(registry):
+    insert_invoice = registry.register("insert_invoice", invoice.insert().values(
+        owner=sqlalchemy.bindparam("owner"),
+        amount=sqlalchemy.bindparam("amount"),
+        issued_at=sqlalchemy.bindparam("issued_at"),
+    ))
+    invoices_by_owner = registry.register(
+        "invoices_by_owner",
+        sqlalchemy.select([invoice.c.amount, invoice.c.issued_at]).where(
+            invoice.c.owner == sqlalchemy.bindparam("owner")
+        )
+    )
+    issued_at = datetime(2024, 1, 2, 3, 4, 5)
+
+    async with registry.database:
+        await insert_invoice.execute(owner="a", amount=Decimal("10.50"), issued_at=issued_at)
+        first = await invoices_by_owner.fetch_all(owner="a")
+        second = await invoices_by_owner.fetch_one(owner="a")
+        missing = await invoices_by_owner.fetch_one(owner="b")
+
+    assert first == [{"amount": Decimal("10.50"), "issued_at": issued_at}]
+    assert second == first[0]
+    assert missing is None
+    assert registry.stats()["invoices_by_owner"]["compilations"] == 1
+    assert registry.stats()["invoices_by_owner"]["executions"] == 3
+
+
+@pytest.mark.asyncio
+async def test_statement_runs_in_the_current_transaction(registry):
+    insert_invoice = registry.register("insert_invoice", invoice.insert().values(
+        owner=sqlalchemy.bindparam("owner")
+    ))
+    invoices_by_owner = registry.register(
+        "invoices_by_owner",
+        sqlalchemy.select([invoice.c.owner]).where(invoice.c.owner == sqlalchemy.bindparam("owner"))
+    )
+
+    async with registry.database:
+        async with registry.database.transaction(force_rollback=True):
+            await insert_invoice.execute(owner="a")
+            assert await invoices_by_owner.fetch_one(owner="a") == {"owner": "a"}
+
+        assert await invoices_by_owner.fetch_one(owner="a") is None
+
+
+@pytest.mark.asyncio
+async def test_statement_executed_for_many_rows(registry):
+    insert_invoice = registry.register("insert_invoice", invoice.insert().values(
+        owner=sqlalchemy.bindparam("owner"),
+        amount=sqlalchemy.bindparam("amount"),
+    ))
+    invoices = registry.register(
+        "invoices",
+        sqlalchemy.select([invoice.c.owner, invoice.c.amount]).order_by(invoice.c.owner)
+    )
+
+    async with registry.database:
+        await insert_invoice.execute_many([
+            {"owner": "a", "amount": Decimal("1.10")},
+            {"owner": "b", "amount": Decimal("2.20")},
+        ])
+        rows = await invoices.fetch_all()
+
+    assert rows == [{"owner": "a", "amount": Decimal("1.10")}, {"owner": "b", "amount": Decimal("2.20")}]
+    assert registry.stats()["insert_invoice"]["compilations"] == 1
+
+
+def test_register_twice_fails(registry):
+    registry.register("all_invoices", sqlalchemy.select([invoice]))
+
+    with pytest.raises(ValueError):
+        registry.register("all_invoices", sqlalchemy.select([invoice]))
+
+
+def test_postgresql_statement_uses_numbered_parameters(registry):
+    statement = registry.register(
+        "invoices_by_owner_and_amount",
+        sqlalchemy.select([invoice.c.id]).where(
+            invoice.c.owner == sqlalchemy.bindparam("owner"),
+            invoice.c.amount > sqlalchemy.bindparam("amount"),
+        )
+    )
+
+    compiled = statement.compile("postgresql", get_dialect("postgresql"))
+
+    assert compiled.parameters == ("amount", "owner")
+    assert "invoice.owner = $2" in compiled.sql
+    assert "invoice.amount > $1" in compiled.sql
+
+
+@pytest.mark.asyncio
+async def test_unsupported_backend_runs_bound_statement_through_databases(registry):
+    insert_invoice = registry.register("insert_invoice", invoice.insert().values(
+        owner=sqlalchemy.bindparam("owner")
+    ))
+    update_invoice = registry.register("update_invoice", invoice.update().where(
+        invoice.c.owner == sqlalchemy.bindparam("owner")
+    ).values(amount=sqlalchemy.bindparam("amount")))
+    invoices_by_owner = registry.register(
+        "invoices_by_owner",
+        sqlalchemy.select([invoice.c.amount]).where(invoice.c.owner == sqlalchemy.bindparam("owner"))
+    )
+    registry._dialects["sqlite"] = None
+
+    async with registry.database:
+        await insert_invoice.execute(owner="a")
+        await update_invoice.execute(owner="a", amount=Decimal("3.00"))
+        rows = await invoices_by_owner.fetch_all(owner="a")
+
+    assert rows == [{"amount": Decimal("3.00")}]
+    assert registry.stats()["invoices_by_owner"]["compilations"] == 0
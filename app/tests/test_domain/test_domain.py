@@ -1,6 +1,8 @@
+from unittest.mock import patch
+
 import pytest
 
-from app.domain.debt_domain import DebtDomain
+from app.domain.debt_domain import OPERATION_IDENTIFIER_BASE, DebtDomain, OperationIdentifierGenerator
 
 
 @pytest.mark.parametrize("length", [16, 10, 20])
@@ -11,6 +13,63 @@ def test_generate_operation_identifier(length):
     assert all(char.isalnum() or char == '-' for char in identifier)
 
 
+def test_generate_sortable_operation_identifier():
+    generator = OperationIdentifierGenerator()
+    generator.set_node(1)
+
+    with patch('app.domain.debt_domain.operation_identifier_generator', generator):
+        identifiers = [DebtDomain.generate_sortable_operation_identifier() for _ in range(1000)]
+
+    assert len(set(identifiers)) == len(identifiers)
+    assert identifiers == sorted(identifiers)
+    assert all(DebtDomain.validate_operation_identifier(identifier) for identifier in identifiers)
+
+
+def test_sortable_operation_identifiers_follow_the_clock():
+    now = [1726000000.0]
+    generator = OperationIdentifierGenerator(clock=lambda: now[0], node=0)
+
+    first = generator.generate()
+    now[0] += 0.001
+    second = generator.generate()
+    now[0] -= 60
+    after_clock_went_back = generator.generate()
+
+    assert first < second < after_clock_went_back
+    assert first[:7] < second[:7]
+    assert after_clock_went_back[:7] == second[:7]
+
+
+def test_sortable_operation_identifiers_of_two_nodes_do_not_collide():
+    first_node = OperationIdentifierGenerator(clock=lambda: 1726000000.0, node=1)
+    second_node = OperationIdentifierGenerator(clock=lambda: 1726000000.0, node=2)
+
+    first = {first_node.generate() for _ in range(100)}
+    second = {second_node.generate() for _ in range(100)}
+
+    assert not first & second
+
+
+def test_sortable_operation_identifier_node_is_set_again_after_fork():
+    generator = OperationIdentifierGenerator()
+
+    with pytest.raises(RuntimeError):
+        generator.generate()
+
+    with patch('app.domain.debt_domain.os.getpid', return_value=1):
+        generator.set_node(OPERATION_IDENTIFIER_BASE ** 4 + 1)
+        parent = generator.generate()
+    with patch('app.domain.debt_domain.os.getpid', return_value=2):
+        assert not generator.has_node()
+        with pytest.raises(RuntimeError):
+            generator.generate()
+        generator.set_node(2)
+        child = generator.generate()
+
+    assert parent[7:11] == OperationIdentifierGenerator._encode(1, 4)
+    assert child[7:11] == OperationIdentifierGenerator._encode(2, 4)
+
+
 @pytest.mark.parametrize("identifier,expected", [
     ("abcd-1234-efgh-5678", False),
     ("abcd1234efgh5678", True),
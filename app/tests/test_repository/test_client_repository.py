@@ -8,18 +8,17 @@ from app.infrastructure.client_repository import ClientRepository
 
 
 @pytest.mark.asyncio
-@patch('app.database.models.Client.Meta.database.fetch_all', new_callable=AsyncMock)
-async def test_get_client_by_id(mock_fetch_all):
-
-    mock_result_proxy = create_mock_result_proxy(mock_client_data)
-
-    mock_fetch_all.return_value = [mock_result_proxy]
+@patch('app.infrastructure.client_repository.client_by_document_identifier.fetch_one', new_callable=AsyncMock)
+async def test_get_client_by_id(mock_fetch_one):
+    mock_fetch_one.return_value = mock_client_data
 
     client = await ClientRepository.get_client_by_document_identifier(
         document_identifier=mock_client_data['document_identifier']
     )
 
-    mock_fetch_all.assert_called_once()
+    mock_fetch_one.assert_awaited_once_with(
+        document_identifier=mock_client_data['document_identifier']
+    )
     assert client.document_identifier == mock_client_data['document_identifier']
     assert client.name == mock_client_data['name']
     assert client.company == mock_client_data['company']
@@ -27,9 +26,9 @@ async def test_get_client_by_id(mock_fetch_all):
 
 
 @pytest.mark.asyncio
-@patch('app.database.models.Client.Meta.database.fetch_all', new_callable=AsyncMock)
-async def test_get_client_by_id_not_found(mock_fetch_all):
-    mock_fetch_all.return_value = []
+@patch('app.infrastructure.client_repository.client_by_document_identifier.fetch_one', new_callable=AsyncMock)
+async def test_get_client_by_id_not_found(mock_fetch_one):
+    mock_fetch_one.return_value = None
 
     result = await ClientRepository.get_client_by_document_identifier(
         document_identifier=mock_client_data['document_identifier']
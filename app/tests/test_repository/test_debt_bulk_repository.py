@@ -0,0 +1,95 @@
+# A bulk request mixing valid and invalid rows on a SQLite file, inserted in
+# chunks of two rows: the invalid rows are reported and the others created.
+BULK_SCRIPT = """
+    import asyncio
+    import json
+
+    from app.database.config import database
+    from app.infrastructure import DebtRepository
+    from app.service import DebtService
+    from app.tests.seed import create_database, insert, query
+
+    engine = create_database()
+    insert(engine, "client", {"document_identifier": "10000001"})
+    insert(engine, "debt", {"operation_identifier": "B01-0000000001", "client": "10000001"})
+
+    def scalar(sql):
+        return query(engine, sql)[0][0]
+
+    def row(**values):
+        return {
+            "idCliente": "10000001",
+            "codigoProducto": "001",
+            "descDocumento": "FACTURA",
+            "fechaEmision": "01012024",
+            "fechaVencimiento": "01022024",
+            "deuda": "100.00",
+            "pagoMinimo": "10.00",
+            "periodo": "01",
+            "cuota": "00",
+            "monedaDoc": "1",
+            **values
+        }
+
+    async def main():
+        result = {}
+        async with database:
+            response = await DebtService.bulk_create_debts({
+                "crearClientes": True,
+                "deudas": [
+                    row(numDocumento="B01-0000000010"),
+                    row(numDocumento="B01-0000000011", codigoProducto="0001"),
+                    row(idCliente="10000002", nombreCliente="New client", numDocumento="B01-0000000012"),
+                    row(numDocumento="B01-0000000010"),
+                    row(idCliente="10000003", numDocumento="B01-0000000013"),
+                    row(),
+                    row(numDocumento="B01-0000000001"),
+                    row(idCliente="10000002", numDocumento="B01-0000000014"),
+                ],
+            })
+            result["bulk"] = {
+                key: response[key] for key in ("codigoRespuesta", "recibidas", "creadas", "clientesCreados")
+            }
+            result["created_rows"] = [debt["fila"] for debt in response["deudas"]]
+            result["errors"] = {error["fila"]: error["errores"] for error in response["errores"]}
+            result["debts"] = scalar("SELECT COUNT(*) FROM debt")
+            result["new_client"] = scalar("SELECT name FROM client WHERE document_identifier = '10000002'")
+
+            # A debt created since the lookup fails its chunk, whose other row is still created.
+            async def no_existing(operation_identifiers):
+                return set()
+
+            DebtRepository.get_existing_operation_identifiers = staticmethod(no_existing)
+            response = await DebtService.bulk_create_debts({
+                "deudas": [row(numDocumento="B01-0000000001"), row(numDocumento="B01-0000000020")],
+            })
+            result["raced"] = {
+                "codigoRespuesta": response["codigoRespuesta"],
+                "created_rows": [debt["fila"] for debt in response["deudas"]],
+                "errors": response["errores"],
+            }
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_bulk_debts_are_created_in_chunks_on_sqlite(run_script):
+    assert run_script(BULK_SCRIPT, DEBT_BULK_CHUNK_SIZE="2") == {
+        "bulk": {"codigoRespuesta": "01", "recibidas": 8, "creadas": 4, "clientesCreados": 1},
+        "created_rows": [1, 3, 6, 8],
+        "errors": {
+            "2": ["codigoProducto: Must have length 3"],
+            "4": ["numDocumento: Repeated in the request"],
+            "5": ["nombreCliente: Required to create the client"],
+            "7": ["numDocumento: Already exists"],
+        },
+        "debts": 5,
+        "new_client": "New client",
+        "raced": {
+            "codigoRespuesta": "01",
+            "created_rows": [2],
+            "errors": [{"fila": 1, "numDocumento": "B01-0000000001", "errores": ["numDocumento: Already exists"]}],
+        },
+    }
@@ -0,0 +1,119 @@
+# Debts exported as NDJSON from a SQLite file in pages of two debts, with
+# filters, and the peak memory of an export of a table ten times larger.
+EXPORT_SCRIPT = """
+    import asyncio
+    import json
+    import tracemalloc
+
+    from app.database.config import database
+    from app.main import export_debts_endpoint
+    from app.service import DebtService
+    from app.settings import settings
+    from app.tests.seed import create_database, insert
+
+    engine = create_database()
+    insert(engine, "client", {})
+    insert(engine, "debt", *(
+        {
+            "operation_identifier": f"B01-000000000{number}",
+            "emition_date": "2024-01-01 00:00:00.000000",
+            "expiration_date": "2024-02-01 00:00:00.000000",
+            "total_debt": 100.5,
+            "product_code": product_code,
+            "currency": currency,
+        }
+        for number, product_code, currency in (
+            (5, "001", "1"), (1, "001", "1"), (2, "002", "1"), (3, "001", "2"), (4, "002", "2")
+        )
+    ))
+    insert(engine, "payment", *(
+        {"debt": debt, "status": status, "operation_bank_number": f"A0000000000{number}"}
+        for number, (debt, status) in enumerate((
+            ("B01-0000000001", "pending"), ("B01-0000000002", "paid"), ("B01-0000000003", "paid"),
+            ("B01-0000000003", "pending")
+        ))
+    ))
+
+    def seed_product(numbers):
+        insert(engine, "debt", *(
+            {"operation_identifier": f"C{number:015d}", "product_code": "777"} for number in numbers
+        ))
+
+    async def export(**filters):
+        return b"".join([chunk async for chunk in DebtService.export_debts(**filters)])
+
+    async def peak_memory(product_code):
+        tracemalloc.start()
+        exported = 0
+        async for chunk in DebtService.export_debts(product_code=product_code):
+            exported += chunk.count(b"\\n")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return exported, peak
+
+    async def main():
+        result = {}
+        async with database:
+            debts = [json.loads(line) for line in (await export()).splitlines()]
+            result["first"] = debts[0]
+            result["statuses"] = [[debt["numDocumento"], debt["estado"]] for debt in debts]
+            result["filtered"] = {
+                name: [json.loads(line)["numDocumento"] for line in (await export(**filters)).splitlines()]
+                for name, filters in (
+                    ("product_code", {"product_code": "002"}),
+                    ("currency", {"currency": "2"}),
+                    ("paid", {"status": "paid"}),
+                    ("pending", {"status": "pending"}),
+                )
+            }
+
+            response = await export_debts_endpoint(codigoProducto="001", monedaDoc="1", estado="pending")
+            result["endpoint"] = {
+                "media_type": response.media_type,
+                "body": b"".join([chunk async for chunk in response.body_iterator]).decode(),
+            }
+
+            settings.debt_export_page_size = 200
+            seed_product(range(2000))
+            small, small_peak = await peak_memory("777")
+            seed_product(range(2000, 20000))
+            large, large_peak = await peak_memory("777")
+            result["memory"] = {"small": small, "large": large, "flat": large_peak < 1.5 * small_peak}
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_debt_export_on_sqlite(run_script):
+    first = {
+        "numDocumento": "B01-0000000001", "idCliente": "10000003", "nombreCliente": "Client",
+        "codigoProducto": "001", "descDocumento": "Debt", "fechaEmision": "01012024",
+        "fechaVencimiento": "01022024", "deuda": 100.5, "mora": 0.0, "gastosAdm": 0.0, "pagoMinimo": 10.0,
+        "periodo": "01", "cuota": "00", "monedaDoc": "1", "estado": "pending",
+    }
+
+    assert run_script(EXPORT_SCRIPT, DEBT_EXPORT_PAGE_SIZE="2") == {
+        "first": first,
+        "statuses": [
+            ["B01-0000000001", "pending"], ["B01-0000000002", "paid"], ["B01-0000000003", "pending"],
+            ["B01-0000000004", None], ["B01-0000000005", None],
+        ],
+        "filtered": {
+            "product_code": ["B01-0000000002", "B01-0000000004"],
+            "currency": ["B01-0000000003", "B01-0000000004"],
+            "paid": ["B01-0000000002"],
+            "pending": ["B01-0000000001", "B01-0000000003"],
+        },
+        "endpoint": {
+            "media_type": "application/x-ndjson",
+            "body": (
+                '{"numDocumento":"B01-0000000001","idCliente":"10000003","nombreCliente":"Client",'
+                '"codigoProducto":"001","descDocumento":"Debt","fechaEmision":"01012024",'
+                '"fechaVencimiento":"01022024","deuda":100.5,"mora":0.0,"gastosAdm":0.0,"pagoMinimo":10.0,'
+                '"periodo":"01","cuota":"00","monedaDoc":"1","estado":"pending"}\n'
+            ),
+        },
+        "memory": {"small": 2000, "large": 20000, "flat": True},
+    }
@@ -1,60 +1,109 @@
+import sqlite3
 from datetime import datetime
 from unittest.mock import patch, AsyncMock
 
+import databases
 import pytest
 from ormar import NoMatch
 
-from app.infrastructure.debt_repository import DebtRepository
+from app.infrastructure.debt_repository import (
+    DebtRepository,
+    PendingDebtRow,
+    _lock_debts_statement,
+    client_pending_debts,
+    debt_by_operation_identifier_for_update,
+)
 from app.database.models import Debt
+from app.database.statements import statements
+from app.exceptions.custom_exception import UniqueIdentifierGenerationError
+from app.tests.mock import debt_instance, client_instance
+
+
+debt_values = {
+    "client": client_instance,
+    "description": "Test Debt",
+    "emition_date": datetime.now(),
+    "expiration_date": datetime.now(),
+    "total_debt": 1000.00,
+    "default_debt": 100.00,
+    "administration_expenses": 50.00,
+    "minimum_payment": 150.00,
+    "period": "01",
+    "fee": "10",
+    "product_code": "001",
+    "currency": "1",
+}
 
 
 @pytest.mark.asyncio
-@patch('app.infrastructure.debt_repository.Debt.objects.get', new_callable=AsyncMock)
-@patch('app.infrastructure.debt_repository.Debt.objects.create', new_callable=AsyncMock)
-@patch('app.database.models.Debt.Meta.database.fetch_all', new_callable=AsyncMock)
+@patch('app.infrastructure.debt_repository.operation_identifier_generator.set_node')
+@patch('app.infrastructure.debt_repository.operation_identifier_generator.has_node', return_value=False)
+@patch('ormar.QuerySet.create', new_callable=AsyncMock)
+async def test_claim_operation_identifier_node(mock_create, mock_has_node, mock_set_node):
+    mock_create.return_value.id = 7
+
+    await DebtRepository.claim_operation_identifier_node()
+
+    mock_create.assert_awaited_once_with()
+    mock_set_node.assert_called_once_with(7)
+
+    mock_has_node.return_value = True
+    await DebtRepository.claim_operation_identifier_node()
+
+    mock_create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.claim_operation_identifier_node', new_callable=AsyncMock)
+@patch('ormar.QuerySet.create', new_callable=AsyncMock)
 @patch(
-    'app.domain.debt_domain.DebtDomain.generate_operation_identifier',
-    return_value="existing_id"
+    'app.domain.debt_domain.DebtDomain.generate_sortable_operation_identifier',
+    return_value="0HCvrl2o4W1-----"
 )
-async def test_generate_unique_operation_identifier_retry(
-        mock_generate_id,
-        mock_fetch_all,
-        mock_get,
-        mock_create
-):
-    mock_debt_data = {
-        "operation_identifier": "existing_id",
-        "client": "valid_client_id",
-        "description": "Test Debt",
-        "emition_date": datetime.now(),
-        "expiration_date": datetime.now(),
-        "total_debt": 1000.00,
-        "default_debt": 100.00,
-        "administration_expenses": 50.00,
-        "minimum_payment": 150.00,
-        "period": "M",
-        "fee": "10",
-        "product_code": "001",
-        "currency": "USD",
-        "date_created": datetime.now(),
-        "date_updated": datetime.now(),
-        "created_by": None,
-        "updated_by": None
-    }
-
-    amount_of_attempts = 3
+async def test_add_debt_claims_a_node_and_inserts_once(mock_generate_id, mock_create, mock_claim):
+    mock_create.return_value = debt_instance
 
-    mock_get.side_effect = Debt(**mock_debt_data)
+    debt = await DebtRepository.add_debt(**debt_values)
 
-    mock_fetch_all.return_value = [mock_debt_data]
+    assert debt == debt_instance
+    mock_claim.assert_awaited_once()
+    mock_create.assert_awaited_once()
+    assert mock_create.await_args.kwargs["operation_identifier"] == "0HCvrl2o4W1-----"
 
-    with pytest.raises(Exception) as exc_info:
-        await DebtRepository._generate_unique_operation_identifier(max_attempts=amount_of_attempts)
 
-    assert str(exc_info.value) == (
-        f"Failed to generate a unique identifier after {amount_of_attempts} attempts"
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.claim_operation_identifier_node', new_callable=AsyncMock)
+@patch('ormar.QuerySet.create', new_callable=AsyncMock)
+@patch(
+    'app.domain.debt_domain.DebtDomain.generate_sortable_operation_identifier',
+    return_value="0HCvrl2o4W1-----"
+)
+async def test_add_debt_raises_operation_identifier_conflict(mock_generate_id, mock_create, mock_claim):
+    mock_create.side_effect = sqlite3.IntegrityError(
+        "UNIQUE constraint failed: debt.operation_identifier"
     )
-    assert mock_generate_id.call_count == amount_of_attempts
+
+    with pytest.raises(UniqueIdentifierGenerationError) as exc_info:
+        await DebtRepository.add_debt(**debt_values)
+
+    assert str(exc_info.value) == "Operation identifier 0HCvrl2o4W1----- already exists"
+    mock_create.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.DebtRepository.claim_operation_identifier_node', new_callable=AsyncMock)
+@patch('ormar.QuerySet.create', new_callable=AsyncMock)
+@patch(
+    'app.domain.debt_domain.DebtDomain.generate_sortable_operation_identifier',
+    return_value="0HCvrl2o4W1-----"
+)
+async def test_add_debt_raises_other_integrity_errors(mock_generate_id, mock_create, mock_claim):
+    mock_create.side_effect = sqlite3.IntegrityError("NOT NULL constraint failed: debt.client")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        await DebtRepository.add_debt(**debt_values)
+
+    assert mock_create.await_count == 1
 
 
 @pytest.mark.asyncio
@@ -70,3 +119,144 @@ async def test_delete_debt(mock_execute, mock_fetch_all, mock_get):
     mock_get.side_effect = NoMatch("Debt not found")
     result = await DebtRepository.delete_debt("non-existent-id")
     assert result is False
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.client_pending_debts.fetch_all', new_callable=AsyncMock)
+async def test_get_client_pending_debts(mock_fetch_all):
+    debt_row = {field: getattr(debt_instance, field) for field in PendingDebtRow._fields}
+    mock_fetch_all.return_value = [{**debt_row, "client_name": client_instance.name}]
+
+    client_name, debts = await DebtRepository.get_client_pending_debts("10000001", "OJw")
+
+    mock_fetch_all.assert_awaited_once_with(client_identifier="10000001", product_code="OJw")
+    assert client_name == client_instance.name
+    assert len(debts) == 1
+    assert isinstance(debts[0], PendingDebtRow)
+    assert debts[0].operation_identifier == debt_instance.operation_identifier
+    assert debts[0].total_debt == debt_instance.total_debt
+
+
+def test_client_pending_debts_selects_only_row_columns():
+    query = client_pending_debts.statement
+    assert [column.name for column in query.selected_columns] == [
+        "client_name", *PendingDebtRow._fields
+    ]
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.client_pending_debts.fetch_all', new_callable=AsyncMock)
+async def test_get_client_pending_debts_without_debts(mock_fetch_all):
+    empty_debt_row = {field: None for field in PendingDebtRow._fields}
+    mock_fetch_all.return_value = [{**empty_debt_row, "client_name": client_instance.name}]
+
+    client_name, debts = await DebtRepository.get_client_pending_debts("10000001", "OJw")
+
+    mock_fetch_all.assert_awaited_once()
+    assert client_name == client_instance.name
+    assert debts == []
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.client_pending_debts.fetch_all', new_callable=AsyncMock)
+async def test_get_client_pending_debts_client_not_found(mock_fetch_all):
+    mock_fetch_all.return_value = []
+
+    client_name, debts = await DebtRepository.get_client_pending_debts("99999999", "OJw")
+
+    mock_fetch_all.assert_awaited_once()
+    assert client_name is None
+    assert debts == []
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.debt_by_operation_identifier.fetch_one', new_callable=AsyncMock)
+async def test_get_debt_by_operation_identifier(mock_fetch_one):
+    mock_fetch_one.return_value = {
+        **debt_instance.dict(exclude={"client", "payments"}),
+        "client": client_instance.pk,
+        **{f"client__{name}": value for name, value in client_instance.dict(exclude={"debts"}).items()},
+    }
+
+    debt = await DebtRepository.get_debt_by_operation_identifier(debt_instance.operation_identifier)
+
+    mock_fetch_one.assert_awaited_once_with(operation_identifier=debt_instance.operation_identifier)
+    assert debt.operation_identifier == debt_instance.operation_identifier
+    assert debt.client.pk == client_instance.pk
+    assert debt.client.name == client_instance.name
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.debt_by_operation_identifier.fetch_one', new_callable=AsyncMock)
+async def test_get_debt_by_operation_identifier_not_found(mock_fetch_one):
+    mock_fetch_one.return_value = None
+
+    with pytest.raises(NoMatch):
+        await DebtRepository.get_debt_by_operation_identifier("999999999999")
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.debt_by_operation_identifier_for_update.fetch_one', new_callable=AsyncMock)
+@patch('app.infrastructure.debt_repository.touch_debt.execute', new_callable=AsyncMock)
+async def test_lock_debt_by_operation_identifier_sqlite(mock_touch_debt, mock_fetch_one):
+    mock_fetch_one.return_value = {
+        **debt_instance.dict(exclude={"client", "payments"}),
+        "client": client_instance.pk,
+        **{f"client__{name}": value for name, value in client_instance.dict(exclude={"debts"}).items()},
+    }
+
+    debt = await DebtRepository.lock_debt_by_operation_identifier(debt_instance.operation_identifier)
+
+    mock_touch_debt.assert_awaited_once_with(operation_identifier=debt_instance.operation_identifier)
+    mock_fetch_one.assert_awaited_once_with(operation_identifier=debt_instance.operation_identifier)
+    assert debt.operation_identifier == debt_instance.operation_identifier
+    assert debt.client.pk == client_instance.pk
+
+
+@pytest.mark.asyncio
+@patch(
+    'app.infrastructure.debt_repository.Debt.Meta.database.url',
+    databases.DatabaseURL("postgresql://paracas:paracas@db:5432/payment_service")
+)
+@patch('app.infrastructure.debt_repository.debt_by_operation_identifier_for_update.fetch_one', new_callable=AsyncMock)
+@patch('app.infrastructure.debt_repository.touch_debt.execute', new_callable=AsyncMock)
+async def test_lock_debt_by_operation_identifier_postgresql(mock_touch_debt, mock_fetch_one):
+    mock_fetch_one.return_value = None
+
+    with pytest.raises(NoMatch):
+        await DebtRepository.lock_debt_by_operation_identifier("999999999999")
+
+    mock_touch_debt.assert_not_awaited()
+
+
+def test_debt_lock_is_a_row_lock_on_postgresql():
+    sql = debt_by_operation_identifier_for_update.compile(
+        "postgresql", statements.dialect("postgresql")
+    ).sql
+
+    assert sql.endswith("FOR UPDATE OF debt")
+
+
+def test_debts_are_locked_in_operation_identifier_order_on_postgresql():
+    sql = str(_lock_debts_statement(["B01-000000000002", "B01-000000000001"]).compile(
+        dialect=statements.dialect("postgresql")
+    ))
+
+    assert sql.endswith("ORDER BY debt.operation_identifier FOR UPDATE OF debt")
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.debt_repository.Debt.Meta.database.fetch_all', new_callable=AsyncMock)
+@patch('app.infrastructure.debt_repository.Debt.Meta.database.execute', new_callable=AsyncMock)
+async def test_lock_debts_by_operation_identifiers_sorts_identifiers(mock_execute, mock_fetch_all):
+    mock_fetch_all.return_value = []
+
+    await DebtRepository.lock_debts_by_operation_identifiers(
+        ["B01-000000000002", "B01-000000000001", "B01-000000000002"]
+    )
+
+    for mock in (mock_execute, mock_fetch_all):
+        statement = mock.await_args.args[0]
+        assert statement.compile().params["operation_identifier_1"] == [
+            "B01-000000000001", "B01-000000000002"
+        ]
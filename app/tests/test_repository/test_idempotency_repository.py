@@ -0,0 +1,106 @@
+# Bank retries of the same payment arrive together on a SQLite file: the payment
+# is processed once and every retry gets its response back, until a revert of the
+# payment, single or by a revert job, drops the response.
+IDEMPOTENCY_SCRIPT = """
+    import asyncio
+    import json
+
+    from app.adapter import PaymentAdapter
+    from app.adapter.revert_job_adapter import running_jobs
+    from app.database.config import database
+    from app.infrastructure import IdempotencyRepository
+    from app.service import PaymentService, RevertJobService
+    from app.tests.mock import debt_update_data
+    from app.tests.seed import create_database, insert, query
+
+    engine = create_database()
+    insert(engine, "client", {})
+    insert(engine, "debt", {"operation_identifier": "B01-0000000002"})
+
+    def scalar(sql):
+        return query(engine, sql)[0][0]
+
+    def expire_keys():
+        with engine.begin() as connection:
+            connection.exec_driver_sql("UPDATE idempotency_key SET expires_at = '2024-01-01 00:00:00'")
+
+    processed = []
+    update_payments = PaymentAdapter.update_payments
+
+    async def record_update_payments(payment_data, status="paid"):
+        processed.append(status)
+        await asyncio.sleep(0.05)
+        return await update_payments(payment_data, status)
+
+    PaymentAdapter.update_payments = staticmethod(record_update_payments)
+
+    revert_data = {
+        key: debt_update_data[key]
+        for key in (
+            "fechaTxn", "horaTxn", "codigoBanco", "tipoConsulta", "idConsulta",
+            "numOperacionBanco", "numDocumento", "codigoEmpresa"
+        )
+    }
+
+    async def main():
+        result = {}
+        async with database:
+            responses = await asyncio.gather(
+                *(PaymentService.update_debt_payment(debt_update_data) for _ in range(20))
+            )
+            result["retries"] = {
+                "responses": len({str(response) for response in responses}),
+                "codigoRespuesta": responses[0]["codigoRespuesta"],
+                "processed": list(processed),
+            }
+
+            date_updated = scalar("SELECT date_updated FROM payment")
+            await PaymentService.update_debt_payment(debt_update_data)
+            result["late_retry"] = {
+                "processed": list(processed),
+                "unchanged": scalar("SELECT date_updated FROM payment") == date_updated,
+            }
+
+            def step(name):
+                result[name] = {"processed": list(processed), "status": scalar("SELECT status FROM payment")}
+
+            await PaymentService.revert_payment_debt(revert_data)
+            await PaymentService.revert_payment_debt(revert_data)
+            step("revert")
+
+            await PaymentService.update_debt_payment(debt_update_data)
+            step("retry_after_revert")
+
+            await RevertJobService.create_revert_job({"numOperacionesBanco": [debt_update_data["numOperacionBanco"]]})
+            await asyncio.gather(*running_jobs.values())
+            await PaymentService.update_debt_payment(debt_update_data)
+            step("retry_after_revert_job")
+
+            await PaymentService.revert_payment_debt(revert_data)
+            step("revert_after_retry")
+
+            expire_keys()
+            await PaymentService.update_debt_payment(debt_update_data)
+            step("expired")
+
+            expire_keys()
+            await IdempotencyRepository.purge_expired()
+            result["purged"] = scalar("SELECT COUNT(*) FROM idempotency_key")
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_duplicate_payments_are_processed_once_on_sqlite(run_script):
+    assert run_script(IDEMPOTENCY_SCRIPT) == {
+        "retries": {"responses": 1, "codigoRespuesta": "00", "processed": ["paid"]},
+        "late_retry": {"processed": ["paid"], "unchanged": True},
+        "revert": {"processed": ["paid", "pending"], "status": "pending"},
+        "retry_after_revert": {"processed": ["paid", "pending", "paid"], "status": "paid"},
+        "retry_after_revert_job": {"processed": ["paid", "pending", "paid", "paid"], "status": "paid"},
+        "revert_after_retry": {"processed": ["paid", "pending", "paid", "paid", "pending"], "status": "pending"},
+        "expired": {"processed": ["paid", "pending", "paid", "paid", "pending", "paid"], "status": "paid"},
+        "purged": 0,
+    }
@@ -0,0 +1,161 @@
+from unittest.mock import ANY, patch, AsyncMock
+
+import databases
+import pytest
+
+from app.database.models import Payment
+from app.database.statements import statements
+from app.infrastructure.payment_repository import PaymentRepository, upsert_payment
+from app.tests.mock import debt_instance, payment_instance
+
+
+payment_row = {
+    **payment_instance.dict(exclude={"debt"}),
+    "debt": debt_instance.operation_identifier,
+}
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.payment_repository.payments_by_debt.fetch_all', new_callable=AsyncMock)
+async def test_get_payments_by_debt(mock_fetch_all):
+    mock_fetch_all.return_value = [payment_row]
+
+    payments = await PaymentRepository.get_payments_by_debt(debt=debt_instance)
+
+    mock_fetch_all.assert_awaited_once_with(debt=debt_instance.operation_identifier)
+    assert len(payments) == 1
+    assert payments[0].id == payment_instance.id
+    assert payments[0].debt.operation_identifier == debt_instance.operation_identifier
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.payment_repository.update_payment_status_by_debt.execute', new_callable=AsyncMock)
+@patch('app.infrastructure.payment_repository.payments_by_debt.fetch_all', new_callable=AsyncMock)
+async def test_update_payment_status(mock_fetch_all, mock_execute):
+    mock_fetch_all.return_value = [{**payment_row, "status": "paid"}]
+
+    payment = await PaymentRepository.update_payment_status(debt=debt_instance, status="paid")
+
+    mock_execute.assert_awaited_once_with(
+        debt=debt_instance.operation_identifier,
+        status="paid",
+        date_updated=ANY
+    )
+    assert payment.status == "paid"
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.payment_repository.update_payment_status_by_debt.execute', new_callable=AsyncMock)
+@patch('app.infrastructure.payment_repository.payments_by_debt.fetch_all', new_callable=AsyncMock)
+async def test_update_payment_status_not_found(mock_fetch_all, mock_execute):
+    mock_fetch_all.return_value = []
+
+    with pytest.raises(ValueError):
+        await PaymentRepository.update_payment_status(debt=debt_instance, status="paid")
+
+
+payment_values = {
+    "emition_date": payment_instance.emition_date,
+    "bank_code": payment_instance.bank_code,
+    "operation_bank_number": payment_instance.operation_bank_number,
+    "gateway": payment_instance.gateway,
+    "payment_type": payment_instance.payment_type,
+    "payment_amount": payment_instance.payment_amount,
+    "status": "paid",
+}
+
+
+def test_upsert_payment_is_a_single_postgresql_statement():
+    sql = upsert_payment.compile("postgresql", statements.dialect("postgresql")).sql
+
+    assert sql.startswith("WITH updated AS")
+    assert "ON CONFLICT (operation_bank_number) DO UPDATE" in sql
+    assert "RETURNING" in sql
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.payment_repository.upsert_payment.fetch_one', new_callable=AsyncMock)
+async def test_upsert_payment_postgresql(mock_fetch_one):
+    mock_fetch_one.return_value = {**payment_row, "status": "paid"}
+
+    with patch.object(Payment.Meta.database, 'url', databases.DatabaseURL("postgresql://db/payment_service")):
+        payment = await PaymentRepository.upsert_payment(debt=debt_instance, **payment_values)
+
+    mock_fetch_one.assert_awaited_once_with(
+        debt=debt_instance.operation_identifier,
+        date_created=ANY,
+        date_updated=ANY,
+        **payment_values
+    )
+    assert payment.status == "paid"
+    assert payment.debt.operation_identifier == debt_instance.operation_identifier
+
+
+@pytest.mark.asyncio
+@patch('app.infrastructure.payment_repository.upsert_payment.fetch_one', new_callable=AsyncMock)
+async def test_upsert_payment_postgresql_operation_of_another_debt(mock_fetch_one):
+    mock_fetch_one.return_value = None
+
+    with patch.object(Payment.Meta.database, 'url', databases.DatabaseURL("postgresql://db/payment_service")):
+        with pytest.raises(ValueError):
+            await PaymentRepository.upsert_payment(debt=debt_instance, **payment_values)
+
+
+# The database URL is read when app.database.config is imported, so the
+# transactional fallback is checked in a new interpreter on a SQLite file.
+UPSERT_SCRIPT = """
+    import asyncio
+    import json
+    from datetime import datetime
+    from decimal import Decimal
+
+    from app.database.config import database
+    from app.database.models import Debt
+    from app.infrastructure import PaymentRepository
+    from app.tests.seed import create_database, insert
+
+    engine = create_database()
+    insert(engine, "client", {})
+    insert(engine, "debt", {"operation_identifier": "B01-000000000001"}, {"operation_identifier": "B01-000000000002"})
+
+    async def main():
+        result = {}
+        async with database:
+            debts = [
+                await Debt.objects.get(operation_identifier=f"B01-00000000000{number}") for number in (1, 2)
+            ]
+            values = dict(
+                emition_date=datetime(2024, 5, 24),
+                bank_code="1020",
+                operation_bank_number="A05478452120",
+                gateway="01",
+                payment_type="1",
+                payment_amount=Decimal("1500.00"),
+            )
+
+            created = await PaymentRepository.upsert_payment(debt=debts[0], status="paid", **values)
+            updated = await PaymentRepository.upsert_payment(debt=debts[0], status="pending", **values)
+            result["created"] = [created.id, created.status]
+            result["updated"] = [updated.id, updated.status]
+            result["payments"] = len(await PaymentRepository.get_payments_by_debt(debt=debts[0]))
+
+            try:
+                await PaymentRepository.upsert_payment(debt=debts[1], status="paid", **values)
+            except Exception as e:
+                result["other_debt_error"] = type(e).__name__
+            result["other_debt_payments"] = len(await PaymentRepository.get_payments_by_debt(debt=debts[1]))
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_upsert_payment_fallback_on_sqlite(run_script):
+    assert run_script(UPSERT_SCRIPT) == {
+        "created": [1, "paid"],
+        "updated": [1, "pending"],
+        "payments": 1,
+        "other_debt_error": "ValueError",
+        "other_debt_payments": 0,
+    }
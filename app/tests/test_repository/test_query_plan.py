@@ -0,0 +1,73 @@
+from unittest.mock import patch, AsyncMock
+
+import pytest
+import sqlalchemy
+
+from app.database.config import metadata
+from app.infrastructure.debt_repository import DebtRepository, client_debts_version, client_pending_debts
+from app.infrastructure.payment_repository import payments_by_debt
+
+
+def explain_query_plan(query: sqlalchemy.sql.ClauseElement) -> list[str]:
+    """ Run EXPLAIN QUERY PLAN for a query on a fresh SQLite schema.
+
+    Args:
+        query (ClauseElement): The query emitted by a repository method.
+
+    Returns:
+        list[str]: The detail column of every step of the plan.
+    """
+    engine = sqlalchemy.create_engine("sqlite://")
+    metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+
+    return [step[-1] for step in plan]
+
+
+def assert_no_table_scan(plan: list[str]):
+    scans = [step for step in plan if step.startswith("SCAN")]
+    assert not scans, f"Query plan falls back to a table scan: {plan}"
+
+
+@pytest.mark.asyncio
+@patch('app.database.models.Debt.Meta.database.fetch_all', new_callable=AsyncMock)
+async def test_get_debts_by_client_identifier_uses_indexes(mock_fetch_all):
+    mock_fetch_all.return_value = []
+
+    await DebtRepository.get_debts_by_client_identifier("10000001", "001")
+
+    plan = explain_query_plan(mock_fetch_all.call_args[0][0])
+
+    assert_no_table_scan(plan)
+    assert any("ix_debt_client_product_code" in step for step in plan)
+    assert any("ix_payment_debt_status" in step for step in plan)
+
+
+def test_client_pending_debts_uses_indexes():
+    plan = explain_query_plan(
+        client_pending_debts.statement.params(client_identifier="10000001", product_code="001")
+    )
+
+    assert_no_table_scan(plan)
+    assert any("ix_debt_client_product_code" in step for step in plan)
+    assert any("ix_payment_debt_status" in step for step in plan)
+
+
+def test_client_debts_version_uses_indexes():
+    plan = explain_query_plan(
+        client_debts_version.statement.params(client_identifier="10000001", product_code="001")
+    )
+
+    assert_no_table_scan(plan)
+    assert any("ix_debt_client_product_code" in step for step in plan)
+    assert any("ix_payment_debt_status" in step for step in plan)
+
+
+def test_payments_by_debt_uses_indexes():
+    plan = explain_query_plan(payments_by_debt.statement.params(debt="123320000013"))
+
+    assert_no_table_scan(plan)
+    assert any("ix_payment_debt_status" in step for step in plan)
@@ -0,0 +1,57 @@
+# The database URLs are read when app.database.config is imported, so the
+# routing is checked in a new interpreter pointed at two SQLite files.
+ROUTING_SCRIPT = """
+    import asyncio
+    import json
+    import os
+
+    from app.database.config import database
+    from app.infrastructure import ClientRepository, DebtRepository
+    from app.tests.seed import create_database, insert
+
+    engines = {}
+    for url, name in ((os.environ["DATABASE_URL"], "Primary"), (os.environ["DATABASE_REPLICA_URL"], "Replica")):
+        engines[name] = create_database(url)
+        insert(engines[name], "client", {"document_identifier": "10000001", "name": name})
+
+    async def main():
+        result = {}
+        async with database:
+            client = await ClientRepository.get_client_by_document_identifier("10000001")
+            client_name, _ = await DebtRepository.get_client_pending_debts("10000001", "001")
+            result["read"] = [client.name, client_name]
+
+            await ClientRepository.create_client("10000002", "Written", "Company", "Product")
+            result["written"] = await database.fetch_val(
+                "SELECT COUNT(*) FROM client WHERE document_identifier = '10000002'"
+            )
+
+            with engines["Replica"].begin() as connection:
+                connection.exec_driver_sql("DROP TABLE client")
+            try:
+                await ClientRepository.get_client_by_document_identifier("10000001")
+            except Exception as e:
+                result["query_error"] = type(e).__name__
+
+            def unreachable():
+                raise ConnectionRefusedError("Replica unreachable")
+
+            database.replica.connection = unreachable
+            client = await ClientRepository.get_client_by_document_identifier("10000001")
+            result["fallback"] = client.name
+
+        print(json.dumps(result))
+
+    asyncio.run(main())
+"""
+
+
+def test_read_methods_use_replica_and_fall_back_to_primary_when_unreachable(run_script, tmp_path):
+    result = run_script(ROUTING_SCRIPT, DATABASE_REPLICA_URL=f"sqlite:///{tmp_path / 'replica.db'}")
+
+    assert result == {
+        "read": ["Replica", "Replica"],
+        "written": 1,
+        "query_error": "OperationalError",
+        "fallback": "Primary",
+    }
@@ -0,0 +1,52 @@
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from app.schemas.constraints import date_text, text
+
+
+class Model(BaseModel):
+    codigo: text(4, length_error="codigo must have 4 characters.", pattern=r'^\d*$', pattern_error="not numeric")
+    nombre: Optional[text(max_length=5, length_error="nombre is too long")] = None
+    fecha: date_text("%d%m%Y", length=8, length_error="fecha must have 8", format_error="fecha format")
+
+
+def errors(**data) -> list:
+    with pytest.raises(ValidationError) as exc_info:
+        Model(**{"codigo": "0123", "fecha": "29022024", **data})
+    return [(error["loc"], error["msg"]) for error in exc_info.value.errors()]
+
+
+def test_valid_values_are_kept():
+    model = Model(codigo="0123", nombre="Ana", fecha="29022024")
+
+    assert (model.codigo, model.nombre, model.fecha) == ("0123", "Ana", "29022024")
+    assert Model(codigo="0123", fecha="29022024").nombre is None
+
+
+def test_values_are_converted_to_str_as_pydantic_does():
+    assert Model(codigo=1234, fecha=b"29022024").dict() == {"codigo": "1234", "nombre": None, "fecha": "29022024"}
+
+    assert errors(codigo=["0123"]) == [(("codigo",), "str type expected")]
+    assert errors(codigo=None) == [(("codigo",), "none is not an allowed value")]
+
+
+def test_length_is_checked_before_the_pattern():
+    assert errors(codigo="12a") == [(("codigo",), "codigo must have 4 characters.")]
+    assert errors(codigo="12ab") == [(("codigo",), "not numeric")]
+    assert errors(nombre="Ana Maria") == [(("nombre",), "nombre is too long")]
+
+
+def test_dates_are_checked_after_their_length():
+    assert errors(fecha="2902202") == [(("fecha",), "fecha must have 8")]
+    assert errors(fecha="29022023") == [(("fecha",), "fecha format")]
+
+
+def test_constraints_are_declared_in_the_schema():
+    properties = Model.schema()["properties"]
+
+    assert properties["codigo"] == {
+        "title": "Codigo", "type": "string", "minLength": 4, "maxLength": 4, "pattern": r'^\d*$'
+    }
+    assert properties["nombre"] == {"title": "Nombre", "type": "string", "maxLength": 5}
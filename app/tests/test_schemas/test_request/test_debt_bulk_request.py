@@ -0,0 +1,54 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.request.debt_bulk_request import DebtBulkPOSTRequest, DebtBulkRow
+
+
+valid_row = {
+    "idCliente": "10000001",
+    "numDocumento": "B01-0000000010",
+    "codigoProducto": "001",
+    "descDocumento": "FACTURA",
+    "fechaEmision": "01012024",
+    "fechaVencimiento": "01022024",
+    "deuda": "100.00",
+    "pagoMinimo": "10.00",
+    "periodo": "01",
+    "cuota": "00",
+    "monedaDoc": "1",
+}
+
+
+def test_debt_bulk_row_valid_data():
+    row = DebtBulkRow(**valid_row)
+    assert row.idCliente == "10000001"
+    assert row.numDocumento == "B01-0000000010"
+    assert str(row.mora) == "0.00"
+    assert row.nombreCliente is None
+
+
+def test_debt_bulk_row_without_operation_identifier():
+    row = DebtBulkRow(**{**valid_row, "numDocumento": None})
+    assert row.numDocumento is None
+
+
+def test_debt_bulk_row_invalid_fields():
+    with pytest.raises(ValidationError) as exc_info:
+        DebtBulkRow(**{**valid_row, "codigoProducto": "0001", "fechaEmision": "2024-01-01"})
+    errors = {error["loc"][0]: error["msg"] for error in exc_info.value.errors()}
+    assert errors == {
+        "codigoProducto": "Must have length 3",
+        "fechaEmision": "Must be in the format DDMMYYYY",
+    }
+
+
+def test_debt_bulk_row_invalid_operation_identifier():
+    with pytest.raises(ValidationError) as exc_info:
+        DebtBulkRow(**{**valid_row, "numDocumento": "B01 0000000010"})
+    assert "Must be alphanumeric or contain hyphens" in str(exc_info.value)
+
+
+def test_debt_bulk_post_request_keeps_rows_unvalidated():
+    request = DebtBulkPOSTRequest(deudas=[valid_row, {"idCliente": ""}])
+    assert len(request.deudas) == 2
+    assert request.crearClientes is False
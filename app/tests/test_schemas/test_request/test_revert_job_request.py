@@ -0,0 +1,28 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.request.revert_job_request import RevertJobPOSTRequest
+
+
+def test_revert_job_request_by_bank_and_dates():
+    request = RevertJobPOSTRequest(codigoBanco="1020", fechaDesde="01012024", fechaHasta="02012024")
+    assert request.numOperacionesBanco is None
+
+
+def test_revert_job_request_by_operation_numbers():
+    request = RevertJobPOSTRequest(numOperacionesBanco=["A00000000001"])
+    assert request.codigoBanco is None
+
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"codigoBanco": "1020", "fechaDesde": "01012024"},
+    {"codigoBanco": "1020", "fechaDesde": "02012024", "fechaHasta": "01012024"},
+    {"codigoBanco": "1020", "fechaDesde": "01012024", "fechaHasta": "02012024", "numOperacionesBanco": ["A1"]},
+    {"numOperacionesBanco": []},
+    {"numOperacionesBanco": ["A000000000001"]},
+    {"codigoBanco": "1020", "fechaDesde": "2024-01-01", "fechaHasta": "02012024"},
+])
+def test_revert_job_request_invalid(data):
+    with pytest.raises(ValidationError):
+        RevertJobPOSTRequest(**data)
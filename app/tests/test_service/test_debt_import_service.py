@@ -0,0 +1,153 @@
+import json
+
+from app.service import DebtImportService
+
+
+# An import of a JSONL file that fails on its second chunk resumes from the
+# checkpoint of the first one: the failed chunk is rolled back and written again.
+IMPORT_SCRIPT = """
+    import asyncio
+    import json
+    import sys
+
+    from app.adapter import DebtAdapter
+    from app.tests.seed import create_database, query
+    from scripts import import_debts
+
+    engine = create_database()
+    path = sys.argv[1]
+
+    def row(row_number, **values):
+        return json.dumps({
+            "idCliente": f"{row_number % 3:08d}",
+            "nombreCliente": "Client",
+            "codigoProducto": "001",
+            "descDocumento": "FACTURA",
+            "fechaEmision": "01012024",
+            "fechaVencimiento": "01022024",
+            "deuda": "100.00",
+            "pagoMinimo": "10.00",
+            "periodo": "01",
+            "cuota": "00",
+            "monedaDoc": "1",
+            **values
+        })
+
+    with open(path, "w") as file:
+        for row_number in range(1, 11):
+            if row_number == 3:
+                file.write("not json\\n")
+            elif row_number == 9:
+                file.write(row(row_number, numDocumento="B01-0000000009", periodo="1") + "\\n")
+            else:
+                file.write(row(row_number, numDocumento=f"B01-000000000{row_number}") + "\\n")
+
+    def debts():
+        return query(engine, "SELECT COUNT(*) FROM debt")[0][0]
+
+    bulk_create_debts = DebtAdapter.bulk_create_debts
+    calls = []
+
+    async def crash_on_second_chunk(rows, create_clients):
+        calls.append(len(rows))
+        result = await bulk_create_debts(rows, create_clients)
+        if len(calls) == 2:
+            raise RuntimeError("crash")
+        return result
+
+    DebtAdapter.bulk_create_debts = staticmethod(crash_on_second_chunk)
+    arguments = [path, "--chunk-size", "4", "--create-clients", "--progress-interval", "0"]
+    result = {}
+    try:
+        asyncio.run(import_debts.main(arguments))
+    except RuntimeError as e:
+        result["failed"] = {
+            "error": str(e),
+            "debts": debts(),
+            "checkpoint": query(engine, 'SELECT "offset", rows, created, rejected FROM import_checkpoint')[0],
+        }
+
+    DebtAdapter.bulk_create_debts = staticmethod(bulk_create_debts)
+    result["resumed"] = {"checkpoint": asyncio.run(import_debts.main(arguments)), "debts": debts()}
+    print(json.dumps(result))
+"""
+
+
+def test_import_resumes_from_checkpoint_on_sqlite(run_script, tmp_path):
+    path = tmp_path / "debts.jsonl"
+
+    result = run_script(IMPORT_SCRIPT, str(path))
+
+    lines = path.read_bytes().splitlines(keepends=True)
+    assert result == {
+        "failed": {"error": "crash", "debts": 3, "checkpoint": [len(b"".join(lines[:4])), 4, 3, 1]},
+        "resumed": {
+            "checkpoint": {"offset": len(b"".join(lines)), "rows": 10, "created": 8, "rejected": 2},
+            "debts": 8,
+        },
+    }
+    assert [json.loads(line)["fila"] for line in (tmp_path / "debts.jsonl.errors.jsonl").open()] == [3, 9]
+
+
+# An import killed right after a chunk commits, before anything else runs,
+# resumes after that chunk: rows without numDocumento are not created twice.
+CRASH_SCRIPT = """
+    import asyncio
+    import json
+    import os
+    import sys
+
+    from app.tests.seed import create_database, query
+    from scripts import import_debts
+
+    engine = create_database()
+    path, mode = sys.argv[1:]
+    arguments = [path, "--chunk-size", "4", "--create-clients", "--progress-interval", "0"]
+
+    if mode == "crash":
+        with open(path, "w") as file:
+            for row_number in range(1, 11):
+                file.write(json.dumps({
+                    "idCliente": "10000001",
+                    "nombreCliente": "Client",
+                    "codigoProducto": "001" if row_number != 3 else "0001",
+                    "descDocumento": "FACTURA",
+                    "fechaEmision": "01012024",
+                    "fechaVencimiento": "01022024",
+                    "deuda": "100.00",
+                    "pagoMinimo": "10.00",
+                    "periodo": "01",
+                    "cuota": "00",
+                    "monedaDoc": "1",
+                }) + "\\n")
+        import_debts.ProgressReporter.__call__ = lambda self, checkpoint, rows_per_second: os._exit(3)
+
+    checkpoint = asyncio.run(import_debts.main(arguments))
+    print(json.dumps({"checkpoint": checkpoint, "debts": query(engine, "SELECT COUNT(*) FROM debt")[0][0]}))
+"""
+
+
+def test_import_killed_after_commit_resumes_without_duplicates(run_script, tmp_path):
+    path = tmp_path / "debts.jsonl"
+
+    assert run_script(CRASH_SCRIPT, str(path), "crash", returncode=3) is None
+
+    assert run_script(CRASH_SCRIPT, str(path), "resume") == {
+        "checkpoint": {"offset": path.stat().st_size, "rows": 10, "created": 9, "rejected": 1},
+        "debts": 9,
+    }
+    assert [json.loads(line)["fila"] for line in (tmp_path / "debts.jsonl.errors.jsonl").open()] == [3]
+
+
+def test_read_records_resumes_from_offset(tmp_path):
+    path = tmp_path / "debts.csv"
+    path.write_text('idCliente,descDocumento\n10000001,"FACTURA\nMULTILINEA"\n10000002,\n')
+
+    records = list(DebtImportService.read_records(str(path), "csv"))
+    assert [record for _, record in records] == [
+        {"idCliente": "10000001", "descDocumento": "FACTURA\nMULTILINEA"},
+        {"idCliente": "10000002", "descDocumento": None},
+    ]
+
+    resumed = list(DebtImportService.read_records(str(path), "csv", records[0][0]))
+    assert resumed == records[1:]
@@ -0,0 +1,141 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.cache import FailSafeCache, SQLiteCacheBackend, TTLCache, create_cache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_sqlite_cache_shared_between_instances(cache_path):
+    worker_one = SQLiteCacheBackend(cache_path, namespace="client", max_size=10, ttl=60)
+    worker_two = SQLiteCacheBackend(cache_path, namespace="client", max_size=10, ttl=60)
+
+    worker_one.set("10000001", b"client")
+
+    assert worker_two.get("10000001") == b"client"
+
+    worker_two.delete("10000001")
+
+    assert worker_one.get("10000001") is None
+    assert worker_two.stats()["hits"] == 1
+    assert worker_one.stats()["misses"] == 1
+
+
+def test_sqlite_cache_namespaces_are_isolated(cache_path):
+    clients = SQLiteCacheBackend(cache_path, namespace="client", max_size=10, ttl=60)
+    debts = SQLiteCacheBackend(cache_path, namespace="debt_status", max_size=10, ttl=60)
+
+    clients.set("10000001", b"client")
+    debts.clear()
+
+    assert debts.get("10000001") is None
+    assert clients.get("10000001") == b"client"
+
+
+@patch('app.utils.cache.time.time')
+def test_sqlite_cache_expires_entries(mock_time, cache_path):
+    cache = SQLiteCacheBackend(cache_path, namespace="client", max_size=10, ttl=10)
+
+    mock_time.return_value = 100
+    cache.set("a", b"1")
+
+    mock_time.return_value = 109
+    assert cache.get("a") == b"1"
+
+    mock_time.return_value = 110
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache_evicts_when_full(cache_path):
+    cache = SQLiteCacheBackend(
+        cache_path, namespace="client", max_size=2, ttl=60, max_bytes=8, evict_interval=1
+    )
+
+    cache.set("a", b"123")
+    cache.set("b", b"123")
+    cache.set("c", b"123")
+
+    assert cache.get("a") is None
+    assert cache.get("c") == b"123"
+    assert cache.stats()["size"] == 2
+
+    cache.set("d", b"12345")
+
+    assert cache.stats()["size_bytes"] <= 8
+    assert cache.stats()["evictions"] == 2
+
+
+def test_sqlite_cache_evicts_every_interval(cache_path):
+    cache = SQLiteCacheBackend(cache_path, namespace="client", max_size=2, ttl=60, evict_interval=3)
+
+    cache.set("a", b"1")
+    cache.set("b", b"1")
+    cache.set("c", b"1")
+
+    assert cache.stats()["size"] == 2
+
+    cache.set("d", b"1")
+
+    assert cache.stats()["size"] == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_create_cache_uses_configured_backend(cache_path):
+    with patch('app.utils.cache.settings.cache_backend', "memory"):
+        cache = create_cache(namespace="client", max_size=10, ttl=60)
+
+    assert isinstance(cache, TTLCache)
+
+    with patch('app.utils.cache.settings.cache_backend', "sqlite"), \
+            patch('app.utils.cache.settings.cache_sqlite_path', cache_path):
+        cache = create_cache(namespace="client", max_size=10, ttl=60)
+
+    assert isinstance(cache, FailSafeCache)
+    assert isinstance(cache.backend, SQLiteCacheBackend)
+
+
+def test_sqlite_cache_errors_are_logged_as_misses(tmp_path):
+    with patch('app.utils.cache.settings.cache_backend', "sqlite"), \
+            patch('app.utils.cache.settings.cache_sqlite_path', str(tmp_path / "missing" / "cache.sqlite3")):
+        cache = create_cache(namespace="client", max_size=10, ttl=60)
+
+    with patch('app.utils.cache.logging.warning') as mock_warning:
+        cache.set("a", b"1")
+        cache.delete("a")
+
+        assert cache.get("a") is None
+        assert mock_warning.call_count == 3
+
+
+def test_sqlite_cache_skips_a_locked_file(cache_path):
+    with patch('app.utils.cache.settings.cache_backend', "sqlite"), \
+            patch('app.utils.cache.settings.cache_sqlite_path', cache_path), \
+            patch('app.utils.cache.settings.cache_sqlite_timeout', 0.01):
+        cache = create_cache(namespace="client", max_size=10, ttl=60)
+
+    cache.set("a", b"1")
+    writer = sqlite3.connect(cache_path, isolation_level=None)
+    writer.execute("BEGIN EXCLUSIVE")
+
+    try:
+        with patch('app.utils.cache.logging.warning') as mock_warning:
+            cache.set("b", b"1")
+
+            mock_warning.assert_called_once()
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+
+
+def test_create_cache_unknown_backend():
+    with patch('app.utils.cache.settings.cache_backend', "redis"):
+        with pytest.raises(ValueError):
+            create_cache(namespace="client", max_size=10, ttl=60)
@@ -0,0 +1,53 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas.response import DebtStatusPOSTResponse
+from app.utils.responses import FastJSONResponse, etag_matches
+
+
+response = DebtStatusPOSTResponse(
+    Cliente="Juan Pérez",
+    CodigoRespuesta="00",
+    DescRespuesta="OK",
+    deudasPendientes=[{
+        "CodigoProducto": "001",
+        "NumDocumento": "B01-000000000001",
+        "DescDocumento": "FACTURA",
+        "FechaVencimiento": "11092019",
+        "FechaEmision": "11092019",
+        "Deuda": 2080.5,
+        "Mora": 0,
+        "GastosAdm": 0,
+        "PagoMinimo": 100,
+        "Periodo": "00",
+        "Anio": "2019",
+        "Cuota": "00",
+        "MonedaDoc": "1",
+    }]
+)
+
+
+def test_model_rendered_as_fastapi_renders_it():
+    assert FastJSONResponse(response).body == JSONResponse(jsonable_encoder(response)).body
+
+
+def test_model_rendered_without_orjson():
+    with patch("app.utils.responses.orjson", None):
+        assert FastJSONResponse(response).body == JSONResponse(jsonable_encoder(response)).body
+
+
+def test_content_rejected_by_orjson_rendered_with_json():
+    assert FastJSONResponse({"total": 2 ** 70, "deuda": Decimal("10.50")}).body == (
+        b'{"total":1180591620717411303424,"deuda":10.5}'
+    )
+
+
+def test_etag_matches_if_none_match():
+    assert etag_matches('"a1"', '"a1"')
+    assert etag_matches('"b2", W/"a1"', '"a1"')
+    assert etag_matches('*', '"a1"')
+    assert not etag_matches('"a2"', '"a1"')
+    assert not etag_matches(None, '"a1"')
@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.request import PaymentUpdatePOSTRequest
+from app.schemas.response import DebtUpdatePOSTResponse
+from app.tests.mock import debt_update_data
+from app.utils.tools import build_response, validated
+
+
+response_data = {
+    "codigoRespuesta": "00",
+    "nombreCliente": "John Doe",
+    "numOperacionERP": "12",
+    "descripcionResp": "OK",
+}
+
+
+def test_validated_request_passes_through():
+    request = PaymentUpdatePOSTRequest(**debt_update_data)
+
+    assert validated(PaymentUpdatePOSTRequest, request) is request
+
+
+def test_validated_request_validated_again_when_strict():
+    request = PaymentUpdatePOSTRequest(**debt_update_data)
+
+    with patch("app.utils.tools.settings.strict_validation", True):
+        revalidated = validated(PaymentUpdatePOSTRequest, request)
+
+    assert revalidated is not request
+    assert revalidated == request
+
+
+def test_validated_dict_is_validated():
+    with pytest.raises(ValidationError):
+        validated(PaymentUpdatePOSTRequest, {**debt_update_data, "fechaTxn": "2024"})
+
+
+def test_build_response_skips_validators():
+    assert build_response(DebtUpdatePOSTResponse, response_data).dict() == response_data
+    # The adapters are trusted: a code the validator rejects is not checked.
+    assert build_response(DebtUpdatePOSTResponse, {**response_data, "codigoRespuesta": "000"}).codigoRespuesta == "000"
+
+
+def test_build_response_validates_unexpected_data():
+    with pytest.raises(ValidationError):
+        build_response(DebtUpdatePOSTResponse, {})
+
+    with pytest.raises(ValidationError):
+        build_response(DebtUpdatePOSTResponse, {**response_data, "codigoRespuesta": "000", "extra": 1})
+
+
+def test_build_response_validated_when_strict():
+    with patch("app.utils.tools.settings.strict_validation", True):
+        with pytest.raises(ValidationError):
+            build_response(DebtUpdatePOSTResponse, {**response_data, "codigoRespuesta": "000"})
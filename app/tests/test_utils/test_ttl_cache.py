@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_hit_and_miss():
+    cache = TTLCache(max_size=2, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+@patch('app.utils.cache.time.monotonic')
+def test_ttl_cache_expires_entries(mock_monotonic):
+    cache = TTLCache(max_size=2, ttl=10)
+
+    mock_monotonic.return_value = 100
+    cache.set("a", 1)
+
+    mock_monotonic.return_value = 109
+    assert cache.get("a") == 1
+
+    mock_monotonic.return_value = 110
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_ttl_cache_delete_and_disabled():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.delete("a")
+    cache.delete("missing")
+
+    assert cache.get("a") is None
+
+    disabled_cache = TTLCache(max_size=0, ttl=60)
+    disabled_cache.set("a", 1)
+
+    assert disabled_cache.get("a") is None
+
+
+def test_ttl_cache_byte_budget():
+    cache = TTLCache(max_size=10, ttl=60, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+
+    assert cache.stats()["size_bytes"] == 10
+
+    cache.set("c", b"123")
+
+    assert cache.get("a") is None
+    assert cache.get("c") == b"123"
+    assert cache.stats()["size_bytes"] == 8
+
+    cache.set("too-big", b"12345678901")
+
+    assert cache.get("too-big") is None
+    assert cache.stats()["size_bytes"] == 8
@@ -0,0 +1,419 @@
+# Cache backends used by the repositories and adapters.
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple, Type
+
+from app.settings import settings
+
+
+class CacheBackend(ABC):
+    """ Interface of the caches used by the repositories and adapters.
+
+    Values are bytes, so every backend can store them no matter where the
+    entries live.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[bytes]: The cached value, None if missing or expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Args:
+            key (str): The key of the entry.
+            value (bytes): The value to cache.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Args:
+            key (str): The key of the entry to invalidate.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """ Drop every entry of the cache. """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Hit, miss and eviction counters and the current size.
+        """
+
+
+class TTLCache(CacheBackend):
+    """ Bounded in-process cache with a per-entry TTL and LRU eviction.
+
+    Expired entries are dropped lazily when they are read, and the least
+    recently used entries are evicted when the cache is full. When max_bytes
+    is set the cached values must be bytes and their total length is bounded
+    as well.
+    """
+
+    def __init__(self, max_size: int, ttl: float, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_size (int): Maximum number of entries, 0 disables the cache.
+            ttl (float): Seconds an entry is served after it is stored.
+            max_bytes (Optional[int]): Maximum total length of the cached bytes.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Optional[Any]: The cached value, None if missing or expired.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to cache.
+        """
+        if self.max_size <= 0:
+            return
+
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            self.delete(key)
+            return
+
+        self.delete(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self.size_bytes += self._sizeof(value)
+
+        while len(self._entries) > self.max_size or (
+            self.max_bytes is not None and self.size_bytes > self.max_bytes
+        ):
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size_bytes -= self._sizeof(evicted)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Args:
+            key (Hashable): The key of the entry to invalidate.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= self._sizeof(entry[0])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _sizeof(self, value: Any) -> int:
+        return len(value) if self.max_bytes is not None else 0
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Hit, miss and eviction counters and the current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """ Cache stored in a SQLite file, shared by every worker process on a host.
+
+    Each namespace keeps its own entries in the same file. Entries expire on
+    wall-clock time, and when the namespace is full the entries closest to
+    expiring are evicted first. Eviction runs once every evict_interval writes
+    of a process, so a namespace may hold up to that many entries over its
+    bounds in between. A call waits at most timeout seconds for the lock of
+    the file and then raises sqlite3.OperationalError. Hit and miss counters
+    are per process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str,
+        max_size: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        timeout: float = 0.05,
+        evict_interval: int = 100
+    ):
+        """
+        Args:
+            path (str): Path of the SQLite file shared by the workers.
+            namespace (str): Name that isolates the entries of this cache.
+            max_size (int): Maximum number of entries, 0 disables the cache.
+            ttl (float): Seconds an entry is served after it is stored.
+            max_bytes (Optional[int]): Maximum total length of the cached bytes.
+            timeout (float): Seconds a call waits for the lock of the file.
+            evict_interval (int): Writes of the process between two evictions.
+        """
+        self.path = path
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.evict_interval = evict_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """ Connection of the current process, opened again after a fork. """
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entry_expires_at "
+                "ON cache_entry (namespace, expires_at)"
+            )
+            self._connection = connection
+            self._pid = os.getpid()
+
+        return self._connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self.connection.execute(
+            "SELECT value, expires_at FROM cache_entry WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+
+        if row is None or row[1] <= time.time():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        if self.max_size <= 0:
+            return
+
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            self.delete(key)
+            return
+
+        connection = self.connection
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entry (namespace, key, value, size, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, key, value, len(value), time.time() + self.ttl)
+        )
+
+        self._writes += 1
+        if self._writes < self.evict_interval:
+            return
+
+        self._writes = 0
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._evict(connection)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        connection.execute(
+            "DELETE FROM cache_entry WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time())
+        )
+
+        count, size_bytes = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+
+        if count <= self.max_size and (self.max_bytes is None or size_bytes <= self.max_bytes):
+            return
+
+        evicted_keys = []
+        for key, size in connection.execute(
+            "SELECT key, size FROM cache_entry WHERE namespace = ? ORDER BY expires_at",
+            (self.namespace,)
+        ).fetchall():
+            if count <= self.max_size and (self.max_bytes is None or size_bytes <= self.max_bytes):
+                break
+            evicted_keys.append((self.namespace, key))
+            count -= 1
+            size_bytes -= size
+
+        connection.executemany(
+            "DELETE FROM cache_entry WHERE namespace = ? AND key = ?",
+            evicted_keys
+        )
+        self.evictions += len(evicted_keys)
+
+    def delete(self, key: str) -> None:
+        self.connection.execute(
+            "DELETE FROM cache_entry WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        )
+
+    def clear(self) -> None:
+        self.connection.execute(
+            "DELETE FROM cache_entry WHERE namespace = ?",
+            (self.namespace,)
+        )
+
+    def stats(self) -> dict:
+        size, size_bytes = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": size,
+            "max_size": self.max_size,
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+class FailSafeCache(CacheBackend):
+    """ Cache whose backend errors are logged instead of raised.
+
+    The caches only save queries, so a read that fails is a miss and a write
+    or an invalidation that fails is skipped. A skipped invalidation leaves
+    the entry to expire with its TTL.
+    """
+
+    def __init__(self, backend: CacheBackend, errors: Tuple[Type[Exception], ...]):
+        """
+        Args:
+            backend (CacheBackend): The cache whose errors are caught.
+            errors (Tuple[Type[Exception], ...]): The errors raised by the backend.
+        """
+        self.backend = backend
+        self.errors = errors
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.backend.get(key)
+        except self.errors as e:
+            logging.warning(f"Cache read of {key} failed: {e}")
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        try:
+            self.backend.set(key, value)
+        except self.errors as e:
+            logging.warning(f"Cache write of {key} failed: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            self.backend.delete(key)
+        except self.errors as e:
+            logging.warning(f"Cache invalidation of {key} failed: {e}")
+
+    def clear(self) -> None:
+        try:
+            self.backend.clear()
+        except self.errors as e:
+            logging.warning(f"Cache clear failed: {e}")
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+def create_cache(
+    namespace: str,
+    max_size: int,
+    ttl: float,
+    max_bytes: Optional[int] = None
+) -> CacheBackend:
+    """ Build the cache backend selected by settings.cache_backend.
+
+    Args:
+        namespace (str): Name that isolates the entries of this cache.
+        max_size (int): Maximum number of entries, 0 disables the cache.
+        ttl (float): Seconds an entry is served after it is stored.
+        max_bytes (Optional[int]): Maximum total length of the cached bytes.
+
+    Returns:
+        CacheBackend: An in-process cache ("memory") or a cache shared by the
+        workers of the host ("sqlite"), whose errors are logged instead of
+        raised.
+    """
+    if settings.cache_backend == "memory":
+        return TTLCache(max_size=max_size, ttl=ttl, max_bytes=max_bytes)
+
+    if settings.cache_backend == "sqlite":
+        backend = SQLiteCacheBackend(
+            path=settings.cache_sqlite_path,
+            namespace=namespace,
+            max_size=max_size,
+            ttl=ttl,
+            max_bytes=max_bytes,
+            timeout=settings.cache_sqlite_timeout,
+            evict_interval=settings.cache_sqlite_evict_interval
+        )
+        return FailSafeCache(backend, errors=(sqlite3.Error,))
+
+    raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
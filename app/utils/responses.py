@@ -0,0 +1,59 @@
+# Response class of the endpoints, rendered with orjson when it is installed.
+import json
+from decimal import Decimal
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_default(value: Any) -> Any:
+    """ Values orjson does not serialize itself, converted as jsonable_encoder does. """
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def render_json(content: Any) -> bytes:
+    """ Content as the compact UTF-8 JSON document FastJSONResponse renders, such as an NDJSON line. """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=_orjson_default)
+        except TypeError:
+            pass
+
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """ Whether an If-None-Match header lists the entity tag, compared as RFC 9110 does: weakly, or any tag for "*". """
+    if not if_none_match:
+        return False
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+class FastJSONResponse(JSONResponse):
+    """ JSONResponse rendered with orjson, or with the json module without it.
+
+    The content may be a response model an endpoint already built: orjson
+    writes its fields as they are, without the jsonable_encoder copy FastAPI
+    makes of a returned model, which costs more than the encoding itself for
+    large responses. Content orjson rejects, such as integers above 64 bits,
+    and every content without orjson, goes through jsonable_encoder and the
+    json module, which write the same compact UTF-8 document.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
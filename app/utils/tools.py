@@ -1 +1,97 @@
 # Generic functions for the app.
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+from app.settings import settings
+
+
+T = TypeVar("T")
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """ Split an iterable in consecutive chunks, consuming it lazily.
+
+    Args:
+        items (Iterable[T]): The items to split.
+        size (int): Maximum number of items of a chunk.
+
+    Returns:
+        Iterator[List[T]]: The chunks, in order.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str, date_format: str = "%d%m%Y") -> datetime:
+    """ Parse a date, caching the result since files repeat a few dates.
+
+    Args:
+        value (str): The date, in date_format.
+        date_format (str): strptime format of the date.
+
+    Returns:
+        datetime: The parsed date.
+
+    Raises:
+        ValueError: If the value does not match the format.
+    """
+    return datetime.strptime(value, date_format)
+
+
+def validated(model: Type[ModelT], data: Union[ModelT, dict]) -> ModelT:
+    """ The model of data, validating it unless it already is one.
+
+    Request bodies arrive as models FastAPI validated, the services take them
+    as they are. With settings.strict_validation they are validated again.
+
+    Args:
+        model (Type[ModelT]): The model class.
+        data (Union[ModelT, dict]): An instance of the model, or its fields.
+
+    Returns:
+        ModelT: The instance of the model.
+
+    Raises:
+        ValidationError: If the data is not valid.
+    """
+    if isinstance(data, model):
+        if not settings.strict_validation:
+            return data
+        data = data.dict()
+
+    return model(**data)
+
+
+def build_response(model: Type[ModelT], data: Any) -> ModelT:
+    """ The response model of data built by the adapters, without running its validators.
+
+    Data with fields the model does not have or without a required field is
+    validated, so it fails as before. With settings.strict_validation every
+    response is validated.
+
+    Args:
+        model (Type[ModelT]): The response model class.
+        data (Any): The fields of the response.
+
+    Returns:
+        ModelT: The instance of the model.
+
+    Raises:
+        ValidationError: If validated data is not valid.
+    """
+    if (
+        settings.strict_validation
+        or not isinstance(data, dict)
+        or not data.keys() <= model.__fields__.keys()
+        or any(field.required and name not in data for name, field in model.__fields__.items())
+    ):
+        return model.parse_obj(data)
+
+    return model.construct(**data)
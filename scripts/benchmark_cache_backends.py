@@ -0,0 +1,69 @@
+"""Compare the hit latency of the cache backends.
+
+Usage:
+    python -m scripts.benchmark_cache_backends [--iterations 100000] [--value-size 2048]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.utils.cache import CacheBackend, SQLiteCacheBackend, TTLCache
+
+
+def measure_hits(cache: CacheBackend, iterations: int, keys: int) -> list[float]:
+    """ Read cached keys in a loop and return the latency of every hit.
+
+    Args:
+        cache (CacheBackend): A cache already filled with the keys.
+        iterations (int): Number of reads.
+        keys (int): Number of distinct keys that are read.
+
+    Returns:
+        list[float]: Latency of each read in microseconds.
+    """
+    latencies = []
+    for iteration in range(iterations):
+        key = str(iteration % keys)
+        start = time.perf_counter()
+        cache.get(key)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--value-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    value = os.urandom(args.value_size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "memory": TTLCache(max_size=args.keys, ttl=3600),
+            "sqlite": SQLiteCacheBackend(
+                os.path.join(directory, "cache.sqlite3"),
+                namespace="benchmark",
+                max_size=args.keys,
+                ttl=3600
+            ),
+        }
+
+        print(f"{'backend':<8} {'mean us':>10} {'p50 us':>10} {'p99 us':>10}")
+        for name, cache in backends.items():
+            for key in range(args.keys):
+                cache.set(str(key), value)
+
+            latencies = sorted(measure_hits(cache, args.iterations, args.keys))
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{name:<8} {statistics.mean(latencies):>10.2f} "
+                f"{statistics.median(latencies):>10.2f} {p99:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measure the cold start of a worker: a new interpreter importing the app.
+
+Usage:
+    python -m scripts.benchmark_cold_start [--runs 20] [--database-url URL]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def measure_interpreter(code: str, runs: int, env: dict) -> list[float]:
+    """ Run a snippet in new interpreters and time each of them.
+
+    Args:
+        code (str): The code run by every interpreter.
+        runs (int): Number of interpreters started.
+        env (dict): Environment of the interpreters.
+
+    Returns:
+        list[float]: Wall time of each interpreter in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+
+    interpreter = statistics.median(measure_interpreter("pass", args.runs, env))
+    import_app = statistics.median(measure_interpreter("import app.main", args.runs, env))
+
+    print(f"interpreter      median {interpreter:8.1f} ms")
+    print(f"import app.main  median {import_app:8.1f} ms")
+    print(f"app import cost  median {import_app - interpreter:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Import a generated billing file into an empty throwaway SQLite database.
+
+Writes a CSV or JSONL file of --rows debts for --clients clients, then imports
+it with the import_debts pipeline, creating the clients, and prints the rows per
+second and the peak memory of the process.
+
+Usage:
+    python -m scripts.benchmark_debt_import [--rows 1000000] [--clients 10000]
+        [--format csv|jsonl] [--chunk-size 10000]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import resource
+import tempfile
+import time
+
+DIRECTORY = tempfile.mkdtemp()
+DATABASE_PATH = os.path.join(DIRECTORY, "benchmark_debt_import.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+from app.database.config import create_schema, database  # noqa: E402
+from app.service import DebtImportService  # noqa: E402
+
+FIELDS = (
+    "idCliente", "nombreCliente", "numDocumento", "codigoProducto", "descDocumento", "fechaEmision",
+    "fechaVencimiento", "deuda", "mora", "gastosAdm", "pagoMinimo", "periodo", "cuota", "monedaDoc",
+)
+
+
+def generate(path: str, file_format: str, rows: int, clients: int) -> None:
+    """ Write a billing file, without numDocumento so identifiers are generated. """
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        if file_format == "csv":
+            writer.writerow(FIELDS)
+        for row_number in range(rows):
+            values = (
+                f"{row_number % clients:08d}", "Benchmark client", "", "001", "FACTURA", "01012024",
+                "01022024", "1000.00", "0.00", "10.00", "100.00", "01", "00", "1",
+            )
+            if file_format == "csv":
+                writer.writerow(values)
+            else:
+                file.write(json.dumps({
+                    field: value or None for field, value in zip(FIELDS, values)
+                }) + "\n")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    def print_progress(checkpoint: dict, rows_per_second: float) -> None:
+        if checkpoint["rows"] % 100000 < args.chunk_size:
+            print(f"{checkpoint['rows']:>9} rows {rows_per_second:>8.0f} rows/s", flush=True)
+
+    path = os.path.join(DIRECTORY, f"debts.{args.format}")
+    try:
+        start = time.perf_counter()
+        generate(path, args.format, args.rows, args.clients)
+        print(f"generated {os.path.getsize(path) / 2 ** 20:.0f} MiB in {time.perf_counter() - start:.1f}s")
+
+        create_schema()
+        async with database:
+            start = time.perf_counter()
+            checkpoint = await DebtImportService.import_file(
+                path,
+                args.format,
+                path,
+                f"{path}.errors.jsonl",
+                args.chunk_size,
+                True,
+                print_progress
+            )
+            elapsed = time.perf_counter() - start
+
+        print(
+            f"imported {checkpoint['created']} debts, {checkpoint['rejected']} rejected, "
+            f"in {elapsed:.1f}s: {checkpoint['rows'] / elapsed:.0f} rows/s, "
+            f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB"
+        )
+    finally:
+        for name in os.listdir(DIRECTORY):
+            os.remove(os.path.join(DIRECTORY, name))
+        os.rmdir(DIRECTORY)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
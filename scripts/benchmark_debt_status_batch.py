@@ -0,0 +1,121 @@
+"""Compare debt-status queries sent one by one against the batch endpoint.
+
+Seeds a throwaway SQLite database with --clients clients of --debts pending
+debts each, then checks every client through DebtService.debt_status, one call
+each, and through DebtService.debts_status in batches of
+DEBT_STATUS_BATCH_MAX_ITEMS, with an empty debt-status cache, and prints the
+clients per second of each path.
+
+Usage:
+    python -m scripts.benchmark_debt_status_batch [--clients 5000] [--debts 3]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_debt_status_batch.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import sqlalchemy  # noqa: E402
+
+from app.adapter.debt_adapter import debt_status_cache  # noqa: E402
+from app.database.config import create_schema, database, get_engine  # noqa: E402
+from app.service import DebtService  # noqa: E402
+from app.settings import settings  # noqa: E402
+from app.utils.tools import chunked  # noqa: E402
+
+NOW = "2024-01-01 00:00:00"
+
+
+def seed(clients: int, debts: int) -> None:
+    """ Create the clients with the given number of pending debts each. """
+    operation_identifiers = [
+        (f"{client:08d}", f"B{client:08d}-{number:06d}") for client in range(clients) for number in range(debts)
+    ]
+    with get_engine().begin() as connection:
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO client (document_identifier, name, company, product_type, date_created, date_updated) "
+                "VALUES (:client, 'Benchmark', 'Benchmark', 'Benchmark', :now, :now)"
+            ),
+            [{"client": f"{client:08d}", "now": NOW} for client in range(clients)]
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO debt (operation_identifier, client, description, emition_date, expiration_date, "
+                "total_debt, default_debt, administration_expenses, minimum_payment, period, fee, product_code, "
+                "currency, date_created, date_updated) "
+                "VALUES (:operation_identifier, :client, 'FACTURA', :now, :now, 100, 0, 0, 10, '01', '00', "
+                "'001', '1', :now, :now)"
+            ),
+            [
+                {"operation_identifier": operation_identifier, "client": client, "now": NOW}
+                for client, operation_identifier in operation_identifiers
+            ]
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO payment (debt, emition_date, bank_code, operation_bank_number, gateway, payment_type, "
+                "payment_amount, status, date_created, date_updated) "
+                "VALUES (:operation_identifier, :now, '0001', :operation_bank_number, '0001', '00', 0, 'pending', "
+                ":now, :now)"
+            ),
+            [
+                {"operation_identifier": operation_identifier, "operation_bank_number": f"{number:012d}", "now": NOW}
+                for number, (_, operation_identifier) in enumerate(operation_identifiers)
+            ]
+        )
+
+
+def query(client: int) -> dict:
+    return {
+        "tipoConsulta": "1",
+        "idConsulta": f"{client:08d}",
+        "codigoBanco": "1020",
+        "codigoProducto": "001",
+        "canalPago": "10",
+        "codigoEmpresa": "001",
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--debts", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        create_schema()
+        seed(args.clients, args.debts)
+
+        async with database:
+            debt_status_cache.clear()
+            start = time.perf_counter()
+            for client in range(args.clients):
+                response = await DebtService.debt_status(query(client))
+                assert response["CodigoRespuesta"] == "00", response
+            single = args.clients / (time.perf_counter() - start)
+
+            debt_status_cache.clear()
+            start = time.perf_counter()
+            for clients in chunked(range(args.clients), settings.debt_status_batch_max_items):
+                response = await DebtService.debts_status({
+                    "consultas": [
+                        {"idConsulta": f"{client:08d}", "codigoProducto": "001"} for client in clients
+                    ]
+                })
+                assert all(result["CodigoRespuesta"] == "00" for result in response["resultados"]), response
+            batch = args.clients / (time.perf_counter() - start)
+
+        print(f"{'path':>7} {'clients/s':>10}")
+        print(f"{'single':>7} {single:>10.0f}")
+        print(f"{'batch':>7} {batch:>10.0f}")
+        print(f"batch / single: {batch / single:.1f}x")
+    finally:
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Compare full debt-status responses against 304 Not Modified answers.
+
+Seeds a throwaway SQLite database with one client of --debts pending debts, then
+polls the debt-status endpoint --polls times with an empty debt-status cache,
+without If-None-Match and with the ETag of the previous response, and prints the
+polls per second and the response bytes of each.
+
+Usage:
+    python -m scripts.benchmark_debt_status_etag [--debts 1000] [--polls 500]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_debt_status_etag.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import sqlalchemy  # noqa: E402
+
+from app.adapter.debt_adapter import debt_status_cache, debt_status_etag_cache  # noqa: E402
+from app.database.config import create_schema, database, get_engine  # noqa: E402
+from app.main import payment_post_endpoint  # noqa: E402
+from app.schemas.request import DebtStatusPOSTRequest  # noqa: E402
+
+NOW = "2024-01-01 00:00:00"
+
+
+def seed(debts: int) -> None:
+    """ Create a client with the given number of pending debts. """
+    with get_engine().begin() as connection:
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO client (document_identifier, name, company, product_type, date_created, date_updated) "
+                "VALUES ('10000000', 'Benchmark', 'Benchmark', 'Benchmark', :now, :now)"
+            ),
+            {"now": NOW}
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO debt (operation_identifier, client, description, emition_date, expiration_date, "
+                "total_debt, default_debt, administration_expenses, minimum_payment, period, fee, product_code, "
+                "currency, date_created, date_updated) "
+                "VALUES (:operation_identifier, '10000000', 'FACTURA', :now, :now, 100, 0, 0, 10, '01', '00', "
+                "'001', '1', :now, :now)"
+            ),
+            [{"operation_identifier": f"B{number:014d}", "now": NOW} for number in range(debts)]
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO payment (debt, emition_date, bank_code, operation_bank_number, gateway, payment_type, "
+                "payment_amount, status, date_created, date_updated) "
+                "VALUES (:operation_identifier, :now, '0001', :operation_bank_number, '0001', '00', 0, 'pending', "
+                ":now, :now)"
+            ),
+            [
+                {"operation_identifier": f"B{number:014d}", "operation_bank_number": f"{number:012d}", "now": NOW}
+                for number in range(debts)
+            ]
+        )
+
+
+async def poll(polls: int, conditional: bool) -> tuple:
+    """ Polls per second and bytes of the last response, without caching between polls. """
+    request = DebtStatusPOSTRequest(
+        tipoConsulta="1", idConsulta="10000000", codigoBanco="1020", codigoProducto="001", canalPago="10",
+        codigoEmpresa="001"
+    )
+    etag = None
+    start = time.perf_counter()
+    for _ in range(polls):
+        debt_status_cache.clear()
+        debt_status_etag_cache.clear()
+        response = await payment_post_endpoint(request, etag if conditional else None)
+        etag = response.headers["etag"]
+    return polls / (time.perf_counter() - start), len(response.body)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--debts", type=int, default=1000)
+    parser.add_argument("--polls", type=int, default=500)
+    args = parser.parse_args()
+
+    try:
+        create_schema()
+        seed(args.debts)
+
+        async with database:
+            full, full_bytes = await poll(args.polls, conditional=False)
+            not_modified, not_modified_bytes = await poll(args.polls, conditional=True)
+
+        print(f"{'response':>13} {'polls/s':>8} {'bytes':>8}")
+        print(f"{'200 OK':>13} {full:>8.0f} {full_bytes:>8}")
+        print(f"{'304 Not Mod.':>13} {not_modified:>8.0f} {not_modified_bytes:>8}")
+        print(f"304 / 200: {not_modified / full:.1f}x")
+    finally:
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""Compare the debt-status read paths: ORM models against projected rows.
+
+Seeds a throwaway SQLite database with one client per size and measures the
+repository query plus the response formatting of each path.
+
+Usage:
+    python -m scripts.benchmark_debt_status_rows [--sizes 10 100 1000] [--requests 50]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_debt_status_rows.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+from app.adapter.debt_adapter import DebtAdapter  # noqa: E402
+from app.database.config import create_schema, database  # noqa: E402
+from app.database.models import Client, Debt, Payment  # noqa: E402
+from app.infrastructure import DebtRepository  # noqa: E402
+
+PRODUCT_CODE = "001"
+
+
+async def seed(sizes: list[int]) -> None:
+    """ Create a client with the given number of pending debts for every size. """
+    now = datetime.now()
+    for size in sizes:
+        client = await Client.objects.create(
+            document_identifier=f"{size:08d}",
+            name=f"Client {size}",
+            company="Benchmark",
+            product_type="Benchmark",
+        )
+        debts = [
+            Debt(
+                operation_identifier=f"{size:06d}{number:06d}",
+                client=client,
+                description="Benchmark debt",
+                emition_date=now,
+                expiration_date=now + timedelta(days=30),
+                total_debt=Decimal("1000.00"),
+                default_debt=Decimal("0.00"),
+                administration_expenses=Decimal("10.00"),
+                minimum_payment=Decimal("100.00"),
+                period="01",
+                fee="00",
+                product_code=PRODUCT_CODE,
+                currency="1",
+            )
+            for number in range(size)
+        ]
+        await Debt.objects.bulk_create(debts)
+        await Payment.objects.bulk_create([
+            Payment(
+                debt=debt,
+                emition_date=now,
+                bank_code="0001",
+                operation_bank_number=debt.operation_identifier,
+                gateway="0001",
+                payment_type="00",
+                payment_amount=Decimal("0.00"),
+                status="pending",
+            )
+            for debt in debts
+        ])
+
+
+async def ormar_path(client_identifier: str) -> dict:
+    debts = await DebtRepository.get_debts_by_client_identifier(client_identifier, PRODUCT_CODE)
+    return DebtAdapter._formating_debts(debts, debts[0].client.name)
+
+
+async def rows_path(client_identifier: str) -> dict:
+    client_name, debts = await DebtRepository.get_client_pending_debts(
+        client_identifier, PRODUCT_CODE
+    )
+    return DebtAdapter._formating_debts(debts, client_name)
+
+
+async def measure(path, client_identifier: str, requests: int) -> tuple[float, float, int]:
+    """
+    Returns:
+        tuple[float, float, int]: Milliseconds per request, debts per second and
+        peak bytes allocated by one request.
+    """
+    await path(client_identifier)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await path(client_identifier)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await path(client_identifier)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rows = len(response["deudasPendientes"]) * requests
+    return elapsed / requests * 1000, rows / elapsed, peak
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    create_schema()
+    await database.connect()
+    try:
+        await seed(args.sizes)
+
+        print(f"{'debts':>6} {'path':>6} {'ms/request':>11} {'debts/s':>10} {'peak KiB':>9}")
+        for size in args.sizes:
+            for name, path in (("ormar", ormar_path), ("rows", rows_path)):
+                ms, rows_per_second, peak = await measure(path, f"{size:08d}", args.requests)
+                print(f"{size:>6} {name:>6} {ms:>11.2f} {rows_per_second:>10.0f} {peak / 1024:>9.1f}")
+    finally:
+        await database.disconnect()
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Compare the rendering of debt-status responses with the json module and orjson.
+
+Builds a DebtStatusPOSTResponse with 1, 100 and 1000 pending debts and measures
+the serialization of the model an endpoint returns:
+
+- standard: what FastAPI does by default, jsonable_encoder then JSONResponse.
+- encoded: jsonable_encoder then FastJSONResponse, only the encoder replaced.
+- fast: FastJSONResponse of the model, as the endpoints return it.
+
+Usage:
+    python -m scripts.benchmark_json_response [--sizes 1 100 1000] [--repeat 20]
+"""
+import argparse
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas.response import DebtStatusPOSTResponse
+from app.utils import responses
+from app.utils.responses import FastJSONResponse
+
+
+def response(size: int) -> DebtStatusPOSTResponse:
+    return DebtStatusPOSTResponse(
+        Cliente="Benchmark client",
+        CodigoRespuesta="00",
+        DescRespuesta="OK",
+        deudasPendientes=[
+            {
+                "CodigoProducto": "001",
+                "NumDocumento": f"B01-{number:012d}",
+                "DescDocumento": "FACTURA",
+                "FechaVencimiento": "01022024",
+                "FechaEmision": "01012024",
+                "Deuda": 2080.5,
+                "Mora": 0.0,
+                "GastosAdm": 10.0,
+                "PagoMinimo": 100.0,
+                "Periodo": "01",
+                "Anio": "2024",
+                "Cuota": "00",
+                "MonedaDoc": "1",
+            }
+            for number in range(size)
+        ]
+    )
+
+
+def measure(function, repeat: int) -> float:
+    """ Milliseconds per call, best of three runs. """
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"orjson installed: {responses.orjson is not None}")
+    print(f"{'debts':>6} {'standard ms':>12} {'encoded ms':>11} {'fast ms':>8} {'speedup':>8}")
+    for size in args.sizes:
+        model = response(size)
+        assert JSONResponse(jsonable_encoder(model)).body == FastJSONResponse(model).body
+
+        standard = measure(lambda: JSONResponse(jsonable_encoder(model)), args.repeat)
+        encoded = measure(lambda: FastJSONResponse(jsonable_encoder(model)), args.repeat)
+        fast = measure(lambda: FastJSONResponse(model), args.repeat)
+        print(f"{size:>6} {standard:>12.3f} {encoded:>11.3f} {fast:>8.3f} {standard / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
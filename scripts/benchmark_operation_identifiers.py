@@ -0,0 +1,126 @@
+"""Compare debt inserts with random and with time-ordered operation identifiers.
+
+The random scheme is the previous one: a random identifier is probed with a
+SELECT before the debt is inserted. The sortable scheme inserts the time-ordered
+identifier and relies on the primary key. Each scheme fills an empty throwaway
+SQLite database, and the size of the primary key index is read from dbstat.
+
+Usage:
+    python -m scripts.benchmark_operation_identifiers [--debts 5000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_operation_identifiers.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import sqlalchemy  # noqa: E402
+from ormar import NoMatch  # noqa: E402
+
+from app.database.config import database, get_engine, metadata  # noqa: E402
+from app.database.models import Client, Debt  # noqa: E402
+from app.domain import DebtDomain  # noqa: E402
+from app.infrastructure import DebtRepository  # noqa: E402
+
+PRIMARY_KEY_INDEX = "sqlite_autoindex_debt_1"
+
+
+def debt_values(client: Client) -> dict:
+    now = datetime.now()
+    return dict(
+        client=client,
+        description="Benchmark debt",
+        emition_date=now,
+        expiration_date=now + timedelta(days=30),
+        total_debt=Decimal("1000.00"),
+        default_debt=Decimal("0.00"),
+        administration_expenses=Decimal("10.00"),
+        minimum_payment=Decimal("100.00"),
+        period="01",
+        fee="00",
+        product_code="001",
+        currency="1",
+    )
+
+
+async def add_debt_random(client: Client) -> Debt:
+    """ The previous insert: probe random identifiers until one is free. """
+    while True:
+        identifier = DebtDomain.generate_operation_identifier()
+        try:
+            await Debt.objects.get(operation_identifier=identifier)
+        except NoMatch:
+            return await Debt.objects.create(operation_identifier=identifier, **debt_values(client))
+
+
+async def add_debt_sortable(client: Client) -> Debt:
+    return await DebtRepository.add_debt(**debt_values(client))
+
+
+def index_size() -> tuple[int, int, float]:
+    """
+    Returns:
+        tuple[int, int, float]: Pages and bytes of the primary key index of the
+        debt table, and the share of the bytes holding keys.
+    """
+    with get_engine().connect() as connection:
+        pages, size, unused = connection.execute(
+            sqlalchemy.text(
+                "SELECT COUNT(*), SUM(pgsize), SUM(unused) FROM dbstat WHERE name = :name"
+            ),
+            {"name": PRIMARY_KEY_INDEX}
+        ).one()
+    return pages, size, 1 - unused / size
+
+
+async def measure(add_debt, debts: int) -> tuple[float, int, int, float]:
+    """
+    Returns:
+        tuple[float, int, int, float]: Debts inserted per second, then the
+        index pages, bytes and fill of the primary key after the inserts.
+    """
+    engine = get_engine()
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    await database.connect()
+    try:
+        async with database.connection():
+            client = await Client.objects.create(
+                document_identifier="10000001",
+                name="Benchmark",
+                company="Benchmark",
+                product_type="Benchmark",
+            )
+
+            start = time.perf_counter()
+            for _ in range(debts):
+                await add_debt(client)
+            elapsed = time.perf_counter() - start
+    finally:
+        await database.disconnect()
+
+    return (debts / elapsed, *index_size())
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--debts", type=int, default=5000)
+    args = parser.parse_args()
+
+    try:
+        print(f"{'scheme':>8} {'debts/s':>9} {'pages':>6} {'KiB':>8} {'fill':>6}")
+        for name, add_debt in (("random", add_debt_random), ("sortable", add_debt_sortable)):
+            debts_per_second, pages, size, fill = await measure(add_debt, args.debts)
+            print(f"{name:>8} {debts_per_second:>9.0f} {pages:>6} {size / 1024:>8.1f} {fill:>6.1%}")
+    finally:
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""Compare payment notifications sent one by one against the batch endpoint.
+
+Seeds a throwaway SQLite database with one debt per notification, then applies
+--payments notifications through PaymentService.update_debt_payment, one call
+each, and the same number through PaymentService.update_debt_payments on fresh
+debts, and prints the notifications per second of each path.
+
+Usage:
+    python -m scripts.benchmark_payment_batch [--payments 5000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_payment_batch.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import sqlalchemy  # noqa: E402
+
+from app.database.config import create_schema, database, get_engine  # noqa: E402
+from app.service import PaymentService  # noqa: E402
+
+
+def seed(debts: int) -> None:
+    """ Create a client with the given number of debts, without payments. """
+    with get_engine().begin() as connection:
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO client (document_identifier, name, company, product_type, date_created, date_updated) "
+                "VALUES ('10000001', 'Benchmark', 'Benchmark', 'Benchmark', :now, :now)"
+            ),
+            {"now": "2024-01-01 00:00:00"}
+        )
+        connection.execute(
+            sqlalchemy.text(
+                "INSERT INTO debt (operation_identifier, client, description, emition_date, expiration_date, "
+                "total_debt, default_debt, administration_expenses, minimum_payment, period, fee, product_code, "
+                "currency, date_created, date_updated) "
+                "VALUES (:operation_identifier, '10000001', 'Debt', :now, :now, 100, 0, 0, 10, '01', '00', "
+                "'001', '1', :now, :now)"
+            ),
+            [{"operation_identifier": f"B{number:015d}", "now": "2024-01-01 00:00:00"} for number in range(debts)]
+        )
+
+
+def payment(number: int) -> dict:
+    return {
+        "fechaTxn": "01012024",
+        "horaTxn": "120000",
+        "canalPago": "10",
+        "codigoBanco": "1020",
+        "numOperacionBanco": f"{number:012d}",
+        "formaPago": "01",
+        "tipoConsulta": "1",
+        "idConsulta": "10000001",
+        "codigoProducto": "001",
+        "numDocumento": f"B{number:015d}",
+        "importePagado": 100,
+        "monedaDoc": "1",
+        "codigoEmpresa": "001",
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--payments", type=int, default=5000)
+    args = parser.parse_args()
+
+    try:
+        create_schema()
+        seed(2 * args.payments)
+
+        async with database:
+            start = time.perf_counter()
+            for number in range(args.payments):
+                response = await PaymentService.update_debt_payment(payment(number))
+                assert response["codigoRespuesta"] == "00", response
+            single = args.payments / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            response = await PaymentService.update_debt_payments({
+                "pagos": [payment(number) for number in range(args.payments, 2 * args.payments)]
+            })
+            assert all(result["codigoRespuesta"] == "00" for result in response["resultados"])
+            batch = args.payments / (time.perf_counter() - start)
+
+        print(f"{'path':>7} {'payments/s':>11}")
+        print(f"{'single':>7} {single:>11.0f}")
+        print(f"{'batch':>7} {batch:>11.0f}")
+        print(f"batch / single: {batch / single:.1f}x")
+    finally:
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""Measure the CPU time per request saved by not validating requests and responses again.
+
+Seeds a throwaway SQLite database with a client per size of --sizes pending
+debts and a debt to pay, then calls the debt-status endpoint (answered from the
+debt-status cache after the first call) and the update-debt-payment endpoint
+(a replayed notification, answered from its stored response) with the request
+model FastAPI builds, with STRICT_VALIDATION on and off, and prints the CPU
+milliseconds per request of each mode.
+
+Usage:
+    python -m scripts.benchmark_request_validation [--sizes 1 100 1000] [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_request_validation.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+import sqlalchemy  # noqa: E402
+
+from app.database.config import create_schema, database, get_engine  # noqa: E402
+from app.main import payment_post_endpoint, update_debt_payment_endpoint  # noqa: E402
+from app.schemas.request import DebtStatusPOSTRequest, PaymentUpdatePOSTRequest  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+NOW = "2024-01-01 00:00:00"
+
+
+def seed(sizes: list[int]) -> None:
+    """ Create a client with the given number of pending debts for every size, and a debt to pay. """
+    with get_engine().begin() as connection:
+        for size in sizes + [0]:
+            connection.execute(
+                sqlalchemy.text(
+                    "INSERT INTO client (document_identifier, name, company, product_type, date_created, "
+                    "date_updated) VALUES (:client, 'Benchmark', 'Benchmark', 'Benchmark', :now, :now)"
+                ),
+                {"client": f"{size:08d}", "now": NOW}
+            )
+            connection.execute(
+                sqlalchemy.text(
+                    "INSERT INTO debt (operation_identifier, client, description, emition_date, expiration_date, "
+                    "total_debt, default_debt, administration_expenses, minimum_payment, period, fee, "
+                    "product_code, currency, date_created, date_updated) "
+                    "VALUES (:operation_identifier, :client, 'FACTURA', :now, :now, 100, 0, 0, 10, '01', '00', "
+                    "'001', '1', :now, :now)"
+                ),
+                [
+                    {"operation_identifier": f"B{size:07d}-{number:07d}", "client": f"{size:08d}", "now": NOW}
+                    for number in range(max(size, 1))
+                ]
+            )
+            connection.execute(
+                sqlalchemy.text(
+                    "INSERT INTO payment (debt, emition_date, bank_code, operation_bank_number, gateway, "
+                    "payment_type, payment_amount, status, date_created, date_updated) "
+                    "VALUES (:operation_identifier, :now, '0001', :operation_bank_number, '0001', '00', 0, "
+                    "'pending', :now, :now)"
+                ),
+                [
+                    {
+                        "operation_identifier": f"B{size:07d}-{number:07d}",
+                        "operation_bank_number": f"{size:05d}{number:07d}",
+                        "now": NOW
+                    }
+                    for number in range(max(size, 1))
+                ]
+            )
+
+
+async def cpu_per_request(endpoint, request, requests: int) -> float:
+    """ CPU milliseconds per call of the endpoint, after a first call that fills the caches. """
+    await endpoint(request)
+    start = time.process_time()
+    for _ in range(requests):
+        await endpoint(request)
+    return (time.process_time() - start) / requests * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        (
+            f"debt-status {size}",
+            payment_post_endpoint,
+            DebtStatusPOSTRequest(
+                tipoConsulta="1", idConsulta=f"{size:08d}", codigoBanco="1020", codigoProducto="001",
+                canalPago="10", codigoEmpresa="001"
+            )
+        )
+        for size in args.sizes
+    ]
+    cases.append((
+        "update-debt-payment",
+        update_debt_payment_endpoint,
+        PaymentUpdatePOSTRequest(
+            fechaTxn="01012024", horaTxn="120000", canalPago="10", codigoBanco="1020",
+            numOperacionBanco="000000000001", formaPago="01", tipoConsulta="1", idConsulta="00000000",
+            codigoProducto="001", numDocumento="B0000000-0000000", importePagado=100, monedaDoc="1",
+            codigoEmpresa="001"
+        )
+    ))
+
+    try:
+        create_schema()
+        seed(args.sizes)
+
+        async with database:
+            print(f"{'request':>20} {'strict ms':>10} {'fast ms':>8} {'saved ms':>9}")
+            for name, endpoint, request in cases:
+                settings.strict_validation = True
+                strict = await cpu_per_request(endpoint, request, args.requests)
+                settings.strict_validation = False
+                fast = await cpu_per_request(endpoint, request, args.requests)
+                print(f"{name:>20} {strict:>10.3f} {fast:>8.3f} {strict - fast:>9.3f}")
+    finally:
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
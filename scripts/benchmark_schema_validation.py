@@ -0,0 +1,91 @@
+"""Measure the validations per second of every request and response schema.
+
+Validates a valid payload of each schema in a loop, as FastAPI and the
+services do with the body of a request or the data of a response, and prints
+the best of three runs.
+
+Usage:
+    python -m scripts.benchmark_schema_validation [--repeat 20000]
+"""
+import argparse
+import time
+
+from app.schemas.request import (
+    DebtBulkRow,
+    DebtPOSTRequest,
+    DebtStatusPOSTRequest,
+    PaymentUpdatePOSTRequest,
+    RevertDebtPaymentPOSTRequest,
+    RevertJobPOSTRequest,
+)
+from app.schemas.response import (
+    DebtUpdatePOSTResponse,
+    PendingDebts,
+    RevertDebtPaymentPOSTResponse,
+)
+
+PAYLOADS = [
+    (DebtStatusPOSTRequest, {
+        "tipoConsulta": "1", "idConsulta": "10000003", "codigoBanco": "1020", "codigoProducto": "001",
+        "canalPago": "10", "codigoEmpresa": "998"
+    }),
+    (DebtPOSTRequest, {
+        "fechaTxn": "24052024", "horaTxn": "153105", "canalPago": "10", "codigoBanco": "1020",
+        "numOperacionERP": "A05478452120", "formaPago": "01", "tipoConsulta": "1", "idConsulta": "10000003",
+        "codigoProducto": "001", "numDocumento": "B01-0000000002", "importePagado": 1500, "monedaDoc": "2",
+        "codigoEmpresa": "998"
+    }),
+    (PaymentUpdatePOSTRequest, {
+        "fechaTxn": "24052024", "horaTxn": "153105", "canalPago": "10", "codigoBanco": "1020",
+        "numOperacionBanco": "A05478452120", "formaPago": "01", "tipoConsulta": "1", "idConsulta": "10000003",
+        "codigoProducto": "001", "numDocumento": "B01-0000000002", "importePagado": 1500, "monedaDoc": "2",
+        "codigoEmpresa": "998"
+    }),
+    (RevertDebtPaymentPOSTRequest, {
+        "fechaTxn": "24052024", "horaTxn": "153105", "codigoBanco": "1020", "tipoConsulta": "1",
+        "idConsulta": "10000003", "numOperacionBanco": "A05478452120", "numDocumento": "B01-0000000002",
+        "codigoEmpresa": "998"
+    }),
+    (RevertJobPOSTRequest, {"codigoBanco": "1020", "fechaDesde": "01052024", "fechaHasta": "24052024"}),
+    (DebtBulkRow, {
+        "idCliente": "10000003", "numDocumento": "B01-0000000002", "codigoProducto": "001",
+        "descDocumento": "FACTURA", "fechaEmision": "01052024", "fechaVencimiento": "01062024", "deuda": "1500.00",
+        "pagoMinimo": "100.00", "periodo": "05", "cuota": "01", "monedaDoc": "1"
+    }),
+    (PendingDebts, {
+        "CodigoProducto": "001", "NumDocumento": "B01-000000000002", "DescDocumento": "FACTURA",
+        "FechaVencimiento": "01062024", "FechaEmision": "01052024", "Deuda": 1500.0, "Mora": 0.0, "GastosAdm": 0.0,
+        "PagoMinimo": 100.0, "Periodo": "05", "Anio": "2024", "Cuota": "01", "MonedaDoc": "1"
+    }),
+    (DebtUpdatePOSTResponse, {
+        "codigoRespuesta": "00", "nombreCliente": "Client", "numOperacionERP": "125", "descripcionResp": "OK"
+    }),
+    (RevertDebtPaymentPOSTResponse, {
+        "codigoRespuesta": "00", "nombreCliente": "Client", "numOperacionERP": "125", "descripcionResp": "OK"
+    }),
+]
+
+
+def validations_per_second(model, payload: dict, repeat: int) -> float:
+    """ Validations of the payload per second, best of three runs. """
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            model(**payload)
+        best = min(best, time.perf_counter() - start)
+    return repeat / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'schema':>30} {'validations/s':>14}")
+    for model, payload in PAYLOADS:
+        print(f"{model.__name__:>30} {validations_per_second(model, payload, args.repeat):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
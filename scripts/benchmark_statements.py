@@ -0,0 +1,128 @@
+"""Measure the time the statement registry saves on the hot repository queries.
+
+Each registered statement is run against a throwaway SQLite database through
+databases, which compiles it on every call, and through the registry, which
+compiles it once. The compile column is the cost of one compilation.
+
+Usage:
+    python -m scripts.benchmark_statements [--iterations 2000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_statements.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_PATH}"
+
+from app.database.config import create_schema, database  # noqa: E402
+from app.database.models import Client, Debt, Payment  # noqa: E402
+from app.database.statements import statements  # noqa: E402
+from app.infrastructure import ClientRepository  # noqa: E402,F401 (registers the statements)
+
+CLIENT_IDENTIFIER = "10000001"
+OPERATION_IDENTIFIER = "B01-000000000001"
+
+VALUES = {
+    "client_by_document_identifier": {"document_identifier": CLIENT_IDENTIFIER},
+    "client_pending_debts": {"client_identifier": CLIENT_IDENTIFIER, "product_code": "001"},
+    "debt_by_operation_identifier": {"operation_identifier": OPERATION_IDENTIFIER},
+    "payments_by_debt": {"debt": OPERATION_IDENTIFIER},
+    "update_payment_status_by_debt": {"debt": OPERATION_IDENTIFIER, "status": "pending"},
+}
+
+
+async def seed() -> None:
+    now = datetime.now()
+    client = await Client.objects.create(
+        document_identifier=CLIENT_IDENTIFIER,
+        name="Benchmark",
+        company="Benchmark",
+        product_type="Benchmark",
+    )
+    debt = await Debt.objects.create(
+        operation_identifier=OPERATION_IDENTIFIER,
+        client=client,
+        description="Benchmark debt",
+        emition_date=now,
+        expiration_date=now + timedelta(days=30),
+        total_debt=Decimal("1000.00"),
+        default_debt=Decimal("0.00"),
+        administration_expenses=Decimal("10.00"),
+        minimum_payment=Decimal("100.00"),
+        period="01",
+        fee="00",
+        product_code="001",
+        currency="1",
+    )
+    await Payment.objects.create(
+        debt=debt,
+        emition_date=now,
+        bank_code="0001",
+        operation_bank_number="000000000001",
+        gateway="0001",
+        payment_type="00",
+        payment_amount=Decimal("0.00"),
+        status="pending",
+    )
+
+
+async def measure(run, iterations: int) -> float:
+    """
+    Returns:
+        float: Microseconds per call, on one connection like a request.
+    """
+    async with database.connection():
+        await run()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await run()
+        return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    create_schema()
+    await database.connect()
+    try:
+        await seed()
+        dialect = statements.dialect(database.url.scheme)
+
+        print(f"{'statement':<30} {'compile us':>10} {'databases us':>12} {'registry us':>11} {'saved us':>9}")
+        total_saved = 0.0
+        for name, values in VALUES.items():
+            prepared = statements.get(name)
+            bound = prepared.bind(**values)
+            is_select = name != "update_payment_status_by_debt"
+
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                prepared.statement.compile(dialect=dialect)
+            compile_us = (time.perf_counter() - start) / args.iterations * 1_000_000
+
+            if is_select:
+                databases_us = await measure(lambda: database.fetch_all(bound), args.iterations)
+                registry_us = await measure(lambda: prepared.fetch_all(**values), args.iterations)
+            else:
+                databases_us = await measure(lambda: database.execute(bound), args.iterations)
+                registry_us = await measure(lambda: prepared.execute(**values), args.iterations)
+
+            total_saved += databases_us - registry_us
+            print(
+                f"{name:<30} {compile_us:>10.1f} {databases_us:>12.1f} "
+                f"{registry_us:>11.1f} {databases_us - registry_us:>9.1f}"
+            )
+        print(f"{'total':<30} {'':>10} {'':>12} {'':>11} {total_saved:>9.1f}")
+    finally:
+        await database.disconnect()
+        os.remove(DATABASE_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Import the debts of a CSV or JSONL billing file into the configured database.
+
+The file is streamed in chunks of --chunk-size rows, each written in one
+transaction. Rejected rows are appended to the errors file, and the progress is
+saved to the import_checkpoint table in the transaction of each chunk: running
+the same command again after a crash resumes after the last committed chunk.
+Pass --restart to import a file again from the start.
+
+Usage:
+    python -m scripts.import_debts FILE [--format csv|jsonl] [--chunk-size 10000]
+        [--create-clients] [--checkpoint NAME] [--restart] [--errors FILE.errors.jsonl]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from app.database.config import database
+from app.infrastructure import ImportCheckpointRepository
+from app.service import DebtImportService
+from app.service.debt_import_service import IMPORT_FORMATS
+
+
+class ProgressReporter:
+    """ Print the progress of an import at most once per interval. """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._last_report = 0.0
+
+    def __call__(self, checkpoint: dict, rows_per_second: float) -> None:
+        now = time.monotonic()
+        if now - self._last_report < self._interval:
+            return
+        self._last_report = now
+        print(
+            f"rows {checkpoint['rows']} created {checkpoint['created']} "
+            f"rejected {checkpoint['rejected']} rows/s {rows_per_second:.0f}",
+            file=sys.stderr,
+            flush=True
+        )
+
+
+def parse_arguments(arguments=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--create-clients", action="store_true")
+    parser.add_argument("--checkpoint", help="Name of the import checkpoint, defaults to the absolute path of FILE")
+    parser.add_argument("--restart", action="store_true", help="Drop the checkpoint and import from the start")
+    parser.add_argument("--errors", help="Defaults to FILE.errors.jsonl")
+    parser.add_argument("--progress-interval", type=float, default=5, help="Seconds between progress lines")
+    args = parser.parse_args(arguments)
+
+    if args.format is None:
+        args.format = "jsonl" if args.file.endswith((".jsonl", ".ndjson")) else "csv"
+    args.checkpoint = args.checkpoint or os.path.abspath(args.file)
+    args.errors = args.errors or f"{args.file}.errors.jsonl"
+    return args
+
+
+async def main(arguments=None) -> dict:
+    args = parse_arguments(arguments)
+    report = ProgressReporter(args.progress_interval)
+    start = time.perf_counter()
+
+    async with database:
+        if args.restart:
+            await ImportCheckpointRepository.delete_checkpoint(args.checkpoint)
+        checkpoint = await DebtImportService.import_file(
+            args.file,
+            args.format,
+            args.checkpoint,
+            args.errors,
+            args.chunk_size,
+            args.create_clients,
+            report
+        )
+
+    print(
+        f"done: rows {checkpoint['rows']} created {checkpoint['created']} "
+        f"rejected {checkpoint['rejected']} in {time.perf_counter() - start:.1f}s",
+        file=sys.stderr
+    )
+    return checkpoint
+
+
+if __name__ == "__main__":
+    asyncio.run(main())